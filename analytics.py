@@ -0,0 +1,125 @@
+import numpy as np
+from salary import PERIODS_PER_YEAR
+
+class SalaryData:
+    """The typed salary columns of the jobs table as NumPy arrays, one entry per job.
+
+    Amounts are converted to yearly amounts. Jobs giving only a lower or upper bound
+    have NaN for the other one; midpoint is the mean of the bounds that are known.
+    Locations, contract types and months are stored as integer codes into the
+    matching label arrays so groups can be aggregated without Python loops.
+    """
+
+    def __init__(self, rows):
+        locations, contracts, months, minimums, maximums, periods = zip(*rows) if rows else ([],) * 6
+
+        # Period names -> yearly multipliers, looked up once per distinct period
+        period_names, period_codes = np.unique(np.array(periods, dtype=object).astype(str), return_inverse=True)
+        multipliers = np.array([PERIODS_PER_YEAR.get(name, np.nan) for name in period_names], dtype=float)
+        multiplier = multipliers[period_codes]
+
+        self.minimum = np.array(minimums, dtype=float) * multiplier  # None becomes NaN
+        self.maximum = np.array(maximums, dtype=float) * multiplier
+        bounds = np.vstack([self.minimum, self.maximum])
+        known = (~np.isnan(bounds)).sum(axis=0)
+        self.midpoint = np.nansum(bounds, axis=0) / np.maximum(known, 1)
+
+        self.locations, self.location_codes = np.unique(np.array(locations, dtype=object).astype(str),
+                                                        return_inverse=True)
+        self.contracts, self.contract_codes = np.unique(np.array(contracts, dtype=object).astype(str),
+                                                        return_inverse=True)
+        # Jobs saved before scraped_at existed have no month and are left out of trends
+        self.months, self.month_codes = np.unique(np.array(months, dtype=object).astype(str), return_inverse=True)
+
+    def __len__(self):
+        return len(self.midpoint)
+
+def load_salary_data(database, currency='EUR'):
+    """Reads the typed salary columns of all jobs with a salary into a SalaryData."""
+    return SalaryData(database.salary_rows(currency))
+
+def distribution(values, bins=10):
+    """Returns (counts, bin edges) of a histogram of the values."""
+    return np.histogram(values, bins=bins)
+
+def grouped_percentiles(values, codes, group_count, percentiles=(25, 50, 75)):
+    """Computes percentiles of values for every group in one pass.
+
+    codes gives the group (0 to group_count - 1) of each value. Returns (counts,
+    percentile table) where the table has one row per group and one column per
+    percentile, NaN for empty groups. Uses the same linear interpolation as np.percentile.
+    """
+    counts = np.bincount(codes, minlength=group_count)
+    if not len(values):
+        return counts, np.full((group_count, len(percentiles)), np.nan)
+
+    order = np.lexsort((values, codes))  # By group, then by value within each group
+    sorted_values = values[order]
+    starts = np.concatenate([[0], np.cumsum(counts)[:-1]])
+
+    # Fractional position of each percentile inside each group's sorted slice
+    positions = (counts[:, None] - 1) * (np.asarray(percentiles, dtype=float)[None, :] / 100)
+    lower = np.floor(positions).astype(int)
+    upper = np.minimum(lower + 1, np.maximum(counts[:, None] - 1, 0))
+    fraction = positions - lower
+
+    # Empty groups index out of their (empty) slice; they are clipped here and masked below
+    last = len(sorted_values) - 1
+    low_values = sorted_values[np.clip(starts[:, None] + lower, 0, last)]
+    high_values = sorted_values[np.clip(starts[:, None] + upper, 0, last)]
+    table = low_values + (high_values - low_values) * fraction
+    table[counts == 0] = np.nan
+    return counts, table
+
+def percentiles_by_group(data, labels, codes, min_jobs=1, percentiles=(25, 50, 75)):
+    """Returns [(label, job count, [percentile values])] of the salary midpoints per group,
+    largest groups first, leaving out groups with fewer than min_jobs jobs."""
+    counts, table = grouped_percentiles(data.midpoint, codes, len(labels), percentiles)
+    order = np.argsort(-counts, kind='stable')
+    return [(labels[index], int(counts[index]), table[index].tolist())
+            for index in order if counts[index] >= min_jobs]
+
+def percentiles_by_location(data, min_jobs=3, percentiles=(25, 50, 75)):
+    return percentiles_by_group(data, data.locations, data.location_codes, min_jobs, percentiles)
+
+def percentiles_by_contract(data, min_jobs=1, percentiles=(25, 50, 75)):
+    return percentiles_by_group(data, data.contracts, data.contract_codes, min_jobs, percentiles)
+
+def monthly_trend(data):
+    """Returns [(month, job count, median salary midpoint)] in chronological order."""
+    counts, table = grouped_percentiles(data.midpoint, data.month_codes, len(data.months), (50,))
+    # np.unique sorts the months, and 'None' (jobs without a scrape date) sorts after the digits
+    return [(month, int(count), medians[0]) for month, count, medians in zip(data.months, counts, table)
+            if month != 'None' and count]
+
+def salary_report(database, currency='EUR', bins=8):
+    """Builds the text shown by the UI's salary statistics window."""
+    data = load_salary_data(database, currency)
+    if not len(data):
+        return "No job with a salary amount in the database."
+
+    lines = [f"{len(data)} jobs with a salary in {currency} (yearly amounts, midpoint of the range)",
+             "",
+             f"Median {np.median(data.midpoint):,.0f}   mean {data.midpoint.mean():,.0f}   "
+             f"min {data.midpoint.min():,.0f}   max {data.midpoint.max():,.0f}",
+             "",
+             "Distribution"]
+    counts, edges = distribution(data.midpoint, bins)
+    widest = max(counts.max(), 1)
+    for count, start, end in zip(counts, edges[:-1], edges[1:]):
+        lines.append(f"  {start:>9,.0f} - {end:>9,.0f}  {'#' * int(round(30 * count / widest)):<30} {count}")
+
+    for title, rows in [("By location (3+ jobs)", percentiles_by_location(data)),
+                        ("By contract type", percentiles_by_contract(data))]:
+        lines += ["", title, f"  {'':<40} {'jobs':>5} {'p25':>9} {'median':>9} {'p75':>9}"]
+        for label, count, (p25, median, p75) in rows:
+            label = "Unknown" if label == 'None' else label
+            lines.append(f"  {label[:40]:<40} {count:>5} {p25:>9,.0f} {median:>9,.0f} {p75:>9,.0f}")
+
+    trend = monthly_trend(data)
+    lines += ["", "By month scraped"]
+    if not trend:
+        lines.append("  No scrape dates yet (recorded for jobs saved from now on).")
+    for month, count, median in trend:
+        lines.append(f"  {month}  {count:>5} jobs  median {median:,.0f}")
+    return '\n'.join(lines)
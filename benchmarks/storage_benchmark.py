@@ -0,0 +1,65 @@
+"""Compares the old per-row save pattern with the batched JobStore.
+
+Run from the repository root:
+    python -m benchmarks.storage_benchmark --rows 10000 100000
+"""
+import argparse
+import os
+import sqlite3
+import tempfile
+import time
+from storage import JobStore
+from benchmarks.synthetic import synthetic_jobs
+
+def legacy_save(db_path, job):
+    """The previous JobScraper.save_to_database: connect, scan by title, insert, commit, close."""
+    conn = sqlite3.connect(db_path)
+    cursor = conn.cursor()
+    cursor.execute('SELECT COUNT(*) FROM jobs WHERE title = ?', (job['title'],))
+    if not cursor.fetchone()[0]:
+        cursor.execute('''INSERT INTO jobs (title, location, salary, advantages, description)
+                          VALUES (?, ?, ?, ?, ?)''', (
+            job['title'], job['location'], job['salary'], job['advantages'], job['description']
+        ))
+        conn.commit()
+    conn.close()
+
+def bench_legacy(db_path, jobs):
+    conn = sqlite3.connect(db_path)
+    conn.execute('''CREATE TABLE jobs (
+        id INTEGER PRIMARY KEY AUTOINCREMENT, title TEXT NOT NULL, location TEXT NOT NULL,
+        salary TEXT, advantages TEXT, description TEXT)''')
+    conn.close()
+
+    start = time.perf_counter()
+    for job in jobs:
+        legacy_save(db_path, job)
+    return time.perf_counter() - start
+
+def bench_store(db_path, jobs, batch_size):
+    start = time.perf_counter()
+    store = JobStore(db_path, batch_size=batch_size)
+    for job in jobs:
+        store.add(job)
+    store.close()
+    return time.perf_counter() - start
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark job storage strategies.")
+    parser.add_argument('--rows', type=int, nargs='+', default=[10000, 100000])
+    parser.add_argument('--batch-size', type=int, default=500)
+    parser.add_argument('--legacy-max-rows', type=int, default=10000,
+                        help="Skip the legacy pattern above this many rows (it is quadratic)")
+    args = parser.parse_args()
+
+    for rows in args.rows:
+        jobs = list(synthetic_jobs(rows))
+        with tempfile.TemporaryDirectory() as tmp:
+            store_time = bench_store(os.path.join(tmp, 'store.db'), jobs, args.batch_size)
+            print(f"{rows:>7} rows  JobStore: {store_time:8.2f} s  ({rows / store_time:,.0f} rows/s)")
+            if rows <= args.legacy_max_rows:
+                legacy_time = bench_legacy(os.path.join(tmp, 'legacy.db'), jobs)
+                print(f"{rows:>7} rows  legacy:   {legacy_time:8.2f} s  ({rows / legacy_time:,.0f} rows/s)")
+
+if __name__ == "__main__":
+    main()
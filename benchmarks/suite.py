@@ -0,0 +1,353 @@
+"""Offline benchmark suite: storage, parsing, database queries and UI loading.
+
+Everything runs against a synthetic jobs.db and the saved Indeed pages in
+fixtures/indeed, so no network access is needed. Scenarios that need Chrome or a
+display are reported as skipped when those are not available.
+
+Run from the repository root:
+    python -m benchmarks.suite --rows 20000 --output results.json
+    python -m benchmarks.suite --compare results.json    # Exit code 1 on regressions
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from lxml import html as lxml_html
+from selenium.webdriver.common.by import By
+from benchmarks.synthetic import synthetic_jobs, generate_database
+from browser_profile import BrowserProfile
+from checkpoint import CrawlCheckpoint
+from database import Database, SORT_EXPRESSIONS
+from dedup import fingerprint
+from fixture_server import FixtureServer, FIXTURES_DIR
+from http_fetcher import HttpJobFetcher, parse_job_page, parse_results_page
+from pacing import RateLimiter
+from ranking import RelevanceIndex
+from salary import parse_salary
+from scraper import JobScraper
+
+JOB_FIXTURE_KEY = 'a1b2c3d4e5f60001'  # Served from job_detail.html
+CARD_INDICES = (0, 1)  # Results cards with a job page (the third one leads to a CAPTCHA)
+
+class Skipped(Exception):
+    """Raised by a scenario that cannot run in this environment."""
+
+def timed(func, repeat):
+    """Calls func repeat times and returns the duration of each call in seconds."""
+    durations = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        durations.append(time.perf_counter() - start)
+    return durations
+
+def summarize(name, durations, items_per_run=1):
+    """Turns call durations into a result record; times are milliseconds per item."""
+    per_item = sorted(duration * 1000 / items_per_run for duration in durations)
+    median = statistics.median(per_item)
+    return {
+        'name': name,
+        'status': 'ok',
+        'runs': len(durations),
+        'items_per_run': items_per_run,
+        'min_ms': per_item[0],
+        'median_ms': median,
+        'mean_ms': statistics.fmean(per_item),
+        'p95_ms': per_item[min(len(per_item) - 1, int(len(per_item) * 0.95))],
+        'max_ms': per_item[-1],
+        'items_per_second': 1000 / median if median else None,
+    }
+
+def read_fixture(filename):
+    with open(os.path.join(FIXTURES_DIR, filename), 'rb') as f:
+        return f.read()
+
+# --- Scenarios ------------------------------------------------------------------
+# Each one takes the suite context and returns a list of result records.
+
+def bench_save_to_database(context):
+    """JobScraper.save_to_database for fresh jobs, including the final flush."""
+    jobs = list(synthetic_jobs(context.save_rows, context.description_size, seed=7))
+    results = []
+    for batch_size in (1, 100):
+        db_path = os.path.join(context.tmp, f'save_{batch_size}.db')
+        scraper = JobScraper(db_path, start_driver=False)
+        scraper.store.batch_size = batch_size
+
+        def save_all():
+            for job in jobs:
+                scraper.save_to_database(job)
+            scraper.store.flush()
+
+        durations = timed(save_all, 1)
+        scraper.close()
+        results.append(summarize(f'save_to_database[batch={batch_size}]', durations, len(jobs)))
+    return results
+
+def bench_parsing(context):
+    """lxml extraction of the saved Indeed pages, plus the per-job dedup and salary work."""
+    results_page = read_fixture('search_results.html')
+    job_page = read_fixture('job_detail.html')
+    job = parse_job_page(lxml_html.fromstring(job_page))
+    repeat = context.repeat * 20
+    return [
+        summarize('parse_results_page',
+                  timed(lambda: parse_results_page(lxml_html.fromstring(results_page), "http://localhost"), repeat)),
+        summarize('parse_job_page', timed(lambda: parse_job_page(lxml_html.fromstring(job_page)), repeat)),
+        summarize('fingerprint', timed(lambda: fingerprint(job), repeat)),
+        summarize('parse_salary', timed(lambda: parse_salary("De 45 000 € à 50 000 € par an - CDI, Temps plein"),
+                                        repeat)),
+    ]
+
+def bench_http_fetcher(context):
+    """HttpJobFetcher.scrape_job_page against the local fixture server."""
+    with FixtureServer() as server:
+        fetcher = HttpJobFetcher(os.path.join(context.tmp, 'http.db'), server.base_url,
+                                 rate_limiter=RateLimiter(rate=1e9, burst=1e9))
+        url = f"{server.base_url}/viewjob?jk={JOB_FIXTURE_KEY}"
+        try:
+            return [summarize('http_scrape_job_page', timed(lambda: fetcher.scrape_job_page(url), context.repeat * 5))]
+        finally:
+            fetcher.close()
+
+def bench_selenium_extractors(context):
+    """JobScraper field extractors on the saved job page, in a real browser."""
+    scraper = JobScraper(os.path.join(context.tmp, 'selenium.db'), start_driver=False,
+                         rate_limiter=RateLimiter(rate=1e9, burst=1e9))
+    try:
+        try:
+            scraper.start_driver()
+        except Exception as e:
+            raise Skipped(f"Chrome is not available: {e.__class__.__name__}")
+        with FixtureServer() as server:
+            scraper.navigate(f"{server.base_url}/viewjob?jk={JOB_FIXTURE_KEY}")
+            results = [summarize(f'selenium_{extractor.__name__}', timed(extractor, context.repeat))
+                       for extractor in (scraper.get_job_title, scraper.get_job_salary, scraper.get_location,
+                                         scraper.get_advantages, scraper.get_job_description)]
+            results.append(summarize('selenium_extract_job_data', timed(scraper.extract_job_data, context.repeat)))
+            return results
+    finally:
+        scraper.close()
+
+def bench_browser_profiles(context):
+    """Reading results cards on the fixture site with the full browser and the lean profiles.
+
+    Besides the time per card, each record has the bytes the fixture server sent per card.
+    """
+    variants = [
+        ('full,back', BrowserProfile.full(headless=True), 'back'),
+        ('lean,pane', BrowserProfile(headless=True), 'pane'),
+        ('lean,tab', BrowserProfile(headless=True), 'tab'),
+    ]
+    results = []
+    with FixtureServer() as server:
+        for name, profile, detail_mode in variants:
+            scraper = JobScraper(os.path.join(context.tmp, 'profiles.db'), start_driver=False, profile=profile,
+                                 detail_mode=detail_mode, rate_limiter=RateLimiter(rate=1e9, burst=1e9))
+            scraper.base_indeed_url = server.base_url
+            try:
+                try:
+                    scraper.start_driver()
+                except Exception as e:
+                    raise Skipped(f"Chrome is not available: {e.__class__.__name__}")
+                checkpoint = CrawlCheckpoint(scraper.store.database, f'benchmark|{name}', max_attempts=1)
+                results_url = f"{server.base_url}/jobs?q=developpeur"
+                scraper.open_results_page(results_url)
+                cards = [CARD_INDICES[run % len(CARD_INDICES)] for run in range(context.repeat)]
+                start_bytes = server.bytes_sent
+
+                def read_card(index):
+                    job_key = scraper.get_card_job_key(scraper.driver.find_elements(By.CSS_SELECTOR, '.job_seen_beacon')[index])
+                    scraper.scrape_card(index, job_key, results_url, checkpoint)
+                    scraper.leave_job(results_url)
+
+                durations = []
+                for index in cards:
+                    durations.extend(timed(lambda: read_card(index), 1))
+                result = summarize(f'browser_card[{name}]', durations)
+                result['bytes_per_card'] = (server.bytes_sent - start_bytes) / len(cards)
+                results.append(result)
+                checkpoint.finish()
+            finally:
+                scraper.close()
+    return results
+
+def bench_queries(context):
+    """Database queries behind the job list and the search box."""
+    database = Database(context.db_path)
+    try:
+        results = [summarize('count_jobs', timed(database.count_jobs, context.repeat))]
+        for column, expression in SORT_EXPRESSIONS.items():
+            first_page = database.list_jobs(expression, limit=201)
+            key = (first_page[-1][7], first_page[-1][0])
+            results.append(summarize(f'list_jobs[{column}]', timed(
+                lambda: database.list_jobs(expression, key=key, limit=201), context.repeat)))
+        results.append(summarize('search', timed(lambda: database.search("python cloud"), context.repeat)))
+        return results
+    finally:
+        database.close()
+
+def bench_relevance(context):
+    """Building, reloading and incrementally updating the relevance index, and ranking with it."""
+    database = Database(context.db_path)
+    try:
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'relevance_index.npz')
+            index = RelevanceIndex(path)
+            start = time.perf_counter()
+            index.update(database)
+            results = [summarize('relevance_build', [time.perf_counter() - start], len(index))]
+            index.save()
+            results.append(summarize('relevance_load', timed(lambda: RelevanceIndex.load(path), context.repeat)))
+
+            # New jobs are only read once: the index is cut back to before the newest 1% each run
+            newest = max(1, len(index) // 100)
+            def update_newest():
+                partial = RelevanceIndex.load(path)
+                partial.job_ids, partial.matrix = partial.job_ids[:-newest], partial.matrix[:-newest]
+                partial.update(database)
+            results.append(summarize('relevance_update', timed(update_newest, context.repeat), newest))
+
+            index.rank("python django react", limit=500)  # Row norms are computed once per index change
+            results.append(summarize('relevance_rank', timed(
+                lambda: index.rank("python django react sql docker", limit=500), context.repeat)))
+            return results
+    finally:
+        database.close()
+
+def bench_ui(context):
+    """JobSearchApp.load_jobs, sort_column and toggle_check on the synthetic database."""
+    import tkinter as tk
+    from tkinter import messagebox
+    from ui import JobSearchApp
+
+    try:
+        root = tk.Tk()
+    except tk.TclError as e:
+        raise Skipped(f"No display: {e}")
+    root.withdraw()
+    # Dialogs would block the run; the scenarios never expect one
+    messagebox.showinfo = messagebox.showwarning = messagebox.showerror = lambda *args, **kwargs: None
+
+    def run(func):
+        def call():
+            func()
+            root.update_idletasks()  # Count the Treeview layout, not only the inserts
+        return call
+
+    try:
+        app = JobSearchApp(root, db_path=context.db_path)
+        results = [summarize('ui_load_jobs', timed(run(app.load_jobs), context.repeat))]
+        for column in SORT_EXPRESSIONS:
+            results.append(summarize(f'ui_sort_column[{column}]',
+                                     timed(run(lambda: app.sort_column(column)), context.repeat)))
+
+        app.load_jobs()
+        app.tree.selection_set(app.tree.get_children()[0])
+        results.append(summarize('ui_toggle_check', timed(run(app.toggle_check), context.repeat * 5)))
+        return results
+    finally:
+        root.destroy()
+
+SCENARIOS = {
+    'save': bench_save_to_database,
+    'parsing': bench_parsing,
+    'http': bench_http_fetcher,
+    'selenium': bench_selenium_extractors,
+    'browser_profiles': bench_browser_profiles,
+    'queries': bench_queries,
+    'relevance': bench_relevance,
+    'ui': bench_ui,
+}
+
+# --- Running and reporting ------------------------------------------------------
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', 'HEAD'], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def run_suite(context, names):
+    results = []
+    for name in names:
+        print(f"Running {name}...", file=sys.stderr)
+        try:
+            results.extend(SCENARIOS[name](context))
+        except Skipped as e:
+            results.append({'name': name, 'status': 'skipped', 'reason': str(e)})
+    return results
+
+def compare(results, baseline, threshold):
+    """Prints the change of each median against a previous run. Returns the regressed names."""
+    previous = {result['name']: result for result in baseline['results'] if result['status'] == 'ok'}
+    regressions = []
+    for result in results:
+        before = previous.get(result['name'])
+        if result['status'] != 'ok' or before is None:
+            continue
+        change = result['median_ms'] / before['median_ms'] - 1 if before['median_ms'] else 0
+        flag = ""
+        if change > threshold:
+            flag = "  REGRESSION"
+            regressions.append(result['name'])
+        print(f"{result['name']:<40} {before['median_ms']:10.3f} -> {result['median_ms']:10.3f} ms  {change:+7.1%}{flag}")
+    return regressions
+
+def print_results(results):
+    for result in results:
+        if result['status'] == 'ok':
+            transfer = f"  {result['bytes_per_card'] / 1024:8.1f} KB/card" if 'bytes_per_card' in result else ""
+            print(f"{result['name']:<40} median {result['median_ms']:10.3f} ms  p95 {result['p95_ms']:10.3f} ms  "
+                  f"({result['runs']} runs x {result['items_per_run']}){transfer}")
+        else:
+            print(f"{result['name']:<40} skipped: {result['reason']}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the offline benchmark suite.")
+    parser.add_argument('--rows', type=int, default=20000, help="Jobs in the synthetic database")
+    parser.add_argument('--description-size', type=int, default=2700, help="Average description length")
+    parser.add_argument('--save-rows', type=int, default=2000, help="Jobs saved by the save_to_database scenario")
+    parser.add_argument('--repeat', type=int, default=20, help="Timed runs per scenario (some use a multiple)")
+    parser.add_argument('--scenarios', nargs='+', choices=list(SCENARIOS), default=list(SCENARIOS))
+    parser.add_argument('--output', help="Write the results as JSON to this file")
+    parser.add_argument('--compare', help="JSON results of a previous run to compare against")
+    parser.add_argument('--threshold', type=float, default=0.2,
+                        help="Relative slowdown of a median reported as a regression")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        args.tmp = tmp
+        args.db_path = os.path.join(tmp, 'jobs.db')
+        print(f"Generating {args.rows} synthetic jobs...", file=sys.stderr)
+        generate_database(args.db_path, args.rows, args.description_size)
+        results = run_suite(args, args.scenarios)
+
+    report = {
+        'created': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'git_commit': git_commit(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'parameters': {'rows': args.rows, 'description_size': args.description_size,
+                       'save_rows': args.save_rows, 'repeat': args.repeat},
+        'results': results,
+    }
+    print_results(results)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as f:
+            baseline = json.load(f)
+        if compare(results, baseline, args.threshold):
+            sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+"""Synthetic job data shaped like what the scraper stores.
+
+Descriptions default to about 2.7 KB, the average of the real database, and vary
+around that size; salaries and locations use the formats Indeed France shows.
+"""
+import random
+from database import Database
+from dedup import fingerprint
+from salary import salary_columns
+
+WORDS = ("développeur", "fullstack", "web", "ingénieur", "logiciel", "react", "python", "java",
+         "node", "senior", "junior", "cloud", "data", "devops", "paris", "H/F", "CDI", "stage",
+         "équipe", "projet", "expérience", "compétences", "télétravail", "agile", "API", "sécurité")
+
+LOCATIONS = ["Paris (75)", "92100 Boulogne-Billancourt", "Nanterre (92)", "Lyon (69)", "Télétravail",
+             "Île-de-France", "La Défense (92)", "Montreuil (93)"]
+
+SALARIES = ["De {low} 000 € à {high} 000 € par an - CDI, Temps plein",
+            "À partir de {low} 000 € par an - CDI",
+            "De {day_low} € à {day_high} € par jour - Indépendant / freelance",
+            "CDI, Temps plein",
+            "Stage",
+            None]
+
+def synthetic_jobs(count, description_size=2700, seed=42):
+    """Generates distinct job dicts with descriptions of about description_size characters
+    (uniformly between half and one and a half times that size)."""
+    rng = random.Random(seed)
+    for i in range(count):
+        title = " ".join(rng.choice(WORDS) for _ in range(4)) + f" #{i}"
+        target = rng.randint(description_size // 2, description_size * 3 // 2)
+        words = []
+        length = 0
+        while length < target:
+            word = rng.choice(WORDS)
+            words.append(word)
+            length += len(word) + 1
+            if rng.random() < 0.02:
+                words.append("\n\n")  # Paragraph breaks, like the real descriptions
+        low = rng.randint(30, 55)
+        day_low = rng.randint(35, 55) * 10
+        salary = rng.choice(SALARIES)
+        yield {
+            'title': title,
+            'location': rng.choice(LOCATIONS),
+            'salary': salary.format(low=low, high=low + rng.randint(5, 25), day_low=day_low,
+                                    day_high=day_low + 50) if salary else None,
+            'advantages': "Titre-restaurant\nTélétravail possible\nRTT",
+            'description': " ".join(words),
+            'job_key': f"{seed:04x}{i:012x}",
+        }
+
+def generate_database(db_path, rows, description_size=2700, seed=42, batch_size=5000):
+    """Creates (or extends) a jobs database with rows synthetic jobs. Returns the row count."""
+    database = Database(db_path)
+    try:
+        batch = []
+        for job in synthetic_jobs(rows, description_size, seed):
+            batch.append((job['title'], job['location'], job['salary'], job['advantages'], job['description'],
+                          fingerprint(job), job['job_key']) + salary_columns(job['salary']))
+            if len(batch) >= batch_size:
+                database.insert_jobs(batch)
+                batch = []
+        database.insert_jobs(batch)
+        return database.count_jobs()
+    finally:
+        database.close()
@@ -0,0 +1,87 @@
+import logging
+import os
+from selenium.webdriver.chrome.options import Options
+
+USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/94.0.4606.61 Safari/537.36"
+
+# Hosts a lean profile may still reach: Indeed itself, the CAPTCHA providers it uses, and
+# local fixture servers
+ALLOWED_HOSTS = ('indeed.fr', '*.indeed.fr', 'indeed.com', '*.indeed.com', '*.cloudflare.com', '*.hcaptcha.com',
+                 'localhost', '127.0.0.1')
+
+# Subresources the scraper never reads: images, fonts, audio and video
+IMAGE_EXTENSIONS = ('png', 'jpg', 'jpeg', 'gif', 'webp', 'avif', 'svg', 'ico')
+BLOCKED_EXTENSIONS = ('woff', 'woff2', 'ttf', 'otf', 'mp4', 'webm', 'mp3', 'ogg')
+
+class BrowserProfile:
+    """Chrome settings used by JobScraper.
+
+    The default profile keeps a visible window, since CAPTCHAs are solved by hand, but
+    loads only what the scraper reads: fonts and media are blocked, requests to hosts
+    outside allowed_hosts fail at name resolution (ads, trackers, analytics), and the
+    'eager' page load strategy returns as soon as the DOM is ready instead of waiting
+    for every subresource. Images are only blocked in headless profiles: with a window,
+    the user may have to solve an image CAPTCHA, which cannot render without them.
+    BrowserProfile.full() gives the unrestricted browser.
+
+    The chromedriver path defaults to the CHROMEDRIVER_PATH environment variable; when
+    neither is set, Selenium Manager finds or downloads a driver.
+    """
+
+    def __init__(self, headless=False, block_resources=True, block_third_party=True, page_load_strategy='eager',
+                 driver_path=None, allowed_hosts=ALLOWED_HOSTS, user_agent=USER_AGENT, window_size=(1920, 1080)):
+        self.headless = headless
+        self.block_resources = block_resources
+        self.block_third_party = block_third_party
+        self.page_load_strategy = page_load_strategy
+        self.driver_path = driver_path or os.environ.get('CHROMEDRIVER_PATH')
+        self.allowed_hosts = allowed_hosts
+        self.user_agent = user_agent
+        self.window_size = window_size  # The results page only shows the side pane on wide windows
+
+    @classmethod
+    def full(cls, **settings):
+        """A profile that loads pages like a regular browser."""
+        return cls(block_resources=False, block_third_party=False, page_load_strategy='normal', **settings)
+
+    @property
+    def block_images(self):
+        """Images are blocked only when nobody can be asked to solve a CAPTCHA."""
+        return self.block_resources and self.headless
+
+    @property
+    def ready_states(self):
+        """document.readyState values at which a navigation counts as done."""
+        if self.page_load_strategy == 'normal':
+            return ('complete',)
+        return ('interactive', 'complete')
+
+    def chrome_options(self):
+        """Builds the Chrome options of this profile."""
+        options = Options()
+        options.add_argument("--no-sandbox")
+        options.add_argument("--disable-dev-shm-usage")
+        options.add_argument(f"user-agent={self.user_agent}")
+        options.add_argument(f"--window-size={self.window_size[0]},{self.window_size[1]}")
+        options.page_load_strategy = self.page_load_strategy
+        if self.headless:
+            options.add_argument("--headless=new")
+        if self.block_images:
+            options.add_experimental_option('prefs', {'profile.managed_default_content_settings.images': 2})
+        if self.block_third_party:
+            rules = ', '.join(['MAP * ~NOTFOUND'] + [f'EXCLUDE {host}' for host in self.allowed_hosts])
+            options.add_argument(f"--host-resolver-rules={rules}")
+        return options
+
+    def apply(self, driver):
+        """Blocks the subresources of this profile in the current tab (run again for each new tab)."""
+        if not self.block_resources:
+            return
+        extensions = BLOCKED_EXTENSIONS + (IMAGE_EXTENSIONS if self.block_images else ())
+        patterns = [pattern for extension in extensions for pattern in (f'*.{extension}', f'*.{extension}?*')]
+        try:
+            driver.execute_cdp_cmd('Network.enable', {})
+            driver.execute_cdp_cmd('Network.setBlockedURLs', {'urls': patterns})
+        except Exception as e:
+            # Images stay blocked by the content setting, if they are; only fonts and media get through
+            logging.warning(f"Could not block subresources through DevTools: {e.__class__.__name__}")
@@ -0,0 +1,75 @@
+import logging
+
+def crawl_id(kind, search_terms, location_terms):
+    """Identifies a crawl by how it runs and what it searches, so a rerun finds its checkpoint."""
+    return f"{kind}|{' / '.join(search_terms)}|{location_terms}"
+
+class CrawlCheckpoint:
+    """Progress of one crawl, kept in the database so an interrupted crawl can resume.
+
+    The crawl saves its position (a JSON-serializable state dict, such as the results
+    page it is on or its pending tasks) at each results page boundary, together with
+    the job keys it finished since the previous save. A scraped job key is held back
+    until the caller has flushed the scraped jobs and called mark_stored(), so a job key
+    is only recorded as done once its job is stored.
+
+    Failed attempts are counted across runs, per job key for job pages and per URL
+    for results pages; after max_attempts the page is given up on (treated as done) so
+    a page that always fails cannot stall the crawl.
+    """
+
+    def __init__(self, database, crawl_id, max_attempts=3, resume=True):
+        self.database = database
+        self.crawl_id = crawl_id
+        self.max_attempts = max_attempts
+        if not resume:
+            database.finish_crawl(crawl_id)
+
+        self.state = database.load_crawl_state(crawl_id)  # None unless resuming
+        self.done_keys, self.failures = database.crawl_job_keys(crawl_id)
+        self.scraped_keys = set()  # Scraped, but not known to be stored yet
+        self.new_done_keys = set()  # Done since the last save
+        if self.state is not None:
+            logging.info(f"Resuming crawl '{crawl_id}': {len(self.done_keys)} jobs already done.")
+
+    def is_done(self, key):
+        """Checks if a job (or results page URL) was scraped, or given up on, by this crawl."""
+        return (key in self.done_keys or key in self.scraped_keys
+                or self.failures.get(key, 0) >= self.max_attempts)
+
+    def attempts_left(self, key):
+        return self.max_attempts - self.failures.get(key, 0)
+
+    def mark_done(self, job_key):
+        """Records a scraped job; it counts as done once mark_stored() confirms it was written."""
+        if job_key:
+            self.scraped_keys.add(job_key)
+
+    def mark_stored(self):
+        """Marks the jobs scraped so far as done. Call after successfully flushing them."""
+        self.done_keys |= self.scraped_keys
+        self.new_done_keys |= self.scraped_keys
+        self.scraped_keys = set()
+
+    def record_failure(self, key):
+        """Counts a failed attempt at a job key or results page URL. Returns the number of
+        failed attempts so far."""
+        if not key:
+            return self.max_attempts  # Cannot be tracked, so it is not retried
+        self.failures[key] = self.database.record_crawl_failure(self.crawl_id, key)
+        if self.failures[key] >= self.max_attempts:
+            logging.warning(f"Giving up on {key} after {self.failures[key]} failed attempts.")
+        return self.failures[key]
+
+    def save(self, **state):
+        """Saves the crawl position and the jobs done since the previous save."""
+        self.database.save_crawl_state(self.crawl_id, state, self.new_done_keys)
+        self.state = state
+        self.new_done_keys = set()
+
+    def finish(self):
+        """Forgets the crawl once it has completed, so the next run starts over."""
+        self.database.finish_crawl(self.crawl_id)
+        self.state = None
+        self.done_keys, self.failures, self.scraped_keys, self.new_done_keys = set(), {}, set(), set()
+        logging.info(f"Crawl '{self.crawl_id}' completed.")
@@ -0,0 +1,67 @@
+import collections
+import re
+import zlib
+
+DICTIONARY_SIZE = 32 * 1024  # zlib only looks back 32 KB, so a larger dictionary is wasted
+COMPRESSION_LEVEL = 9
+MIN_SEGMENT_LENGTH = 8
+
+SEGMENT_PATTERN = re.compile(r'(?<=[.!?:;\n])\s+')
+WORD_PATTERN = re.compile(r'\w{4,}')
+
+def train_dictionary(texts, size=DICTIONARY_SIZE):
+    """Builds a zlib preset dictionary from sample texts.
+
+    Job postings repeat whole sentences (company blurbs, diversity statements, benefit
+    lists), so sentences found in several texts are picked first, by bytes saved, then
+    frequent words fill the remaining space. The most useful content goes last, where
+    zlib can reach it with the shortest distances.
+    """
+    segment_counts = collections.Counter()
+    word_counts = collections.Counter()
+    for text in texts:
+        if not text:
+            continue
+        segment_counts.update({segment.strip() for segment in SEGMENT_PATTERN.split(text)
+                               if len(segment.strip()) >= MIN_SEGMENT_LENGTH})
+        word_counts.update(set(WORD_PATTERN.findall(text)))
+
+    candidates = sorted(((count - 1) * len(segment.encode('utf-8')), segment)
+                        for segment, count in segment_counts.items() if count >= 2)
+    segments = []
+    used = 0
+    for _, segment in reversed(candidates):
+        length = len(segment.encode('utf-8')) + 1
+        if used + length <= size:
+            segments.append(segment)
+            used += length
+
+    words = []
+    for word, count in word_counts.most_common():
+        length = len(word.encode('utf-8')) + 1
+        if count < 3 or used + length > size:
+            break
+        words.append(word)
+        used += length
+
+    return (' '.join(reversed(words)) + '\n' + '\n'.join(reversed(segments))).encode('utf-8')
+
+def compress_text(text, dictionary=None):
+    """Compresses a text with zlib, using the preset dictionary if given. None stays None."""
+    if text is None:
+        return None
+    if dictionary:
+        compressor = zlib.compressobj(COMPRESSION_LEVEL, zdict=dictionary)
+    else:
+        compressor = zlib.compressobj(COMPRESSION_LEVEL)
+    return compressor.compress(text.encode('utf-8')) + compressor.flush()
+
+def decompress_text(blob, dictionary=None):
+    """Reverses compress_text; the same dictionary must be given."""
+    if blob is None:
+        return None
+    if dictionary:
+        decompressor = zlib.decompressobj(zdict=dictionary)
+    else:
+        decompressor = zlib.decompressobj()
+    return (decompressor.decompress(blob) + decompressor.flush()).decode('utf-8')
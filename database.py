@@ -1,59 +1,724 @@
+import json
+import logging
 import sqlite3
+import threading
+from contextlib import contextmanager
+from dedup import fingerprint
+from salary import parse_salary_value, salary_columns, SALARY_COLUMNS
+from search import create_search_index, index_jobs, unindex_jobs, search_jobs, search_snippets
+from compression import train_dictionary, compress_text, decompress_text
+
+PREVIEW_LENGTH = 150  # Characters of description/advantages kept in the jobs table for the list
+
+# Full texts live compressed in job_texts; the list only reads the previews
+JOB_LIST_COLUMNS = "id, title, location, salary, advantages_preview, description_preview, checked"
+
+# Fields of a job in bulk exports (see job_transfer.py), full texts included
+EXPORT_COLUMNS = ['id', 'title', 'location', 'salary', 'advantages', 'description', 'checked', 'job_key',
+                  'scraped_at'] + SALARY_COLUMNS
+
+# SQL sort expression per UI column, each matching an index created by the migrations;
+# salary sorts on the parsed yearly amount.
+SORT_EXPRESSIONS = {
+    "ID": "id",
+    "Title": "title",
+    "Location": "location",
+    "Salary": "coalesce(salary_value, -1)",
+    "Advantages": "coalesce(advantages_preview, '')",
+    "Description": "coalesce(description_preview, '')",
+    "Checked": "coalesce(checked, 0)",
+}
+
+# Tuned for a write-in-batches, read-often workload on a single machine
+PRAGMAS = [
+    'PRAGMA journal_mode=WAL',  # Readers (the UI) are not blocked by the scraper's writes
+    'PRAGMA synchronous=NORMAL',  # Safe with WAL, avoids an fsync per transaction
+    'PRAGMA temp_store=MEMORY',  # Sorts without an index happen in memory
+    'PRAGMA cache_size=-32000',  # 32 MB page cache
+    'PRAGMA mmap_size=268435456',  # Read pages through a 256 MB memory map
+    'PRAGMA busy_timeout=5000',  # Wait for another connection's write instead of failing
+]
+
+# A text dictionary is trained once this many jobs are stored, and retrained each time
+# the number of jobs has grown fourfold since. Retraining is a maintenance step run
+# when a JobStore closes, never on the insert path: stored texts keep the dictionary
+# they were compressed with until recompress_texts() moves them to the current one.
+TRAINING_MIN_TEXTS = 100
+TRAINING_GROWTH = 4
+TRAINING_SAMPLE = 2000  # Most recent texts used to train a dictionary
+
+def text_preview(text):
+    """Returns the list preview of a description or advantages text."""
+    if text is None:
+        return None
+    return text[:PREVIEW_LENGTH].replace('\n', ' ')
+
+def table_columns(connection, table):
+    return [row[1] for row in connection.execute(f'PRAGMA table_info({table})')]
+
+def job_search_texts(connection, job_ids=None):
+    """Yields (id, title, location, advantages, description) of the given jobs (all by
+    default) in id order, texts decompressed: what the search index holds for each job."""
+    where = f"WHERE j.id IN ({','.join('?' * len(job_ids))})" if job_ids is not None else ''
+    dictionaries = {None: None}
+    rows = connection.execute(f'''SELECT j.id, j.title, j.location, t.dict_id, t.advantages, t.description
+                                  FROM jobs j LEFT JOIN job_texts t ON t.job_id = j.id
+                                  {where} ORDER BY j.id''', list(job_ids or ()))
+    for job_id, title, location, dict_id, advantages, description in rows:
+        if dict_id not in dictionaries:
+            dictionaries[dict_id] = connection.execute('SELECT dictionary FROM text_dictionaries WHERE id = ?',
+                                                       (dict_id,)).fetchone()[0]
+        dictionary = dictionaries[dict_id]
+        yield job_id, title, location, decompress_text(advantages, dictionary), decompress_text(description, dictionary)
+
+def migrate_base_table(connection):
+    """Creates the jobs table; adds the checked column to tables created by the old scraper schema."""
+    connection.execute('''CREATE TABLE IF NOT EXISTS jobs (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        title TEXT NOT NULL,
+        location TEXT NOT NULL,
+        salary TEXT,
+        advantages TEXT,
+        description TEXT,
+        checked BOOLEAN DEFAULT 0
+    )''')
+    if 'checked' not in table_columns(connection, 'jobs'):
+        connection.execute('ALTER TABLE jobs ADD COLUMN checked BOOLEAN DEFAULT 0')
+
+def migrate_fingerprints(connection):
+    """Adds the content fingerprint used for deduplication, replacing the title-only dedup_key."""
+    columns = table_columns(connection, 'jobs')
+    if 'dedup_key' in columns:
+        connection.execute('DROP INDEX IF EXISTS idx_jobs_dedup_key')
+        connection.execute('ALTER TABLE jobs DROP COLUMN dedup_key')
+    if 'fingerprint' not in columns:
+        connection.execute('ALTER TABLE jobs ADD COLUMN fingerprint TEXT')
+
+        # Later copies of a duplicate keep NULL so the unique index can be created
+        seen = set()
+        updates = []
+        rows = connection.execute('SELECT id, title, location, salary, description FROM jobs ORDER BY id')
+        for job_id, title, location, salary, description in rows:
+            key = fingerprint({'title': title, 'location': location, 'salary': salary, 'description': description})
+            if key not in seen:
+                seen.add(key)
+                updates.append((key, job_id))
+        connection.executemany('UPDATE jobs SET fingerprint = ? WHERE id = ?', updates)
+    connection.execute('CREATE UNIQUE INDEX IF NOT EXISTS idx_jobs_fingerprint ON jobs(fingerprint)')
+
+def migrate_job_keys(connection):
+    """Adds Indeed's job key ("jk") used by the incremental crawl."""
+    if 'job_key' not in table_columns(connection, 'jobs'):
+        connection.execute('ALTER TABLE jobs ADD COLUMN job_key TEXT')
+    connection.execute('CREATE INDEX IF NOT EXISTS idx_jobs_job_key ON jobs(job_key)')
+
+def migrate_sorting(connection):
+    """Adds the numeric salary column and the indexes behind SORT_EXPRESSIONS."""
+    if 'salary_value' not in table_columns(connection, 'jobs'):
+        connection.execute('ALTER TABLE jobs ADD COLUMN salary_value REAL')  # Yearly lower bound in euros
+        rows = connection.execute('SELECT id, salary FROM jobs WHERE salary IS NOT NULL').fetchall()
+        connection.executemany('UPDATE jobs SET salary_value = ? WHERE id = ?',
+                               [(parse_salary_value(salary), job_id) for job_id, salary in rows])
+    connection.execute('CREATE INDEX IF NOT EXISTS idx_jobs_title ON jobs(title)')
+    connection.execute('CREATE INDEX IF NOT EXISTS idx_jobs_location ON jobs(location)')
+    connection.execute('CREATE INDEX IF NOT EXISTS idx_jobs_salary_value ON jobs(coalesce(salary_value, -1))')
+    connection.execute('CREATE INDEX IF NOT EXISTS idx_jobs_checked ON jobs(coalesce(checked, 0))')
+
+def migrate_search_index(connection):
+    """Adds the jobs_fts full-text index over the jobs text columns, kept in sync by triggers.
+
+    migrate_text_storage drops it when the texts move to job_texts, and
+    migrate_contentless_search_index creates the index used since.
+    """
+    statements = [
+        '''CREATE VIRTUAL TABLE IF NOT EXISTS jobs_fts USING fts5(
+            title, location, advantages, description,
+            content='jobs', content_rowid='id',
+            tokenize='unicode61 remove_diacritics 2'
+        )''',
+        '''CREATE TRIGGER IF NOT EXISTS jobs_fts_insert AFTER INSERT ON jobs BEGIN
+            INSERT INTO jobs_fts (rowid, title, location, advantages, description)
+            VALUES (new.id, new.title, new.location, new.advantages, new.description);
+        END''',
+        '''CREATE TRIGGER IF NOT EXISTS jobs_fts_delete AFTER DELETE ON jobs BEGIN
+            INSERT INTO jobs_fts (jobs_fts, rowid, title, location, advantages, description)
+            VALUES ('delete', old.id, old.title, old.location, old.advantages, old.description);
+        END''',
+        '''CREATE TRIGGER IF NOT EXISTS jobs_fts_update AFTER UPDATE OF title, location, advantages, description ON jobs BEGIN
+            INSERT INTO jobs_fts (jobs_fts, rowid, title, location, advantages, description)
+            VALUES ('delete', old.id, old.title, old.location, old.advantages, old.description);
+            INSERT INTO jobs_fts (rowid, title, location, advantages, description)
+            VALUES (new.id, new.title, new.location, new.advantages, new.description);
+        END''',
+        "INSERT INTO jobs_fts (jobs_fts) VALUES ('rebuild')",  # Index the rows that already exist
+    ]
+    for statement in statements:
+        connection.execute(statement)
+
+def migrate_near_duplicate_tables(connection):
+    """Adds the MinHash signature and LSH bucket tables used by near-duplicate detection."""
+    connection.execute('''CREATE TABLE IF NOT EXISTS job_minhash (
+        job_id INTEGER PRIMARY KEY,
+        signature BLOB NOT NULL
+    )''')
+    connection.execute('''CREATE TABLE IF NOT EXISTS job_lsh (
+        band INTEGER NOT NULL,
+        bucket INTEGER NOT NULL,
+        job_id INTEGER NOT NULL
+    )''')
+    connection.execute('CREATE INDEX IF NOT EXISTS idx_job_lsh_bucket ON job_lsh(band, bucket)')
+
+def migrate_scraped_at(connection):
+    """Adds the time each job was saved; rows saved before this migration keep NULL."""
+    if 'scraped_at' not in table_columns(connection, 'jobs'):
+        connection.execute('ALTER TABLE jobs ADD COLUMN scraped_at TEXT')
+    connection.execute('CREATE INDEX IF NOT EXISTS idx_jobs_scraped_at ON jobs(scraped_at)')
+
+def migrate_salary_fields(connection):
+    """Adds the typed salary columns and fills them for existing jobs in one executemany."""
+    columns = table_columns(connection, 'jobs')
+    for name, sql_type in [('salary_min', 'REAL'), ('salary_max', 'REAL'), ('salary_period', 'TEXT'),
+                           ('salary_currency', 'TEXT'), ('contract_type', 'TEXT')]:
+        if name not in columns:
+            connection.execute(f'ALTER TABLE jobs ADD COLUMN {name} {sql_type}')
+
+    # salary_value is recomputed too: the parser now understands "de l'heure" and "Jusqu'à"
+    rows = connection.execute('SELECT id, salary FROM jobs WHERE salary IS NOT NULL').fetchall()
+    assignments = ', '.join(f'{column} = ?' for column in SALARY_COLUMNS)
+    connection.executemany(f'UPDATE jobs SET {assignments} WHERE id = ?',
+                           [salary_columns(salary) + (job_id,) for job_id, salary in rows])
+    connection.execute('CREATE INDEX IF NOT EXISTS idx_jobs_contract_type ON jobs(contract_type)')
+
+def migrate_text_storage(connection):
+    """Moves descriptions and advantages out of jobs into compressed job_texts rows.
+
+    The jobs table keeps a short preview of each for the list. A zlib preset dictionary
+    is trained on the existing texts when there are enough of them.
+    """
+    connection.execute('''CREATE TABLE IF NOT EXISTS text_dictionaries (
+        id INTEGER PRIMARY KEY,
+        dictionary BLOB NOT NULL,
+        trained_on INTEGER NOT NULL,  -- Number of stored jobs when the dictionary was trained
+        created_at TEXT
+    )''')
+    connection.execute('''CREATE TABLE IF NOT EXISTS job_texts (
+        job_id INTEGER PRIMARY KEY,
+        dict_id INTEGER,  -- text_dictionaries.id, NULL for plain zlib
+        advantages BLOB,
+        description BLOB
+    )''')
+
+    columns = table_columns(connection, 'jobs')
+    for name in ('advantages_preview', 'description_preview'):
+        if name not in columns:
+            connection.execute(f'ALTER TABLE jobs ADD COLUMN {name} TEXT')
+
+    if 'description' in columns:
+        rows = connection.execute('SELECT id, advantages, description FROM jobs').fetchall()
+        dict_id = dictionary = None
+        if len(rows) >= TRAINING_MIN_TEXTS:
+            dictionary = train_dictionary([text for row in rows[-TRAINING_SAMPLE:] for text in row[1:]])
+            dict_id = connection.execute('''INSERT INTO text_dictionaries (dictionary, trained_on, created_at)
+                                            VALUES (?, ?, datetime('now'))''', (dictionary, len(rows))).lastrowid
+        connection.executemany('INSERT OR REPLACE INTO job_texts (job_id, dict_id, advantages, description) '
+                               'VALUES (?, ?, ?, ?)',
+                               [(job_id, dict_id, compress_text(advantages, dictionary),
+                                 compress_text(description, dictionary)) for job_id, advantages, description in rows])
+        connection.executemany('UPDATE jobs SET advantages_preview = ?, description_preview = ? WHERE id = ?',
+                               [(text_preview(advantages), text_preview(description), job_id)
+                                for job_id, advantages, description in rows])
+
+        # The search index over these columns and its triggers go first
+        for trigger in ('jobs_fts_insert', 'jobs_fts_update', 'jobs_fts_delete'):
+            connection.execute(f'DROP TRIGGER IF EXISTS {trigger}')
+        connection.execute('DROP TABLE IF EXISTS jobs_fts')
+        connection.execute('ALTER TABLE jobs DROP COLUMN advantages')
+        connection.execute('ALTER TABLE jobs DROP COLUMN description')
+
+    connection.execute("CREATE INDEX IF NOT EXISTS idx_jobs_advantages_preview ON jobs(coalesce(advantages_preview, ''))")
+    connection.execute("CREATE INDEX IF NOT EXISTS idx_jobs_description_preview ON jobs(coalesce(description_preview, ''))")
+
+def migrate_crawl_state(connection):
+    """Adds the tables where crawls checkpoint their progress (see checkpoint.CrawlCheckpoint)."""
+    connection.execute('''CREATE TABLE IF NOT EXISTS crawl_state (
+        crawl_id TEXT PRIMARY KEY,
+        state TEXT NOT NULL,  -- JSON: results page to resume from, pending tasks, ...
+        updated_at TEXT
+    )''')
+    connection.execute('''CREATE TABLE IF NOT EXISTS crawl_job_keys (
+        crawl_id TEXT NOT NULL,
+        job_key TEXT NOT NULL,
+        done INTEGER NOT NULL DEFAULT 0,
+        attempts INTEGER NOT NULL DEFAULT 0,  -- Failed attempts
+        PRIMARY KEY (crawl_id, job_key)
+    ) WITHOUT ROWID''')
+
+def migrate_contentless_search_index(connection):
+    """Rebuilds the search index as a contentless FTS5 table that Database keeps in sync
+    (see search.create_search_index).
+
+    It replaces the index created by earlier builds, which read the texts through a
+    view and triggers calling job_text(), a function only registered by Database: other
+    SQLite clients failed on that schema. Deleting a job from any connection still
+    removes its texts and signature, through a plain SQL trigger.
+    """
+    create_search_index(connection, job_search_texts(connection))
+    connection.execute('''CREATE TRIGGER IF NOT EXISTS jobs_delete_texts AFTER DELETE ON jobs BEGIN
+        DELETE FROM job_texts WHERE job_id = old.id;
+        DELETE FROM job_minhash WHERE job_id = old.id;
+    END''')
+
+# Forward migrations; the database is at version N once the first N have run. Each one
+# also checks the current schema, so databases created by earlier, unversioned builds
+# (which may already have some of these columns) migrate cleanly, and running one
+# again is harmless.
+MIGRATIONS = [
+    migrate_base_table,
+    migrate_fingerprints,
+    migrate_job_keys,
+    migrate_sorting,
+    migrate_search_index,
+    migrate_near_duplicate_tables,
+    migrate_scraped_at,
+    migrate_salary_fields,
+    migrate_text_storage,
+    migrate_crawl_state,
+    migrate_contentless_search_index,
+]
+
+# Migrations that free a lot of space; the file is vacuumed after them
+VACUUM_AFTER = {migrate_text_storage}
 
 class Database:
-    def __init__(self, db_name='jobs.db'):
-        self.connection = sqlite3.connect(db_name)
-        self.create_jobs_table()
+    """The single access layer to jobs.db, used by the scraper and the UI.
+
+    Holds one long-lived connection, brings the schema up to date on open, and exposes
+    the queries the rest of the application needs. The connection may be shared between
+    threads; statements are serialized by a lock. The connection is in autocommit mode
+    (isolation_level=None): writes that belong together go through transaction().
+    """
+
+    def __init__(self, db_name='data/jobs.db'):
+        self.db_name = db_name
+        self.connection = sqlite3.connect(db_name, check_same_thread=False, isolation_level=None)
+        self.lock = threading.RLock()
+        self.dictionaries = {}  # text_dictionaries.id -> dictionary bytes, loaded on first use
+        for pragma in PRAGMAS:
+            self.connection.execute(pragma)
+        # Decompresses job_texts blobs in the queries below; the schema itself never calls it
+        self.connection.create_function('job_text', 2, self.expand_text, deterministic=True)
+        self.migrate()
+
+    @contextmanager
+    def transaction(self):
+        """Runs a block of statements in one transaction, holding the connection lock.
+
+        BEGIN IMMEDIATE takes the write lock up front, so another connection writing at
+        the same time makes this wait (up to busy_timeout) instead of failing halfway.
+        """
+        with self.lock:
+            self.connection.execute('BEGIN IMMEDIATE')
+            try:
+                yield self.connection
+            except BaseException:
+                self.connection.rollback()
+                raise
+            self.connection.commit()
+
+    def query(self, sql, params=()):
+        """Runs a read query and returns all rows."""
+        with self.lock:
+            return self.connection.execute(sql, params).fetchall()
+
+    def schema_version(self):
+        """Returns the number of migrations applied to this database."""
+        self.connection.execute('CREATE TABLE IF NOT EXISTS schema_version (version INTEGER NOT NULL)')
+        return self.connection.execute('SELECT coalesce(max(version), 0) FROM schema_version').fetchone()[0]
+
+    def migrate(self):
+        """Applies the pending migrations, each in its own transaction.
+
+        The version is read again once the transaction holds the write lock, so when two
+        processes open an old database at the same time, the second one waits for the
+        first one's migration and then skips it.
+        """
+        with self.lock:
+            self.schema_version()  # Creates the schema_version table
+            while True:
+                with self.transaction() as connection:
+                    version = connection.execute('SELECT coalesce(max(version), 0) FROM schema_version').fetchone()[0]
+                    if version >= len(MIGRATIONS):
+                        break
+                    migration = MIGRATIONS[version]
+                    migration(connection)
+                    connection.execute('INSERT INTO schema_version (version) VALUES (?)', (version + 1,))
+                logging.info(f"Database migrated to version {version + 1} ({migration.__name__}).")
+                if migration in VACUUM_AFTER:
+                    self.connection.execute('VACUUM')  # Cannot run inside a transaction
+
+    # --- Text compression -------------------------------------------------------
+
+    def dictionary(self, dict_id):
+        """Returns a text dictionary by ID (None for texts compressed without one)."""
+        if dict_id is None:
+            return None
+        with self.lock:
+            if dict_id not in self.dictionaries:
+                row = self.connection.execute('SELECT dictionary FROM text_dictionaries WHERE id = ?',
+                                              (dict_id,)).fetchone()
+                self.dictionaries[dict_id] = row[0]
+            return self.dictionaries[dict_id]
+
+    def current_dictionary(self):
+        """Returns (id, trained_on) of the dictionary new texts are compressed with, or (None, 0)."""
+        with self.lock:
+            row = self.connection.execute('SELECT id, trained_on FROM text_dictionaries '
+                                          'ORDER BY id DESC LIMIT 1').fetchone()
+        return row or (None, 0)
+
+    def expand_text(self, dict_id, blob):
+        """The job_text(dict_id, blob) SQL function: decompresses a job_texts column."""
+        return decompress_text(blob, self.dictionary(dict_id))
+
+    def train_text_dictionary(self):
+        """Trains a new dictionary on the most recent texts; texts stored from now on use it."""
+        rows = self.query('SELECT dict_id, advantages, description FROM job_texts ORDER BY job_id DESC LIMIT ?',
+                          (TRAINING_SAMPLE,))
+        dictionary = train_dictionary([decompress_text(blob, self.dictionary(dict_id))
+                                       for dict_id, *blobs in rows for blob in blobs])
+        with self.transaction() as connection:
+            count = connection.execute('SELECT COUNT(*) FROM job_texts').fetchone()[0]
+            dict_id = connection.execute('''INSERT INTO text_dictionaries (dictionary, trained_on, created_at)
+                                            VALUES (?, ?, datetime('now'))''', (dictionary, count)).lastrowid
+        logging.info(f"Trained text dictionary {dict_id} on {count} jobs.")
+        return dict_id
+
+    def train_dictionary_if_due(self):
+        """Trains a new text dictionary if the database has grown enough since the last one.
+        Returns the new dictionary ID, or None."""
+        dict_id, trained_on = self.current_dictionary()
+        count = self.query('SELECT COUNT(*) FROM job_texts')[0][0]
+        if count >= TRAINING_MIN_TEXTS and (dict_id is None or count >= trained_on * TRAINING_GROWTH):
+            return self.train_text_dictionary()
+        return None
+
+    def recompress_texts(self, batch_size=1000):
+        """Recompresses the texts stored with an older dictionary (or none) with the current one,
+        one short transaction per batch so writers are never blocked for long. Returns the
+        number of jobs recompressed."""
+        dict_id = self.current_dictionary()[0]
+        if dict_id is None:
+            return 0
+        dictionary = self.dictionary(dict_id)
+        count = 0
+        last_id = 0
+        while True:
+            rows = self.query('''SELECT job_id, dict_id, advantages, description FROM job_texts
+                                  WHERE job_id > ? AND dict_id IS NOT ? ORDER BY job_id LIMIT ?''',
+                              (last_id, dict_id, batch_size))
+            if not rows:
+                break
+            updates = []
+            for job_id, old_dict_id, advantages, description in rows:
+                old_dictionary = self.dictionary(old_dict_id)
+                updates.append((dict_id, compress_text(decompress_text(advantages, old_dictionary), dictionary),
+                                compress_text(decompress_text(description, old_dictionary), dictionary), job_id,
+                                old_dict_id))
+            with self.transaction() as connection:
+                # The dict_id check skips rows another connection recompressed in the meantime
+                connection.executemany('''UPDATE job_texts SET dict_id = ?, advantages = ?, description = ?
+                                          WHERE job_id = ? AND dict_id IS ?''', updates)
+            count += len(rows)
+            last_id = rows[-1][0]
+        if count:
+            logging.info(f"Recompressed the texts of {count} jobs with dictionary {dict_id}.")
+        return count
 
     def create_jobs_table(self):
-        """Creates the jobs table with an additional 'checked' column for job status."""
-        with self.connection:
-            self.connection.execute('''
-                CREATE TABLE IF NOT EXISTS jobs (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    title TEXT NOT NULL,
-                    location TEXT NOT NULL,
-                    advantages TEXT NOT NULL,
-                    salary TEXT NOT NULL,
-                    description TEXT NOT NULL,
-                    checked INTEGER DEFAULT 0  -- This stores the checkbox state (0 = unchecked, 1 = checked)
-                )
-            ''')
+        """Creates the jobs table and everything else the application needs (kept for compatibility)."""
+        self.migrate()
+
+    # --- Writes -----------------------------------------------------------------
+
+    def insert_jobs(self, rows):
+        """Inserts jobs, skipping those whose fingerprint is already stored.
+
+        rows are (title, location, salary, advantages, description, fingerprint, job_key)
+        tuples followed by the SALARY_COLUMNS values (see salary.salary_columns).
+        Returns {fingerprint: id} for the rows actually inserted.
+        """
+        if not rows:
+            return {}
+        columns = ', '.join(['title', 'location', 'salary', 'advantages_preview', 'description_preview',
+                             'fingerprint', 'job_key'] + SALARY_COLUMNS)
+        placeholders = ', '.join('?' * len(rows[0]))
+        dict_id = self.current_dictionary()[0]
+        dictionary = self.dictionary(dict_id)
+
+        # Compressed before taking the lock; duplicates are compressed for nothing, but they are rare
+        texts = {}
+        search_texts = {}
+        job_rows = []
+        for row in rows:
+            advantages, description, key = row[3], row[4], row[5]
+            texts[key] = (compress_text(advantages, dictionary), compress_text(description, dictionary))
+            search_texts[key] = (row[0], row[1], advantages, description)
+            job_rows.append(row[:3] + (text_preview(advantages), text_preview(description)) + row[5:])
+
+        with self.transaction() as connection:
+            last_id = connection.execute('SELECT coalesce(max(id), 0) FROM jobs').fetchone()[0]
+            connection.executemany(f'''INSERT INTO jobs ({columns}, scraped_at)
+                                       VALUES ({placeholders}, datetime('now'))
+                                       ON CONFLICT(fingerprint) DO NOTHING''', job_rows)
+
+            # Rows that hit ON CONFLICT keep their older, smaller IDs
+            keys = list(texts)
+            placeholders = ','.join('?' * len(keys))
+            inserted = dict(connection.execute(
+                f'SELECT fingerprint, id FROM jobs WHERE id > ? AND fingerprint IN ({placeholders})',
+                [last_id] + keys).fetchall())
+            connection.executemany('INSERT INTO job_texts (job_id, dict_id, advantages, description) VALUES (?, ?, ?, ?)',
+                                   [(job_id, dict_id) + texts[key] for key, job_id in inserted.items()])
+            index_jobs(connection, [(job_id,) + search_texts[key] for key, job_id in inserted.items()])
+        return inserted
 
     def store_job_data(self, job_data):
-        """Inserts job data into the jobs table, ensuring no null values are stored."""
+        """Inserts one job, ensuring no null values are stored. Returns its ID, or None if it is a duplicate."""
         # Ensure no null values by replacing them with empty strings
         job_data = {
             'title': job_data.get('title', '') or '',
             'location': job_data.get('location', '') or '',
             'advantages': job_data.get('advantages', '') or '',
             'salary': job_data.get('salary', '') or '',
-            'description': job_data.get('description', '') or ''
+            'description': job_data.get('description', '') or '',
+            'job_key': job_data.get('job_key'),
         }
+        key = fingerprint(job_data)
+        inserted = self.insert_jobs([(job_data['title'], job_data['location'], job_data['salary'],
+                                      job_data['advantages'], job_data['description'], key,
+                                      job_data['job_key']) + salary_columns(job_data['salary'])])
+        return inserted.get(key)
 
-        with self.connection:
-            self.connection.execute('''
-                INSERT INTO jobs (title, location, advantages, salary, description)
-                VALUES (:title, :location, :advantages, :salary, :description)
-            ''', job_data)
+    def update_job(self, job_id, **fields):
+        """Changes the title, location, advantages or description of a job, keeping its
+        previews, fingerprint and search index entry in sync. Returns False if the job
+        does not exist."""
+        unknown = set(fields) - {'title', 'location', 'advantages', 'description'}
+        if unknown:
+            raise ValueError(f"Cannot update {', '.join(sorted(unknown))}")
+        dict_id = self.current_dictionary()[0]
+        dictionary = self.dictionary(dict_id)
+        with self.transaction() as connection:
+            rows = list(job_search_texts(connection, [job_id]))
+            if not rows:
+                return False
+            old = rows[0]
+            job = dict(zip(('title', 'location', 'advantages', 'description'), old[1:]), **fields)
+            job['salary'] = connection.execute('SELECT salary FROM jobs WHERE id = ?', (job_id,)).fetchone()[0]
+
+            unindex_jobs(connection, [old])
+            connection.execute('''UPDATE jobs SET title = ?, location = ?, advantages_preview = ?,
+                                  description_preview = ?, fingerprint = ? WHERE id = ?''',
+                               (job['title'], job['location'], text_preview(job['advantages']),
+                                text_preview(job['description']), fingerprint(job), job_id))
+            connection.execute('INSERT OR REPLACE INTO job_texts (job_id, dict_id, advantages, description) '
+                               'VALUES (?, ?, ?, ?)', (job_id, dict_id, compress_text(job['advantages'], dictionary),
+                                                       compress_text(job['description'], dictionary)))
+            index_jobs(connection, [(job_id, job['title'], job['location'], job['advantages'], job['description'])])
+        return True
+
+    def delete_jobs(self, job_ids):
+        """Deletes jobs with their texts, search index entries and near-duplicate signatures.
+        Returns the number of jobs deleted."""
+        if not job_ids:
+            return 0
+        placeholders = ','.join('?' * len(job_ids))
+        with self.transaction() as connection:
+            jobs = list(job_search_texts(connection, job_ids))
+            unindex_jobs(connection, jobs)
+            connection.execute(f'DELETE FROM job_lsh WHERE job_id IN ({placeholders})', list(job_ids))
+            # The jobs_delete_texts trigger removes the job_texts and job_minhash rows
+            connection.execute(f'DELETE FROM jobs WHERE id IN ({placeholders})', list(job_ids))
+        return len(jobs)
+
+    def rebuild_search_index(self):
+        """Reindexes every job, e.g. after jobs were edited through another connection."""
+        with self.transaction() as connection:
+            create_search_index(connection, job_search_texts(connection))
 
     def update_checkbox_state(self, job_id, checked_state):
         """Updates the checked state of a job entry by job ID."""
         # Convert True/False to 1/0 for saving in database
         checked_state_int = 1 if checked_state else 0
-        
-        with self.connection:
-            self.connection.execute('''
-                UPDATE jobs
-                SET checked = ?
-                WHERE id = ?
-            ''', (checked_state_int, job_id))
+
+        with self.transaction() as connection:
+            connection.execute('UPDATE jobs SET checked = ? WHERE id = ?', (checked_state_int, job_id))
+
+    def check_jobs_by_fingerprint(self, fingerprints):
+        """Marks the jobs with these fingerprints as checked, e.g. when importing an export."""
+        with self.transaction() as connection:
+            connection.executemany('UPDATE jobs SET checked = 1 WHERE fingerprint = ?', [(key,) for key in fingerprints])
+
+    def iter_jobs(self, batch_size=1000, after_id=0):
+        """Yields every job (with an ID above after_id) as a dict of EXPORT_COLUMNS, in id order.
+
+        Rows are read batch_size at a time with one keyset query per batch, so memory
+        stays bounded and the connection lock is released between batches.
+        """
+        columns = ', '.join(f'j.{column}' for column in SALARY_COLUMNS)
+        last_id = after_id
+        while True:
+            rows = self.query(f'''SELECT j.id, j.title, j.location, j.salary, job_text(t.dict_id, t.advantages),
+                                         job_text(t.dict_id, t.description), j.checked, j.job_key, j.scraped_at,
+                                         {columns}
+                                  FROM jobs j LEFT JOIN job_texts t ON t.job_id = j.id
+                                  WHERE j.id > ? ORDER BY j.id LIMIT ?''', (last_id, batch_size))
+            if not rows:
+                return
+            for row in rows:
+                yield dict(zip(EXPORT_COLUMNS, row))
+            last_id = rows[-1][0]
+
+    # --- Lookups used while scraping --------------------------------------------
+
+    def fingerprint_exists(self, key):
+        """Checks if a job with this fingerprint is stored."""
+        return bool(self.query('SELECT 1 FROM jobs WHERE fingerprint = ? LIMIT 1', (key,)))
+
+    def job_key_exists(self, job_key):
+        """Checks if a job with this Indeed job key is stored."""
+        return bool(self.query('SELECT 1 FROM jobs WHERE job_key = ? LIMIT 1', (job_key,)))
+
+    def job_keys(self):
+        """Returns the Indeed job keys of all stored jobs."""
+        return [row[0] for row in self.query('SELECT job_key FROM jobs WHERE job_key IS NOT NULL')]
+
+    def jobs_without_signature(self, after_id=0, limit=1000):
+        """Returns (id, description) of up to limit jobs above after_id not yet indexed for
+        near-duplicate detection, in id order."""
+        return self.query('''SELECT job_id, job_text(dict_id, description) FROM job_texts
+                              WHERE job_id > ? AND job_id NOT IN (SELECT job_id FROM job_minhash)
+                              ORDER BY job_id LIMIT ?''', (after_id, limit))
+
+    def store_signatures(self, signatures):
+        """Stores MinHash signatures and their LSH (band, bucket) pairs in one transaction.
+
+        signatures holds (job ID, signature blob, buckets) tuples of jobs without a
+        signature yet (job_lsh has no index on job_id to clear old buckets cheaply).
+        """
+        with self.transaction() as connection:
+            connection.executemany('INSERT INTO job_minhash (job_id, signature) VALUES (?, ?)',
+                                   [(job_id, blob) for job_id, blob, _ in signatures])
+            connection.executemany('INSERT INTO job_lsh (band, bucket, job_id) VALUES (?, ?, ?)',
+                                   [(band, bucket, job_id) for job_id, _, buckets in signatures
+                                    for band, bucket in buckets])
+
+    def signatures_in_buckets(self, buckets):
+        """Returns (job_id, signature blob) of the jobs sharing at least one LSH bucket."""
+        clauses = ' OR '.join(['(band = ? AND bucket = ?)'] * len(buckets))
+        params = [value for pair in buckets for value in pair]
+        return self.query(f'''SELECT job_id, signature FROM job_minhash
+                              WHERE job_id IN (SELECT job_id FROM job_lsh WHERE {clauses})''', params)
+
+    # --- Reads used by the UI ---------------------------------------------------
+
+    def count_jobs(self):
+        """Returns the number of stored jobs."""
+        return self.query('SELECT COUNT(*) FROM jobs')[0][0]
+
+    def list_jobs(self, sort_expression="id", descending=False, key=None, forward=True, limit=200):
+        """Returns one page of list rows in keyset order.
+
+        Rows are JOB_LIST_COLUMNS followed by the sort value. key is the (sort value, id)
+        of the row the page starts after (forward) or before (backward); backward pages
+        come back in reverse display order.
+        """
+        ascending = forward != descending
+        direction = "ASC" if ascending else "DESC"
+        where = ""
+        params = []
+        if key is not None:
+            op = ">" if ascending else "<"
+            # Written as a range on the sort expression so SQLite can seek its index
+            where = f"WHERE {sort_expression} {op}= ? AND ({sort_expression} {op} ? OR id {op} ?)"
+            params = [key[0], key[0], key[1]]
+        return self.query(f"SELECT {JOB_LIST_COLUMNS}, {sort_expression} FROM jobs {where} "
+                          f"ORDER BY {sort_expression} {direction}, id {direction} LIMIT ?", params + [limit])
+
+    def get_jobs(self, job_ids):
+        """Returns the list rows (plus the ID as sort value) of the given jobs, in ID order."""
+        if not job_ids:
+            return []
+        placeholders = ','.join('?' * len(job_ids))
+        return self.query(f"SELECT {JOB_LIST_COLUMNS}, id FROM jobs WHERE id IN ({placeholders}) ORDER BY id",
+                          list(job_ids))
+
+    def get_description(self, job_id):
+        """Returns the full description of a job, or None if the job does not exist."""
+        rows = self.query('''SELECT job_text(t.dict_id, t.description)
+                              FROM jobs j LEFT JOIN job_texts t ON t.job_id = j.id WHERE j.id = ?''', (job_id,))
+        return (rows[0][0] or "") if rows else None
+
+    def search(self, query, limit=500, snippet_rows=50):
+        """Full-text search; see search.search_jobs."""
+        with self.lock:
+            return search_jobs(self.connection, query, limit=limit, snippet_rows=snippet_rows)
+
+    def search_snippets(self, query, job_ids):
+        """Description snippets of search results; see search.search_snippets."""
+        with self.lock:
+            return search_snippets(self.connection, query, job_ids)
+
+    def salary_rows(self, currency='EUR'):
+        """Returns (location, contract_type, scraped month, salary_min, salary_max, salary_period)
+        of the jobs with a salary amount in the given currency."""
+        return self.query('''SELECT location, contract_type, substr(scraped_at, 1, 7),
+                                    salary_min, salary_max, salary_period
+                             FROM jobs
+                             WHERE salary_period IS NOT NULL AND salary_currency = ?''', (currency,))
+
+    # --- Crawl checkpoints ------------------------------------------------------
+
+    def load_crawl_state(self, crawl_id):
+        """Returns the saved state dict of an unfinished crawl, or None."""
+        rows = self.query('SELECT state FROM crawl_state WHERE crawl_id = ?', (crawl_id,))
+        return json.loads(rows[0][0]) if rows else None
+
+    def save_crawl_state(self, crawl_id, state, done_keys=()):
+        """Saves the state of a crawl and marks job keys as done, in one transaction."""
+        with self.transaction() as connection:
+            connection.execute('''INSERT OR REPLACE INTO crawl_state (crawl_id, state, updated_at)
+                                  VALUES (?, ?, datetime('now'))''', (crawl_id, json.dumps(state, ensure_ascii=False)))
+            connection.executemany('''INSERT INTO crawl_job_keys (crawl_id, job_key, done) VALUES (?, ?, 1)
+                                      ON CONFLICT (crawl_id, job_key) DO UPDATE SET done = 1''',
+                                   [(crawl_id, job_key) for job_key in done_keys])
+
+    def record_crawl_failure(self, crawl_id, job_key):
+        """Counts a failed attempt at a job during a crawl. Returns the number of failed attempts."""
+        with self.transaction() as connection:
+            connection.execute('''INSERT INTO crawl_job_keys (crawl_id, job_key, attempts) VALUES (?, ?, 1)
+                                  ON CONFLICT (crawl_id, job_key) DO UPDATE SET attempts = attempts + 1''',
+                               (crawl_id, job_key))
+            return connection.execute('SELECT attempts FROM crawl_job_keys WHERE crawl_id = ? AND job_key = ?',
+                                      (crawl_id, job_key)).fetchone()[0]
+
+    def crawl_job_keys(self, crawl_id):
+        """Returns (job keys done, {job key: failed attempts}) of a crawl."""
+        rows = self.query('SELECT job_key, done, attempts FROM crawl_job_keys WHERE crawl_id = ?', (crawl_id,))
+        return ({job_key for job_key, done, _ in rows if done},
+                {job_key: attempts for job_key, done, attempts in rows if attempts and not done})
+
+    def finish_crawl(self, crawl_id):
+        """Forgets the state of a crawl, so the next one starts from the beginning."""
+        with self.transaction() as connection:
+            connection.execute('DELETE FROM crawl_state WHERE crawl_id = ?', (crawl_id,))
+            connection.execute('DELETE FROM crawl_job_keys WHERE crawl_id = ?', (crawl_id,))
 
     def load_jobs_with_state(self):
         """Loads all job records with their checked status, converting checked to boolean."""
-        cursor = self.connection.cursor()
-        cursor.execute('SELECT * FROM jobs')
-        jobs = cursor.fetchall()
+        jobs = self.query('''SELECT j.id, j.title, j.location, job_text(t.dict_id, t.advantages), j.salary,
+                                     job_text(t.dict_id, t.description), j.checked
+                              FROM jobs j LEFT JOIN job_texts t ON t.job_id = j.id''')
 
         # Convert checked field from 0/1 to False/True in the result
         jobs_with_state = [
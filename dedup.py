@@ -0,0 +1,118 @@
+import hashlib
+import heapq
+import re
+import unicodedata
+import zlib
+from array import array
+import numpy as np
+
+MERSENNE_PRIME = (1 << 61) - 1
+MAX_HASH = (1 << 32) - 1
+LOW_29_BITS = (1 << 29) - 1
+
+def normalize_text(text):
+    """Lowercases, strips accents and punctuation, and collapses whitespace."""
+    if not text or text == "N/A":
+        return ''
+    text = unicodedata.normalize('NFKD', text)
+    text = ''.join(c for c in text if not unicodedata.combining(c))
+    return re.sub(r'[\W_]+', ' ', text.casefold()).strip()
+
+def shingles(text, size=3):
+    """Returns the set of word n-grams of the normalized text."""
+    words = normalize_text(text).split()
+    if len(words) <= size:
+        return {' '.join(words)} if words else set()
+    return {' '.join(words[i:i + size]) for i in range(len(words) - size + 1)}
+
+def hash_shingle(shingle):
+    """Stable 32-bit hash of a shingle (Python's hash() is salted per process)."""
+    return zlib.crc32(shingle.encode('utf-8'))
+
+def fingerprint(job, sketch_size=16):
+    """Computes the exact-duplicate key of a job.
+
+    Combines the normalized title, location and salary with the smallest shingle
+    hashes of the description, so that the same posting re-scraped with different
+    whitespace or punctuation maps to the same key, while two companies posting the
+    same title do not.
+    """
+    description_hashes = heapq.nsmallest(sketch_size, map(hash_shingle, shingles(job.get('description'))))
+    parts = [
+        normalize_text(job.get('title')),
+        normalize_text(job.get('location')),
+        normalize_text(job.get('salary')),
+        ','.join(str(h) for h in description_hashes),
+    ]
+    return hashlib.sha1('\x1f'.join(parts).encode('utf-8')).hexdigest()
+
+class MinHasher:
+    """MinHash signatures and LSH banding for near-duplicate detection of descriptions.
+
+    Two descriptions whose shingle sets have a Jaccard similarity above roughly
+    (1 / bands) ** (1 / rows_per_band) are likely to share at least one band bucket.
+    """
+
+    def __init__(self, num_perm=64, bands=16, seed=1):
+        if num_perm % bands:
+            raise ValueError("num_perm must be a multiple of bands")
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows_per_band = num_perm // bands
+
+        # Deterministic permutation parameters so stored signatures stay comparable
+        self.permutations = []
+        for i in range(num_perm):
+            digest = hashlib.blake2b(f"{seed}:{i}".encode(), digest_size=16).digest()
+            a = int.from_bytes(digest[:8], 'little') % (MERSENNE_PRIME - 1) + 1
+            b = int.from_bytes(digest[8:], 'little') % MERSENNE_PRIME
+            self.permutations.append((a, b))
+
+        # Column vectors for signature(): a is split into its high 29 and low 32 bits so
+        # every partial product fits in 64 bits
+        self.a_high = np.array([a >> 32 for a, _ in self.permutations], dtype=np.uint64)[:, None]
+        self.a_low = np.array([a & MAX_HASH for a, _ in self.permutations], dtype=np.uint64)[:, None]
+        self.b = np.array([b for _, b in self.permutations], dtype=np.uint64)[:, None]
+
+    def signature(self, text):
+        """Returns the MinHash signature of a text as an array of unsigned ints.
+
+        Computes min((a * h + b) mod 2^61 - 1) & MAX_HASH over the shingle hashes h for
+        all permutations at once with NumPy, exactly (signatures match the ones already
+        stored), reducing modulo the Mersenne prime with 2^61 = 1.
+        """
+        hashes = np.fromiter((hash_shingle(s) for s in shingles(text)), dtype=np.uint64)
+        if not len(hashes):
+            return array('I', [MAX_HASH] * self.num_perm)
+
+        high = self.a_high * hashes  # < 2^61, times 2^32 below
+        low = self.a_low * hashes  # < 2^64
+        values = ((high >> np.uint64(29)) + ((high & np.uint64(LOW_29_BITS)) << np.uint64(32))
+                  + (low & np.uint64(MERSENNE_PRIME)) + (low >> np.uint64(61)) + self.b)
+        values = (values & np.uint64(MERSENNE_PRIME)) + (values >> np.uint64(61))
+        values = np.where(values >= MERSENNE_PRIME, values - np.uint64(MERSENNE_PRIME), values)
+        return array('I', (values & np.uint64(MAX_HASH)).min(axis=1).astype(np.uint32).tolist())
+
+    def buckets(self, signature):
+        """Returns one (band, bucket) pair per LSH band of a signature."""
+        rows = self.rows_per_band
+        return [
+            (band, hash_shingle(','.join(map(str, signature[band * rows:(band + 1) * rows]))))
+            for band in range(self.bands)
+        ]
+
+    @staticmethod
+    def similarity(signature_a, signature_b):
+        """Estimates the Jaccard similarity of two texts from their signatures."""
+        matches = sum(1 for a, b in zip(signature_a, signature_b) if a == b)
+        return matches / len(signature_a)
+
+    @staticmethod
+    def to_blob(signature):
+        return signature.tobytes()
+
+    @staticmethod
+    def from_blob(blob):
+        signature = array('I')
+        signature.frombytes(blob)
+        return signature
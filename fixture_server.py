@@ -0,0 +1,119 @@
+import os
+import threading
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlparse, parse_qs
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures', 'indeed')
+
+# Job key -> saved job detail page
+JOB_FIXTURES = {
+    'a1b2c3d4e5f60001': 'job_detail.html',
+    'a1b2c3d4e5f60002': 'job_detail_minimal.html',
+    'a1b2c3d4e5f60003': 'captcha.html',
+}
+
+# Stand-ins for the logos, photos and web fonts of the real pages: (content type, size in bytes)
+ASSET_TYPES = {
+    '.png': ('image/png', 20 * 1024),
+    '.jpg': ('image/jpeg', 120 * 1024),
+    '.woff2': ('font/woff2', 60 * 1024),
+}
+
+class FixtureRequestHandler(BaseHTTPRequestHandler):
+    """Serves saved Indeed pages under the same paths as the real site."""
+
+    def do_GET(self):
+        parsed = urlparse(self.path)
+        if parsed.path == '/rc/clk':
+            # Result links go through Indeed's click tracker before reaching the job page
+            self.send_response(302)
+            self.send_header('Location', f"/viewjob?{parsed.query}")
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return
+        if parsed.path.startswith('/assets/'):
+            self.send_asset(parsed.path)
+            return
+
+        if parsed.path == '/jobs':
+            filename = 'search_results.html'
+        elif parsed.path == '/viewjob':
+            job_key = parse_qs(parsed.query).get('jk', [''])[0]
+            filename = JOB_FIXTURES.get(job_key)
+        else:
+            filename = None
+
+        if filename is None:
+            self.send_error(404)
+            return
+
+        with open(os.path.join(self.server.fixtures_dir, filename), 'rb') as f:
+            body = f.read()
+        self.send_body('text/html; charset=utf-8', body)
+
+    def send_asset(self, path):
+        content_type, size = ASSET_TYPES.get(os.path.splitext(path)[1], (None, 0))
+        if content_type is None:
+            self.send_error(404)
+            return
+        self.send_body(content_type, bytes(size))
+
+    def send_body(self, content_type, body):
+        self.send_response(200)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+        with self.server.stats_lock:
+            self.server.bytes_sent += len(body)
+            self.server.requests += 1
+
+    def log_message(self, format, *args):
+        pass  # Keep benchmark and test output quiet
+
+class FixtureServer:
+    """Local HTTP stand-in for Indeed, usable as a context manager."""
+
+    def __init__(self, fixtures_dir=FIXTURES_DIR, port=0):
+        self.httpd = ThreadingHTTPServer(('127.0.0.1', port), FixtureRequestHandler)
+        self.httpd.fixtures_dir = fixtures_dir
+        self.httpd.stats_lock = threading.Lock()
+        self.httpd.bytes_sent = 0  # Response bodies served, to compare how much browsers download
+        self.httpd.requests = 0
+        self.thread = None
+
+    @property
+    def base_url(self):
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    @property
+    def bytes_sent(self):
+        return self.httpd.bytes_sent
+
+    @property
+    def requests(self):
+        return self.httpd.requests
+
+    def start(self):
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
+
+if __name__ == "__main__":
+    server = FixtureServer(port=8000)
+    print(f"Serving Indeed fixtures on {server.base_url}")
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        server.stop()
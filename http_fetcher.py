@@ -0,0 +1,179 @@
+import logging
+import re
+from urllib.parse import urljoin, urlencode
+import requests
+from requests.adapters import HTTPAdapter
+from lxml import html as lxml_html
+from scraper import JobScraper, job_key_from_url
+from pacing import RateLimiter, StageTimer
+
+USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/94.0.4606.61 Safari/537.36"
+
+# Same selectors as the Selenium extractors in JobScraper
+TITLE_XPATH = "//*[self::h1 or self::h2][contains(@class, 'jobsearch-JobInfoHeader-title')]"
+SALARY_XPATH = "//div[contains(@id, 'salaryInfoAndJobType')]"
+LOCATION_XPATH = "//*[@data-testid='inlineHeader-companyLocation']"
+BENEFITS_XPATH = "//*[@id='benefits']"
+DESCRIPTION_XPATH = "//*[@id='jobDescriptionText']"
+JOB_LINK_XPATH = "//*[contains(concat(' ', normalize-space(@class), ' '), ' job_seen_beacon ')]//a[@data-jk]"
+NEXT_PAGE_XPATH = "//a[@aria-label='Suivant']"
+
+CAPTCHA_MARKERS = ('captcha', 'cf-challenge', 'challenge-platform')
+BLOCK_TAGS = {'p', 'div', 'li', 'ul', 'ol', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6', 'section', 'tr'}
+
+class BrowserRequired(Exception):
+    """Raised when a page cannot be parsed without a real browser (CAPTCHA or JS-only page)."""
+
+class HttpJobFetcher:
+    """Fetches Indeed pages over a pooled HTTP session and parses them with lxml.
+
+    Falls back to a Selenium JobScraper, created on first need, when a page shows a
+    CAPTCHA or does not contain the job details in its static HTML.
+    """
+
+    def __init__(self, db_path='data/jobs.db', base_url="https://www.indeed.fr", pool_size=10, timeout=15,
+                 rate_limiter=None, timings=None, browser_profile=None):
+        self.base_indeed_url = base_url
+        self.db_path = db_path
+        self.timeout = timeout
+        self.browser = None  # Selenium fallback, started lazily
+        self.browser_profile = browser_profile
+        self.rate_limiter = rate_limiter or RateLimiter()
+        self.timings = timings or StageTimer()
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        self.session.headers.update({
+            'User-Agent': USER_AGENT,
+            'Accept-Language': 'fr-FR,fr;q=0.9',
+        })
+
+    def build_search_url(self, search_terms, location_terms, start=0):
+        """Builds the URL of an Indeed results page for the given search."""
+        query = urlencode({'q': search_terms, 'l': location_terms, 'start': start})
+        return f"{self.base_indeed_url}/jobs?{query}"
+
+    def fetch_page(self, url):
+        """Downloads a page and returns its parsed document, or raises BrowserRequired."""
+        self.rate_limiter.acquire(url)
+        with self.timings.stage('http_get'):
+            response = self.session.get(url, timeout=self.timeout)
+        if response.status_code in (403, 429, 503):
+            raise BrowserRequired(f"HTTP {response.status_code} for {url}")
+        response.raise_for_status()
+
+        with self.timings.stage('parse'):
+            document = lxml_html.fromstring(response.content)
+        if is_captcha_page(document):
+            raise BrowserRequired(f"CAPTCHA detected on {url}")
+        return document
+
+    def fetch_results_page(self, url):
+        """Returns the job detail URLs and the next page URL of a results page."""
+        try:
+            document = self.fetch_page(url)
+        except BrowserRequired as e:
+            logging.warning(f"{e}, falling back to Selenium.")
+            return self.get_browser().fetch_results_page(url)
+
+        job_urls, next_url = parse_results_page(document, self.base_indeed_url)
+        if not job_urls:
+            logging.warning(f"No job cards in static HTML of {url}, falling back to Selenium.")
+            return self.get_browser().fetch_results_page(url)
+        return job_urls, next_url
+
+    def scrape_job_page(self, url):
+        """Returns the job data of a job detail page."""
+        try:
+            document = self.fetch_page(url)
+            with self.timings.stage('extract'):
+                job_data = parse_job_page(document)
+            job_data['job_key'] = job_key_from_url(url)
+            return job_data
+        except BrowserRequired as e:
+            logging.warning(f"{e}, falling back to Selenium.")
+            return self.get_browser().scrape_job_page(url)
+
+    def get_browser(self):
+        """Returns the Selenium fallback scraper, starting it if needed."""
+        if self.browser is None:
+            self.browser = JobScraper(self.db_path, rate_limiter=self.rate_limiter, timings=self.timings,
+                                      profile=self.browser_profile)
+        return self.browser
+
+    def close(self):
+        """Closes the HTTP session and the Selenium fallback if it was started."""
+        self.session.close()
+        if self.browser is not None:
+            self.browser.close()
+            self.browser = None
+
+def is_captcha_page(document):
+    """Detects CAPTCHA / bot challenge pages."""
+    for marker in CAPTCHA_MARKERS:
+        if document.xpath(f"//*[contains(@class, '{marker}') or contains(@id, '{marker}')]"):
+            return True
+    return False
+
+def parse_results_page(document, base_url):
+    """Extracts job detail URLs and the next page URL from a results page document."""
+    job_urls = []
+    for link in document.xpath(JOB_LINK_XPATH):
+        job_key = link.get('data-jk')
+        if job_key:
+            job_urls.append(f"{base_url}/viewjob?jk={job_key}")
+
+    next_links = document.xpath(NEXT_PAGE_XPATH)
+    next_url = urljoin(base_url, next_links[0].get('href')) if next_links and next_links[0].get('href') else None
+    return job_urls, next_url
+
+def parse_job_page(document):
+    """Extracts the job fields from a job detail document, with the same defaults as JobScraper."""
+    title = first_text(document, TITLE_XPATH)
+    description = first_text(document, DESCRIPTION_XPATH)
+    if title is None and description is None:
+        # The details are rendered by JavaScript on this page
+        raise BrowserRequired("Job details missing from static HTML")
+
+    return {
+        'title': title or "N/A",
+        'salary': first_text(document, SALARY_XPATH),
+        'location': first_text(document, LOCATION_XPATH) or "N/A",
+        'advantages': first_text(document, BENEFITS_XPATH) or "N/A",
+        'description': description or "N/A"
+    }
+
+def first_text(document, xpath):
+    """Returns the visible text of the first element matching xpath, or None."""
+    elements = document.xpath(xpath)
+    if not elements:
+        return None
+    return element_text(elements[0])
+
+def element_text(element):
+    """Approximates Selenium's rendered .text: line breaks around block elements and <br>."""
+    parts = []
+    collect_text(element, parts)
+    lines = [re.sub(r'[ \t\r\f\v]+', ' ', line).strip() for line in ''.join(parts).split('\n')]
+    return re.sub(r'\n{3,}', '\n\n', '\n'.join(lines)).strip()
+
+def collect_text(node, parts):
+    """Appends the text of node and its children (not its tail) to parts."""
+    is_block = node.tag in BLOCK_TAGS
+    if node.tag == 'br' or is_block:
+        parts.append('\n')
+    if node.text:
+        parts.append(node.text)
+    for child in node:
+        if not isinstance(child.tag, str):
+            # Comments and processing instructions only contribute their tail
+            if child.tail:
+                parts.append(child.tail)
+            continue
+        collect_text(child, parts)
+        if child.tail:
+            parts.append(child.tail)
+    if is_block:
+        parts.append('\n')
@@ -0,0 +1,262 @@
+"""Bulk transfer and maintenance of jobs in jobs.db.
+
+    python job_transfer.py export jobs.jsonl.gz        # Also .jsonl, .csv(.gz), .parquet
+    python job_transfer.py import jobs.csv
+    python job_transfer.py replay-log job_scraper.log  # Jobs logged while scraping
+    python job_transfer.py compact                     # Recompress texts with the current dictionary
+
+Every command streams: exports read the database in keyset batches, imports and
+replays read one record at a time and write through JobStore in batches, so memory
+does not grow with the size of the file. Imported jobs go through the same dedup as
+scraped ones, so running an import twice adds nothing.
+"""
+import argparse
+import ast
+import csv
+import gzip
+import json
+import logging
+import re
+import sys
+from database import Database, EXPORT_COLUMNS
+from dedup import fingerprint
+from storage import JobStore
+from log_setup import setup_logging
+
+FORMATS = ('jsonl', 'csv', 'parquet')
+JOB_FIELDS = ('title', 'location', 'salary', 'advantages', 'description')
+INTEGER_COLUMNS = {'id', 'checked'}
+REAL_COLUMNS = {'salary_value', 'salary_min', 'salary_max'}
+BATCH_SIZE = 1000
+
+# "2024-11-13 03:15:48,396 - INFO - Scraped job from Indeed: {'title': ...}" (logging.basicConfig era)
+TEXT_LOG_PATTERN = re.compile(r' - Scraped job from Indeed: (\{.*\})\s*$')
+# Marker left by log_setup.PayloadFilter on fields it cut
+TRUNCATED_PATTERN = re.compile(r'… \[\d+ chars\]$')
+
+def detect_format(path):
+    """Guesses the file format from its extension (.gz allowed for jsonl and csv)."""
+    name = path.lower()
+    if name.endswith('.gz'):
+        name = name[:-3]
+    for file_format in FORMATS:
+        if name.endswith(f'.{file_format}'):
+            return file_format
+    if name.endswith('.json'):
+        return 'jsonl'
+    raise ValueError(f"Cannot tell the format of {path}; use --format")
+
+def open_text(path, mode):
+    """Opens a text file, gzip-compressed if its name ends with .gz."""
+    if path.lower().endswith('.gz'):
+        return gzip.open(path, mode + 't', encoding='utf-8', newline='')
+    return open(path, mode, encoding='utf-8', newline='')
+
+def import_pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.parquet
+    except ImportError:
+        raise SystemExit("Parquet files need pyarrow: pip install pyarrow")
+    return pyarrow
+
+def parquet_schema(pyarrow):
+    return pyarrow.schema([(column, pyarrow.int64() if column in INTEGER_COLUMNS else
+                                    pyarrow.float64() if column in REAL_COLUMNS else pyarrow.string())
+                           for column in EXPORT_COLUMNS])
+
+# --- Export ---------------------------------------------------------------------
+
+def batches(iterable, size):
+    batch = []
+    for item in iterable:
+        batch.append(item)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+def export_jobs(database, path, file_format, batch_size=BATCH_SIZE):
+    """Writes every job to a file. Returns the number of jobs written."""
+    jobs = database.iter_jobs(batch_size)
+    count = 0
+    if file_format == 'parquet':
+        pyarrow = import_pyarrow()
+        schema = parquet_schema(pyarrow)
+        with pyarrow.parquet.ParquetWriter(path, schema, compression='zstd') as writer:
+            for batch in batches(jobs, batch_size):
+                writer.write_table(pyarrow.Table.from_pylist(batch, schema=schema))  # One row group per batch
+                count += len(batch)
+        return count
+
+    with open_text(path, 'w') as f:
+        if file_format == 'csv':
+            writer = csv.DictWriter(f, fieldnames=EXPORT_COLUMNS)
+            writer.writeheader()
+        for job in jobs:
+            if file_format == 'csv':
+                writer.writerow(job)
+            else:
+                f.write(json.dumps(job, ensure_ascii=False) + '\n')
+            count += 1
+    return count
+
+# --- Import ---------------------------------------------------------------------
+
+def csv_value(column, value):
+    """Converts a CSV cell back to the type it was exported from; empty cells are None."""
+    if value == '':
+        return None
+    if column in INTEGER_COLUMNS:
+        return int(value)
+    if column in REAL_COLUMNS:
+        return float(value)
+    return value
+
+def read_jobs(path, file_format, batch_size=BATCH_SIZE):
+    """Yields the job dicts of an exported file, one at a time."""
+    if file_format == 'parquet':
+        pyarrow = import_pyarrow()
+        for batch in pyarrow.parquet.ParquetFile(path).iter_batches(batch_size=batch_size):
+            yield from batch.to_pylist()
+        return
+
+    csv.field_size_limit(sys.maxsize)  # Descriptions are far longer than the 128 KB default
+    with open_text(path, 'r') as f:
+        if file_format == 'csv':
+            for row in csv.DictReader(f):
+                yield {column: csv_value(column, value) for column, value in row.items()}
+        else:
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+
+def import_jobs(store, jobs):
+    """Adds jobs through the store's dedup and keeps their checked state.
+
+    Returns (jobs read, jobs added, jobs skipped as incomplete).
+    """
+    read = added = skipped = 0
+    checked = []  # Fingerprints of checked jobs, applied once their batch is written
+    for job in jobs:
+        read += 1
+        if any(field not in job for field in JOB_FIELDS) or not job['title']:
+            skipped += 1
+            continue
+        if not store.add(job):
+            added += 1
+        if job.get('checked'):
+            checked.append(fingerprint(job))
+        if len(checked) >= store.batch_size:
+            store.flush()
+            store.database.check_jobs_by_fingerprint(checked)
+            checked = []
+        if read % 10000 == 0:
+            logging.info(f"Imported {read} records ({added} new).")
+    store.flush()
+    store.database.check_jobs_by_fingerprint(checked)
+    return read, added, skipped
+
+# --- Log replay -----------------------------------------------------------------
+
+def decode_line(raw):
+    """Decodes a log line: UTF-8 for log_setup's files, cp1252 for logs written on Windows before it."""
+    try:
+        return raw.decode('utf-8')
+    except UnicodeDecodeError:
+        return raw.decode('cp1252', errors='replace')
+
+def logged_job(line):
+    """Returns the job dict logged on a line, or None.
+
+    Understands both the old text logs ("Scraped job from Indeed: {...}", a Python repr)
+    and log_setup's JSON lines (the 'payload' field). Payloads truncated by
+    PayloadFilter are not jobs worth storing and give None too.
+    """
+    if line.startswith('{'):
+        try:
+            entry = json.loads(line)
+        except ValueError:
+            return None
+        job = entry.get('payload') if entry.get('message', '').startswith('Scraped job') else None
+    else:
+        match = TEXT_LOG_PATTERN.search(line)
+        if match is None:
+            return None
+        try:
+            job = ast.literal_eval(match.group(1))
+        except (ValueError, SyntaxError):
+            logging.warning(f"Unreadable job record in log line: {line[:100]}")
+            return None
+
+    if not isinstance(job, dict) or any(field not in job for field in JOB_FIELDS):
+        return None
+    if any(isinstance(value, str) and TRUNCATED_PATTERN.search(value) for value in job.values()):
+        return None
+    return job
+
+def logged_jobs(path):
+    """Yields the jobs found in a scraper log, reading it line by line."""
+    with open(path, 'rb') as f:
+        for raw in f:
+            job = logged_job(decode_line(raw.rstrip(b'\r\n')))
+            if job is not None:
+                yield job
+
+# --- Command line ---------------------------------------------------------------
+
+def main():
+    parser = argparse.ArgumentParser(description="Export, import, backfill and compact jobs in bulk.")
+    parser.add_argument('--db', default='data/jobs.db', help="Database file")
+    parser.add_argument('--batch-size', type=int, default=BATCH_SIZE, help="Rows read or written per batch")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    export_parser = commands.add_parser('export', help="Write every job to a JSONL, CSV or Parquet file")
+    export_parser.add_argument('path')
+    export_parser.add_argument('--format', choices=FORMATS, help="Default: from the file extension")
+
+    import_parser = commands.add_parser('import', help="Add the jobs of an exported file")
+    import_parser.add_argument('path')
+    import_parser.add_argument('--format', choices=FORMATS, help="Default: from the file extension")
+
+    replay_parser = commands.add_parser('replay-log', help="Add the jobs recorded in scraper logs")
+    replay_parser.add_argument('paths', nargs='+')
+
+    commands.add_parser('compact', help="Train a text dictionary if one is due and recompress the older texts with it")
+    args = parser.parse_args()
+
+    setup_logging(console=True)
+    if args.command == 'export':
+        database = Database(args.db)
+        try:
+            count = export_jobs(database, args.path, args.format or detect_format(args.path), args.batch_size)
+        finally:
+            database.close()
+        logging.info(f"Exported {count} jobs to {args.path}.")
+        return
+    if args.command == 'compact':
+        database = Database(args.db)
+        try:
+            database.train_dictionary_if_due()
+            count = database.recompress_texts(args.batch_size)
+        finally:
+            database.close()
+        logging.info(f"Recompressed the texts of {count} jobs.")
+        return
+
+    store = JobStore(args.db, batch_size=args.batch_size, flush_interval=float('inf'))
+    try:
+        if args.command == 'import':
+            jobs = read_jobs(args.path, args.format or detect_format(args.path), args.batch_size)
+            read, added, skipped = import_jobs(store, jobs)
+            logging.info(f"Imported {args.path}: {read} records, {added} new jobs, {skipped} incomplete records skipped.")
+        else:
+            for path in args.paths:
+                read, added, _ = import_jobs(store, logged_jobs(path))
+                logging.info(f"Replayed {path}: {read} logged jobs, {added} new.")
+    finally:
+        store.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,134 @@
+import atexit
+import json
+import logging
+import logging.handlers
+import queue
+
+LOG_PATH = 'job_scraper.log'
+
+class PayloadFilter(logging.Filter):
+    """Bounds the cost of records carrying a payload (logging.info(..., extra={'payload': job})).
+
+    Runs on the thread that logs, before the record is queued: string fields longer than
+    max_field_length are cut, and only one payload in every sample_every is kept (the
+    message itself is always logged). The work done per record therefore depends on
+    max_field_length, not on the size of the scraped texts.
+    """
+
+    def __init__(self, max_field_length=200, sample_every=1):
+        super().__init__()
+        self.max_field_length = max_field_length
+        self.sample_every = max(sample_every, 1)
+        self.count = 0
+
+    def filter(self, record):
+        payload = getattr(record, 'payload', None)
+        if payload is None:
+            return True
+
+        self.count += 1
+        if (self.count - 1) % self.sample_every:
+            record.payload = None
+            return True
+
+        if isinstance(payload, dict):
+            record.payload = {key: self.truncate(value) for key, value in payload.items()}
+        else:
+            record.payload = self.truncate(payload)
+        return True
+
+    def truncate(self, value):
+        if isinstance(value, str) and len(value) > self.max_field_length:
+            return f"{value[:self.max_field_length]}… [{len(value)} chars]"
+        if isinstance(value, (str, int, float, bool)) or value is None:
+            return value
+        return self.truncate(str(value))
+
+class JsonLinesFormatter(logging.Formatter):
+    """Formats each record as one JSON object per line, keeping non-ASCII text readable."""
+
+    def format(self, record):
+        entry = {
+            'time': self.formatTime(record),
+            'level': record.levelname,
+            'logger': record.name,
+            'thread': record.threadName,
+            'message': record.getMessage(),
+        }
+        if getattr(record, 'payload', None) is not None:
+            entry['payload'] = record.payload
+        if record.exc_info:
+            entry['exception'] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            entry['exception'] = record.exc_text
+        return json.dumps(entry, ensure_ascii=False)
+
+class QueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler that leaves formatting to the listener thread.
+
+    The standard prepare() formats the whole record on the calling thread; here only
+    the message arguments are merged and the traceback rendered, which is all that
+    cannot safely be done later.
+    """
+
+    def prepare(self, record):
+        record = logging.makeLogRecord(record.__dict__)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+# Set by setup_logging while logging goes through the queue
+listener = None
+queue_handler = None
+
+def setup_logging(path=LOG_PATH, level=logging.INFO, max_bytes=5 * 1024 * 1024, backup_count=5,
+                  rotate_when=None, max_field_length=200, sample_every=1, console=False):
+    """Sends log records through a queue to a background thread that writes them to disk.
+
+    The file is UTF-8 JSON lines, rotated when it reaches max_bytes, or at the interval
+    given by rotate_when ('midnight', 'H', ... as in TimedRotatingFileHandler) if set.
+    Calling it again has no effect until stop_logging() has been called.
+    """
+    global listener, queue_handler
+    if listener is not None:
+        return listener
+
+    if rotate_when:
+        file_handler = logging.handlers.TimedRotatingFileHandler(path, when=rotate_when, backupCount=backup_count,
+                                                                 encoding='utf-8')
+    else:
+        file_handler = logging.handlers.RotatingFileHandler(path, maxBytes=max_bytes, backupCount=backup_count,
+                                                            encoding='utf-8')
+    file_handler.setFormatter(JsonLinesFormatter())
+    handlers = [file_handler]
+    if console:
+        console_handler = logging.StreamHandler()
+        console_handler.setFormatter(logging.Formatter('%(asctime)s - %(levelname)s - %(message)s'))
+        handlers.append(console_handler)
+
+    records = queue.SimpleQueue()
+    queue_handler = QueueHandler(records)
+    queue_handler.addFilter(PayloadFilter(max_field_length, sample_every))
+
+    root = logging.getLogger()
+    root.setLevel(level)
+    root.addHandler(queue_handler)
+
+    listener = logging.handlers.QueueListener(records, *handlers, respect_handler_level=True)
+    listener.start()
+    atexit.register(stop_logging)
+    return listener
+
+def stop_logging():
+    """Writes the queued records and stops the logging thread."""
+    global listener, queue_handler
+    if listener is None:
+        return
+    logging.getLogger().removeHandler(queue_handler)
+    listener.stop()
+    for handler in listener.handlers:
+        handler.close()
+    listener = queue_handler = None
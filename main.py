@@ -1,11 +1,13 @@
 from scraper import JobScraper
 from database import Database
-from ui import JobApp
+from ui import JobSearchApp
 import tkinter as tk
+from log_setup import setup_logging
 
 def main():
+    setup_logging()
     root = tk.Tk()
-    app = JobApp(root)
+    app = JobSearchApp(root)
     root.mainloop()
 
 if __name__ == '__main__':
@@ -0,0 +1,129 @@
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from urllib.parse import urlparse
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support.ui import WebDriverWait
+from selenium.common.exceptions import TimeoutException
+
+class RateLimiter:
+    """Token bucket per host: at most `rate` requests per second, with bursts of `burst`.
+
+    Shared between threads so a pool of workers stays polite towards each host as a whole.
+    """
+
+    def __init__(self, rate=0.5, burst=2):
+        self.rate = rate
+        self.burst = burst
+        self.buckets = {}  # host -> (tokens, last refill time)
+        self.lock = threading.Lock()
+
+    def acquire(self, url):
+        """Blocks until a request to the host of url is allowed."""
+        host = urlparse(url).netloc or url
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                tokens, last = self.buckets.get(host, (self.burst, now))
+                tokens = min(self.burst, tokens + (now - last) * self.rate)
+                if tokens >= 1:
+                    self.buckets[host] = (tokens - 1, now)
+                    return
+                self.buckets[host] = (tokens, now)
+                delay = (1 - tokens) / self.rate
+            time.sleep(delay)
+
+class StageTimer:
+    """Accumulates wall-clock time per named stage (navigate, click, scroll, ...)."""
+
+    def __init__(self):
+        self.stats = {}  # stage -> [count, total, max]
+        self.lock = threading.Lock()
+
+    @contextmanager
+    def stage(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, time.perf_counter() - start)
+
+    def record(self, name, elapsed):
+        with self.lock:
+            count, total, longest = self.stats.get(name, (0, 0.0, 0.0))
+            self.stats[name] = (count + 1, total + elapsed, max(longest, elapsed))
+
+    def summary(self):
+        """Returns {stage: {'count', 'total', 'mean', 'max'}} in seconds."""
+        with self.lock:
+            return {
+                name: {'count': count, 'total': total, 'mean': total / count, 'max': longest}
+                for name, (count, total, longest) in self.stats.items()
+            }
+
+    def report(self):
+        """Logs the timings of every stage, slowest total first."""
+        summary = self.summary()
+        for name, stats in sorted(summary.items(), key=lambda item: -item[1]['total']):
+            logging.info(f"Stage '{name}': {stats['count']} runs, total {stats['total']:.2f} s, "
+                         f"mean {stats['mean']:.3f} s, max {stats['max']:.3f} s")
+        return summary
+
+def wait_for_page_ready(driver, timeout=10, states=('complete',)):
+    """Waits until the document has finished loading (or reached one of the given readyStates)."""
+    try:
+        WebDriverWait(driver, timeout, poll_frequency=0.1).until(
+            lambda d: d.execute_script("return document.readyState") in states)
+    except TimeoutException:
+        logging.warning(f"Page not ready after {timeout} s, continuing.")
+
+def wait_for_network_idle(driver, idle_time=0.5, timeout=10):
+    """Waits until no new resource has been fetched for idle_time seconds."""
+    deadline = time.monotonic() + timeout
+    count = driver.execute_script("return performance.getEntriesByType('resource').length")
+    idle_since = time.monotonic()
+    while time.monotonic() < deadline:
+        time.sleep(0.1)
+        new_count = driver.execute_script("return performance.getEntriesByType('resource').length")
+        if new_count != count:
+            count = new_count
+            idle_since = time.monotonic()
+        elif time.monotonic() - idle_since >= idle_time:
+            return True
+    logging.warning(f"Network still busy after {timeout} s, continuing.")
+    return False
+
+def wait_for_results(driver, timeout=10):
+    """Waits until the results list shows job cards."""
+    try:
+        WebDriverWait(driver, timeout, poll_frequency=0.1).until(
+            lambda d: d.find_elements(By.CSS_SELECTOR, '.job_seen_beacon'))
+        return True
+    except TimeoutException:
+        logging.warning(f"No job cards after {timeout} s.")
+        return False
+
+def wait_for_job_details(driver, previous_description=None, timeout=10):
+    """Waits until the job details show a non-empty description different from the previous one."""
+    def details_loaded(d):
+        elements = d.find_elements(By.ID, "jobDescriptionText")
+        if not elements:
+            return False
+        text = elements[0].text.strip()
+        return text and text != previous_description
+
+    try:
+        WebDriverWait(driver, timeout, poll_frequency=0.1).until(details_loaded)
+        return True
+    except TimeoutException:
+        logging.warning(f"Job details not loaded after {timeout} s.")
+        return False
+
+def wait_for_height_change(driver, last_height, timeout=1.0):
+    """Waits until the page height differs from last_height; returns the new height."""
+    try:
+        return WebDriverWait(driver, timeout, poll_frequency=0.1).until(
+            lambda d: (h := d.execute_script("return document.body.scrollHeight")) != last_height and h)
+    except TimeoutException:
+        return last_height
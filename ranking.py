@@ -0,0 +1,173 @@
+import collections
+import logging
+import os
+import re
+import unicodedata
+import numpy as np
+from scipy import sparse
+
+INDEX_VERSION = 1  # Bump when the tokenizer or the stored arrays change; older caches are rebuilt
+TITLE_WEIGHT = 3  # A term in the title counts as much as this many in the description
+BATCH_SIZE = 2000
+
+# Keeps technology names whole: c++, c#, node.js, vue.js
+TOKEN_PATTERN = re.compile(r'[a-z0-9][a-z0-9+#]*(?:\.[a-z0-9]+)*')
+STOP_WORDS = frozenset("""
+    au aux avec ce ces dans de des du en et il ils la le les leur lui mais nos notre nous on ou par pas
+    pour qui que sa se ses son sont sur un une vos votre vous est etre avoir plus tout tous toute toutes
+    the and for with you your our are this that will from have has into who what not all can its nbsp
+""".split())
+
+def index_path(db_path):
+    """The relevance index cache of a database lives next to it."""
+    return os.path.join(os.path.dirname(db_path) or '.', 'relevance_index.npz')
+
+def tokenize(text):
+    """Lowercases, strips accents (développeur -> developpeur) and splits text into terms."""
+    if not text:
+        return []
+    text = unicodedata.normalize('NFKD', text).encode('ascii', 'ignore').decode('ascii').lower()
+    # Single letters are mostly elisions (l'équipe, d'expérience) and the f of H/F
+    return [token for token in TOKEN_PATTERN.findall(text) if len(token) > 1 and token not in STOP_WORDS]
+
+def term_counts(title, description):
+    """Term counts of a job, title terms weighted by TITLE_WEIGHT."""
+    counts = collections.Counter(tokenize(description))
+    for term in tokenize(title):
+        counts[term] += TITLE_WEIGHT
+    return counts
+
+class RelevanceIndex:
+    """TF-IDF term matrix of the stored jobs, for ranking them against a skills profile.
+
+    The matrix holds one row per job with 1 + log(term count) for each of its terms,
+    and is kept without IDF weights so new jobs can be appended as they are scraped:
+    IDF and the row norms, which every insert changes, are applied at scoring time.
+    Ranking is then one sparse matrix-vector product, matrix @ (idf² · profile counts),
+    divided by the cached TF-IDF row norms, i.e. the cosine similarity of each job and
+    the profile.
+
+    The index is cached on disk (see save and load) and update() only reads the jobs
+    added since the last update.
+    """
+
+    def __init__(self, path=None):
+        self.path = path
+        self.terms = {}  # Term -> column
+        self.job_ids = np.empty(0, dtype=np.int64)
+        self.matrix = sparse.csr_matrix((0, 0), dtype=np.float32)
+        self.document_frequency = np.empty(0, dtype=np.int64)
+        self.norms = None  # TF-IDF row norms, recomputed after the matrix changes
+
+    def __len__(self):
+        return len(self.job_ids)
+
+    @classmethod
+    def load(cls, path):
+        """Loads a cached index, or returns an empty one if there is no usable cache."""
+        index = cls(path)
+        if not os.path.exists(path):
+            return index
+        try:
+            with np.load(path, allow_pickle=False) as cache:
+                if int(cache['version']) != INDEX_VERSION:
+                    logging.info("Relevance index cache is from another version, rebuilding it.")
+                    return index
+                index.job_ids = cache['job_ids']
+                index.document_frequency = cache['document_frequency']
+                index.terms = {term: column for column, term in enumerate(cache['terms'].tolist())}
+                index.matrix = sparse.csr_matrix((cache['data'], cache['indices'], cache['indptr']),
+                                                 shape=tuple(cache['shape']))
+        except (OSError, KeyError, ValueError) as e:
+            logging.warning(f"Could not read the relevance index cache {path} ({e}), rebuilding it.")
+            return cls(path)
+        return index
+
+    def save(self):
+        """Writes the index to its cache file (atomically, through a temporary file)."""
+        terms = np.array(sorted(self.terms, key=self.terms.get), dtype=str)
+        temporary_path = f"{self.path}.tmp.npz"
+        np.savez(temporary_path, version=INDEX_VERSION, job_ids=self.job_ids, terms=terms,
+                 document_frequency=self.document_frequency, data=self.matrix.data, indices=self.matrix.indices,
+                 indptr=self.matrix.indptr, shape=np.array(self.matrix.shape))
+        os.replace(temporary_path, self.path)
+
+    def update(self, database, batch_size=BATCH_SIZE):
+        """Adds the jobs stored since the last update. Returns the number of jobs added."""
+        if len(self) > database.count_jobs():
+            logging.info("Jobs were removed since the relevance index was built, rebuilding it.")
+            self.__init__(self.path)
+
+        after_id = int(self.job_ids[-1]) if len(self) else 0
+        added = 0
+        batch = []
+        for job in database.iter_jobs(batch_size, after_id=after_id):
+            batch.append(job)
+            if len(batch) >= batch_size:
+                added += self.add_jobs(batch)
+                batch = []
+        added += self.add_jobs(batch)
+        if added:
+            logging.info(f"Added {added} jobs to the relevance index ({len(self)} jobs, {len(self.terms)} terms).")
+        return added
+
+    def add_jobs(self, jobs):
+        """Appends rows for jobs (dicts with id, title and description) in ID order."""
+        if not jobs:
+            return 0
+        indptr = [0]
+        indices = []
+        counts = []
+        for job in jobs:
+            for term, count in term_counts(job['title'], job['description']).items():
+                column = self.terms.get(term)
+                if column is None:
+                    column = self.terms[term] = len(self.terms)
+                indices.append(column)
+                counts.append(count)
+            indptr.append(len(indices))
+
+        indices = np.array(indices, dtype=np.int32)
+        term_count = len(self.terms)
+        rows = sparse.csr_matrix((1 + np.log(np.array(counts, dtype=np.float32)), indices, indptr),
+                                 shape=(len(jobs), term_count))
+        self.matrix.resize((self.matrix.shape[0], term_count))  # Room for the new terms
+        self.matrix = sparse.vstack([self.matrix, rows], format='csr', dtype=np.float32)
+        self.document_frequency = np.concatenate(
+            [self.document_frequency, np.zeros(term_count - len(self.document_frequency), dtype=np.int64)])
+        self.document_frequency += np.bincount(indices, minlength=term_count)
+        self.job_ids = np.concatenate([self.job_ids, np.array([job['id'] for job in jobs], dtype=np.int64)])
+        self.norms = None
+        return len(jobs)
+
+    def idf(self):
+        """Smoothed inverse document frequency of every term."""
+        return (np.log((1 + len(self)) / (1 + self.document_frequency)) + 1).astype(np.float32)
+
+    def scores(self, profile):
+        """Returns the cosine similarity (0 to 1) of every job, in job_ids order, to a skills profile."""
+        profile_counts = collections.Counter(term for term in tokenize(profile) if term in self.terms)
+        if not len(self) or not profile_counts:
+            return np.zeros(len(self), dtype=np.float32)
+
+        idf = self.idf()
+        if self.norms is None:
+            squares = self.matrix.multiply(self.matrix).tocsr()
+            self.norms = np.sqrt(squares @ (idf * idf))
+            self.norms[self.norms == 0] = 1
+
+        columns = np.array([self.terms[term] for term in profile_counts])
+        weights = (1 + np.log(np.array(list(profile_counts.values()), dtype=np.float32))) * idf[columns]
+        query = np.zeros(len(self.terms), dtype=np.float32)
+        query[columns] = weights * idf[columns]  # One idf for the profile, one for the jobs
+        return (self.matrix @ query) / (self.norms * np.linalg.norm(weights))
+
+    def rank(self, profile, limit=500):
+        """Returns up to limit (job ID, score) pairs, best first, leaving out jobs sharing no term."""
+        scores = self.scores(profile)
+        if limit < len(scores):
+            top = np.argpartition(-scores, limit)[:limit]  # Only the shown jobs get sorted
+        else:
+            top = np.arange(len(scores))
+        top = top[np.argsort(-scores[top], kind='stable')]
+        return [(int(self.job_ids[i]), float(scores[i])) for i in top if scores[i] > 0]
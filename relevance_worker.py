@@ -0,0 +1,61 @@
+import logging
+import queue
+import threading
+from database import Database
+from ranking import RelevanceIndex, index_path
+
+class RelevanceWorker(threading.Thread):
+    """Keeps the relevance index current and ranks jobs with it, off the Tk main thread.
+
+    Requests are handled in order: update() adds the jobs stored since the last update,
+    save() also writes the index cache, and rank(profile) updates the index and puts
+    ('ranked', (profile, [(job ID, score), ...])) on `events`; a failed ranking puts
+    ('error', message) instead. The index is loaded (or built, which takes a while on a
+    large database) by the first request, and only this thread ever touches it.
+    """
+
+    def __init__(self, db_path, events, limit=500):
+        super().__init__(daemon=True)
+        self.db_path = db_path
+        self.events = events
+        self.limit = limit
+        self.requests = queue.Queue()
+
+    def update(self):
+        self.requests.put(('update', None))
+
+    def save(self):
+        self.requests.put(('save', None))
+
+    def rank(self, profile):
+        self.requests.put(('rank', profile))
+
+    def stop(self):
+        self.requests.put(None)
+
+    def run(self):
+        database = None
+        index = None
+        unsaved = False  # Jobs added since the cache was written
+        while True:
+            request = self.requests.get()
+            if request is None:
+                break
+            kind, profile = request
+            try:
+                if database is None:
+                    database = Database(self.db_path)
+                    index = RelevanceIndex.load(index_path(self.db_path))
+                unsaved = index.update(database) > 0 or unsaved
+                if kind == 'rank':
+                    self.events.put(('ranked', (profile, index.rank(profile, limit=self.limit))))
+                if unsaved and kind != 'update':
+                    index.save()
+                    unsaved = False
+            except Exception as e:
+                logging.error("Error occurred while updating the relevance index.")
+                logging.exception(e)
+                if kind == 'rank':
+                    self.events.put(('error', str(e)))
+        if database is not None:
+            database.close()
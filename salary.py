@@ -0,0 +1,97 @@
+import re
+
+# Salary periods as written on Indeed France, and as stored in the salary_period column
+PERIOD_NAMES = {
+    'heure': 'hour',
+    'jour': 'day',
+    'semaine': 'week',
+    'mois': 'month',
+    'an': 'year',
+}
+
+# Multipliers to turn an amount per period into a yearly amount
+PERIODS_PER_YEAR = {
+    'hour': 1607,  # Legal yearly working hours in France
+    'day': 218,  # Working days per year
+    'week': 52,
+    'month': 12,
+    'year': 1,
+}
+
+CURRENCIES = {
+    '€': 'EUR',
+    '$': 'USD',
+    '£': 'GBP',
+    'CHF': 'CHF',
+}
+
+# Entries of the job type list ("CDI, Temps plein") that describe the contract; the
+# others ("Temps plein", "Temps partiel") are working time and are not stored.
+CONTRACT_TYPES = ['CDI', 'CDD', 'Intérim', 'Stage', 'Alternance', "Contrat d'apprentissage",
+                  'Contrat pro', 'Indépendant / freelance', 'Freelance', 'Saisonnier', 'Bénévolat']
+
+# Typed columns of the jobs table filled from the raw salary string at ingest
+SALARY_COLUMNS = ['salary_value', 'salary_min', 'salary_max', 'salary_period', 'salary_currency', 'contract_type']
+
+AMOUNT_PATTERN = re.compile(r'(\d[\d\s  ]*(?:[.,]\d+)?)\s*(€|\$|£|CHF)')
+PERIOD_PATTERN = re.compile(r"(?:par|de\s+l['’])\s*(heure|jour|semaine|mois|an)\b", re.IGNORECASE)
+UPPER_BOUND_PATTERN = re.compile(r"^\s*jusqu['’]", re.IGNORECASE)  # "Jusqu'à 45 000 €": a maximum only
+
+def parse_amount(text):
+    """Converts a French formatted amount ("45 000", "12,50") to a float."""
+    return float(re.sub(r'[\s  ]', '', text).replace(',', '.'))
+
+def parse_contract_type(salary):
+    """Returns the contract types listed in a salary string ("CDI, CDD"), or None."""
+    job_types = salary.split(' - ', 1)[1] if AMOUNT_PATTERN.search(salary) and ' - ' in salary else salary
+    contracts = []
+    for entry in job_types.split(','):
+        entry = entry.strip().replace('’', "'")
+        if entry.lower() in (contract.lower() for contract in CONTRACT_TYPES) and entry not in contracts:
+            contracts.append(entry)
+    return ', '.join(contracts) or None
+
+def parse_salary(salary):
+    """Splits a salary string such as "De 45 000 € à 50 000 € par an - CDI" into its parts.
+
+    Returns a dict with min and max (amounts per period, either may be None), period
+    ('hour', 'day', 'week', 'month' or 'year'), currency (ISO code) and contract type.
+    """
+    parsed = {'min': None, 'max': None, 'period': None, 'currency': None, 'contract': None}
+    if not salary:
+        return parsed
+    parsed['contract'] = parse_contract_type(salary)
+
+    amounts = AMOUNT_PATTERN.findall(salary)
+    if not amounts:
+        return parsed
+    values = [parse_amount(amount) for amount, _ in amounts]
+    if len(values) >= 2:
+        parsed['min'], parsed['max'] = values[0], values[1]
+    elif UPPER_BOUND_PATTERN.search(salary):
+        parsed['max'] = values[0]
+    else:
+        parsed['min'] = values[0]  # "À partir de 42 000 €" or a single fixed amount
+
+    period = PERIOD_PATTERN.search(salary)
+    parsed['period'] = PERIOD_NAMES[period.group(1).lower()] if period else 'year'
+    parsed['currency'] = CURRENCIES[amounts[0][1]]
+    return parsed
+
+def yearly_amount(amount, period):
+    """Converts an amount per period into a yearly amount."""
+    if amount is None:
+        return None
+    return round(amount * PERIODS_PER_YEAR[period], 2)
+
+def parse_salary_value(salary):
+    """Returns the yearly lower bound of a salary string (the upper bound if only that
+    is given), or None if it has no amount. This is the value the list sorts on."""
+    return salary_columns(salary)[0]
+
+def salary_columns(salary):
+    """Returns the values of the jobs table salary columns, in SALARY_COLUMNS order."""
+    parsed = parse_salary(salary)
+    amount = parsed['min'] if parsed['min'] is not None else parsed['max']
+    return (yearly_amount(amount, parsed['period']), parsed['min'], parsed['max'], parsed['period'],
+            parsed['currency'], parsed['contract'])
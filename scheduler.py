@@ -0,0 +1,179 @@
+import argparse
+import asyncio
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from scraper import SEARCH_TERMS, LOCATION_TERMS
+from sources import SOURCES, create_source
+from storage import JobStore
+from seen_keys import SeenJobKeys
+from pacing import StageTimer
+from log_setup import setup_logging
+
+class CrawlScheduler:
+    """Crawls every (source, query, location) search concurrently on one asyncio event loop.
+
+    Each source has its own semaphore (its max_concurrency) and its own rate limiter.
+    Blocking fetches run in threads through asyncio.to_thread, on an executor sized to
+    the sum of the source limits, so a throttled or slow source never holds the threads
+    another one needs and throughput grows with the number of sources.
+
+    Scraped jobs go to a single ingest task that owns the JobStore, so SQLite still only
+    sees one writer. Incremental mode works as in ScraperPool: stored job keys are never
+    fetched again, and a search stops after max_known_pages pages without new keys.
+    """
+
+    def __init__(self, sources, queries=SEARCH_TERMS, locations=(LOCATION_TERMS,), db_path='data/jobs.db',
+                 incremental=True, max_known_pages=2, max_pages=None, max_attempts=3):
+        self.sources = sources
+        self.queries = queries
+        self.locations = locations
+        self.db_path = db_path
+        self.incremental = incremental
+        self.max_known_pages = max_known_pages
+        self.max_pages = max_pages  # Maximum number of results pages per search (None = no limit)
+        self.max_attempts = max_attempts
+
+        self.semaphores = {}
+        self.store = None
+        self.seen_keys = None
+        self.jobs = None  # Scraped jobs waiting for the ingest task
+        self.saved_count = 0
+
+    def run(self):
+        """Runs the crawl and returns the number of new jobs saved."""
+        return asyncio.run(self.crawl())
+
+    async def crawl(self):
+        asyncio.get_running_loop().set_default_executor(
+            ThreadPoolExecutor(max_workers=sum(source.max_concurrency for source in self.sources) + 1))
+        self.semaphores = {source.name: asyncio.Semaphore(source.max_concurrency) for source in self.sources}
+        self.store = await asyncio.to_thread(JobStore, self.db_path)
+        self.seen_keys = await asyncio.to_thread(SeenJobKeys, self.store) if self.incremental else set()
+        self.jobs = asyncio.Queue()
+
+        ingest = asyncio.create_task(self.ingest())
+        try:
+            await asyncio.gather(*(self.crawl_search(source, query, location)
+                                   for source in self.sources for query in self.queries for location in self.locations))
+        finally:
+            await self.jobs.put(None)
+            await ingest
+            await asyncio.to_thread(self.store.close)
+
+        logging.info(f"Scheduler finished: {self.saved_count} new jobs saved.")
+        return self.saved_count
+
+    async def call(self, source, func, *args):
+        """Runs a blocking source method in a thread, within the concurrency limit of the source."""
+        async with self.semaphores[source.name]:
+            return await asyncio.to_thread(func, *args)
+
+    async def crawl_search(self, source, query, location):
+        """Follows the results pages of one search, scraping the new jobs of each page concurrently.
+
+        The jobs of a page are scheduled as tasks and the next results page is fetched
+        right away, so listings and job pages of a search overlap; the search waits for
+        all of its jobs at the end.
+        """
+        url = source.search_url(query, location)
+        known_pages = 0  # Consecutive results pages without any new job
+        page_number = 1
+        jobs = []
+        try:
+            while url:
+                try:
+                    job_urls, next_url = await self.call(source, source.fetch_listings, url)
+                except Exception as e:
+                    logging.error(f"Error occurred while fetching results page {url} of {source.name}.")
+                    logging.exception(e)
+                    return
+
+                new_urls = []
+                for job_url in job_urls:
+                    job_key = source.job_key(job_url) or job_url
+                    if job_key not in self.seen_keys:
+                        self.seen_keys.add(job_key)  # Only the event loop thread touches seen_keys
+                        new_urls.append(job_url)
+                jobs.extend(asyncio.create_task(self.crawl_job(source, job_url)) for job_url in new_urls)
+
+                known_pages = known_pages + 1 if not new_urls else 0
+                if self.incremental and known_pages >= self.max_known_pages:
+                    logging.info(f"{known_pages} consecutive pages without new jobs on {source.name}, stopping after {url}.")
+                    next_url = None
+                elif self.max_pages is not None and page_number >= self.max_pages:
+                    next_url = None
+
+                url = next_url
+                page_number += 1
+        finally:
+            await asyncio.gather(*jobs)
+
+    async def crawl_job(self, source, url):
+        """Scrapes one job page, retrying errors, and hands the job to the ingest task."""
+        for attempt in range(1, self.max_attempts + 1):
+            try:
+                job_data = await self.call(source, source.scrape_job, url)
+            except Exception as e:
+                logging.error(f"Error occurred while processing {url} (attempt {attempt} of {self.max_attempts}).")
+                logging.exception(e)
+                continue
+            await self.jobs.put(job_data)
+            return
+
+    async def ingest(self):
+        """Single writer: drains scraped jobs into the database in batches."""
+        while True:
+            try:
+                job = await asyncio.wait_for(self.jobs.get(), timeout=self.store.flush_interval)
+            except asyncio.TimeoutError:
+                await asyncio.to_thread(self.store.flush_if_due)
+                continue
+            if job is None:
+                break
+            logging.info(f"Scraped job: {job['title']}", extra={'payload': job})
+            try:
+                if not await asyncio.to_thread(self.store.add, job):
+                    self.saved_count += 1
+            except Exception as e:
+                logging.error("Error occurred while saving a scraped job.")
+                logging.exception(e)
+
+def parse_limits(values):
+    """Parses NAME=VALUE options into {source name: float}."""
+    limits = {}
+    for value in values or []:
+        name, _, limit = value.partition('=')
+        limits[name] = float(limit)
+    return limits
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Crawl several job boards concurrently.")
+    parser.add_argument('--sources', nargs='+', choices=list(SOURCES), default=list(SOURCES), help="Job boards to crawl")
+    parser.add_argument('--queries', nargs='+', default=SEARCH_TERMS, help="Search queries, crawled separately")
+    parser.add_argument('--locations', nargs='+', default=[LOCATION_TERMS], help="Locations, crawled separately")
+    parser.add_argument('--max-pages', type=int, default=None, help="Maximum results pages per search")
+    parser.add_argument('--full', action='store_true', help="Visit every job, even those already stored")
+    parser.add_argument('--max-known-pages', type=int, default=2,
+                        help="Stop a search after this many consecutive pages without new jobs")
+    parser.add_argument('--max-attempts', type=int, default=3, help="Attempts per job page before giving up on it")
+    parser.add_argument('--concurrency', nargs='*', metavar='SOURCE=N',
+                        help="Concurrent requests per source, e.g. indeed=4 (default: the source's own limit)")
+    parser.add_argument('--rate', nargs='*', metavar='SOURCE=RATE',
+                        help="Maximum requests per second per source, e.g. indeed=2")
+    args = parser.parse_args()
+
+    setup_logging()
+    concurrency = parse_limits(args.concurrency)
+    rates = parse_limits(args.rate)
+    timings = StageTimer()
+    sources = [create_source(name, max_concurrency=int(concurrency[name]) if name in concurrency else None,
+                             requests_per_second=rates.get(name), timings=timings)
+               for name in args.sources]
+    try:
+        CrawlScheduler(sources, queries=args.queries, locations=args.locations, incremental=not args.full,
+                       max_known_pages=args.max_known_pages, max_pages=args.max_pages,
+                       max_attempts=args.max_attempts).run()
+    finally:
+        for source in sources:
+            source.close()
+        timings.report()
@@ -0,0 +1,55 @@
+import logging
+import threading
+from scraper import JobScraper
+from storage import JobStore
+
+class ScrapeWorker(threading.Thread):
+    """Runs an Indeed crawl off the Tk main thread.
+
+    Everything the UI needs to know is put on `events` as (kind, payload) tuples:
+    ('status', message), ('saved', [job IDs]), ('captcha', None), ('error', message)
+    and finally ('finished', number of jobs scraped). The UI drains the queue with
+    root.after, so no Tk call is ever made from this thread.
+    """
+
+    def __init__(self, db_path, events, batch_size=5, flush_interval=2.0):
+        super().__init__(daemon=True)
+        self.db_path = db_path
+        self.events = events
+        self.batch_size = batch_size  # Small batches so new rows show up in the list quickly
+        self.flush_interval = flush_interval
+        self.cancel_event = threading.Event()
+        self.captcha_done = threading.Event()
+
+    def run(self):
+        scraper = None
+        jobs = []
+        try:
+            self.events.put(('status', "Starting browser..."))
+            store = JobStore(self.db_path, batch_size=self.batch_size, flush_interval=self.flush_interval)
+            store.flush_listeners.append(lambda job_ids: self.events.put(('saved', job_ids)))
+            scraper = JobScraper(self.db_path, store=store, cancel_event=self.cancel_event,
+                                 captcha_handler=self.wait_for_captcha,
+                                 on_progress=lambda message: self.events.put(('status', message)))
+            jobs = scraper.scrape_indeed_jobs()
+        except Exception as e:
+            logging.error("Error occurred in the scrape worker.")
+            logging.exception(e)
+            self.events.put(('error', str(e)))
+        finally:
+            if scraper is not None:
+                scraper.close()  # Flushes the last batch, which still reaches the UI as 'saved'
+            self.events.put(('finished', len(jobs)))
+
+    def wait_for_captcha(self):
+        """CAPTCHA handler: asks the UI to prompt the user and blocks until they confirm."""
+        self.captcha_done.clear()
+        self.events.put(('captcha', None))
+        while not self.captcha_done.wait(0.5):
+            if self.cancel_event.is_set():
+                return
+
+    def cancel(self):
+        """Asks the crawl to stop after the current job card."""
+        self.cancel_event.set()
+        self.captcha_done.set()
@@ -1,71 +1,91 @@
-import time
-import random
-import sqlite3
-import os
 import logging
+import threading
+from urllib.parse import urlencode, urlparse, parse_qs
 from selenium import webdriver
 from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.common.by import By
-from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.common.exceptions import TimeoutException, NoSuchElementException, ElementClickInterceptedException
-
-# Set up logging
-logging.basicConfig(filename='job_scraper.log', level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+from storage import JobStore
+from seen_keys import SeenJobKeys
+from log_setup import setup_logging
+from checkpoint import CrawlCheckpoint, crawl_id
+from browser_profile import BrowserProfile
+from pacing import (RateLimiter, StageTimer, wait_for_page_ready, wait_for_network_idle,
+                    wait_for_results, wait_for_job_details, wait_for_height_change)
+
+SEARCH_TERMS = ["développeur fullstack", "développeur web", "ingénieur logiciel"]
+LOCATION_TERMS = "Ile-de-France, Paris"
+
+# How a results card is read: 'pane' clicks it and reads the side pane, going back only if
+# the click left the results page; 'tab' opens the job page in a second tab; 'back' clicks
+# and always goes back (the original behaviour, which reloads the results page every time)
+DETAIL_MODES = ('pane', 'tab', 'back')
+
+def prompt_captcha_in_console():
+    """Default CAPTCHA handler: waits for Enter on stdin."""
+    input("Please complete the CAPTCHA, then press Enter to continue...")
+
+def job_key_from_url(url):
+    """Returns Indeed's job key (the "jk" parameter) of a job URL, or None."""
+    return parse_qs(urlparse(url).query).get('jk', [None])[0]
 
 class JobScraper:
-    def __init__(self, db_path='data/jobs.db'):
+    def __init__(self, db_path='data/jobs.db', start_driver=True, rate_limiter=None, timings=None,
+                 wait_timeout=10, presence_timeout=2, store=None, cancel_event=None,
+                 captcha_handler=prompt_captcha_in_console, on_progress=None, profile=None, detail_mode='pane'):
         self.base_indeed_url = "https://www.indeed.fr"
         self.db_path = db_path
-        self.create_database()
-
-        # Set up Selenium options
-        options = Options()
-        options.add_argument("--no-sandbox")
-        options.add_argument("--disable-dev-shm-usage")
-        options.add_argument("user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/94.0.4606.61 Safari/537.36")
-
-        # Initialize the WebDriver
-        self.driver = webdriver.Chrome(service=Service("C:\\Users\\Utilisateur\\chromedriver-win64\\chromedriver.exe"), options=options)
-
-    def create_database(self):
-        """Creates a SQLite database to store job data if it doesn't exist."""
-        if not os.path.exists(self.db_path):
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            cursor.execute('''CREATE TABLE IF NOT EXISTS jobs (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                title TEXT NOT NULL,
-                location TEXT NOT NULL,
-                salary TEXT,
-                advantages TEXT,
-                description TEXT
-            )''')
-            conn.commit()
-            conn.close()
-            logging.info(f"Database '{self.db_path}' and 'jobs' table created successfully.")
+        self.profile = profile or BrowserProfile()
+        self.detail_mode = detail_mode
+        self._store = store  # Opened on first use: pool workers only fetch pages and never need one
+        self.seen_keys = None  # Loaded by scrape_indeed_jobs
+        self.driver = None
+
+        # Hooks for running the scraper from another thread (see scrape_worker.ScrapeWorker)
+        self.cancel_event = cancel_event or threading.Event()
+        self.captcha_handler = captcha_handler
+        self.on_progress = on_progress
+
+        # Politeness throttling is explicit here instead of fixed sleeps after every step
+        self.rate_limiter = rate_limiter or RateLimiter()
+        self.timings = timings or StageTimer()
+        self.wait_timeout = wait_timeout  # Upper bound when waiting for content that should appear
+        self.presence_timeout = presence_timeout  # Upper bound for optional elements (CAPTCHA, cookie popup)
+
+        if start_driver:
+            self.start_driver()
+
+    @property
+    def store(self):
+        if self._store is None:
+            self._store = JobStore(self.db_path)
+        return self._store
+
+    def start_driver(self):
+        """Launches the Chrome WebDriver with the scraper's browser profile."""
+        service = Service(self.profile.driver_path) if self.profile.driver_path else Service()
+        self.driver = webdriver.Chrome(service=service, options=self.profile.chrome_options())
+        self.profile.apply(self.driver)
 
     def save_to_database(self, job):
-        """Saves a job to the SQLite database if the title doesn't already exist."""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        cursor.execute('SELECT COUNT(*) FROM jobs WHERE title = ?', (job['title'],))
-        exists = cursor.fetchone()[0]
-
-        if not exists:
-            cursor.execute('''INSERT INTO jobs (title, location, salary, advantages, description) 
-                              VALUES (?, ?, ?, ?, ?)''', (
-                job['title'], job['location'], job['salary'], job['advantages'], job['description']
-            ))
-            conn.commit()
-            logging.info(f"Job '{job['title']}' saved to database.")
-            conn.close()
-            return False  # New job saved
-        else:
+        """Queues a job for a batched write unless a job with the same dedup key exists."""
+        is_duplicate = self.store.add(job)
+        if is_duplicate:
             logging.info(f"Job '{job['title']}' already exists in the database, skipping.")
-            conn.close()
-            return True  # Duplicate job found
+        else:
+            logging.info(f"Job '{job['title']}' queued for saving.")
+        return is_duplicate  # True if a duplicate job was found
+
+    def navigate(self, url, wait_idle=False):
+        """Loads a URL once the rate limiter allows it and waits for the document to be ready."""
+        self.rate_limiter.acquire(url)
+        with self.timings.stage('navigate'):
+            self.driver.get(url)
+            wait_for_page_ready(self.driver, self.wait_timeout, self.profile.ready_states)
+            if wait_idle:
+                wait_for_network_idle(self.driver, timeout=self.wait_timeout)
 
     def close_cookie_popup(self, wait):
         """Closes the cookie consent popup if present."""
@@ -82,127 +102,313 @@ class JobScraper:
             captcha = wait.until(EC.presence_of_element_located((By.XPATH, "//div[contains(@class, 'captcha')]")))
             if captcha:
                 logging.warning("CAPTCHA detected. Waiting for manual completion...")
-                input("Please complete the CAPTCHA, then press Enter to continue...")
+                self.report_progress("CAPTCHA detected, waiting for manual completion...")
+                self.captcha_handler()
         except TimeoutException:
             logging.info("No CAPTCHA detected on the page.")
 
-    def scrape_indeed_jobs(self):
-        """Scrapes jobs from Indeed."""
+    def report_progress(self, message):
+        """Forwards a progress message to the on_progress hook, if any."""
+        if self.on_progress is not None:
+            self.on_progress(message)
+
+    def scrape_indeed_jobs(self, incremental=True, max_known_pages=2, resume=True, max_attempts=3):
+        """Scrapes jobs from Indeed.
+
+        In incremental mode, cards whose job key is already stored are skipped without
+        being opened, and the crawl stops after max_known_pages consecutive results
+        pages without any new job.
+
+        The crawl is checkpointed at each results page (see checkpoint.CrawlCheckpoint):
+        after a crash or a cancel, the next run with resume=True goes straight back to
+        the page it stopped on and skips the cards it already processed. A card is tried
+        up to max_attempts times, across runs, before it is given up on; so is a results
+        page, after which the next run starts a new crawl instead of resuming it.
+        """
+        checkpoint = CrawlCheckpoint(self.store.database, crawl_id('browser', SEARCH_TERMS, LOCATION_TERMS),
+                                     max_attempts=max_attempts, resume=resume)
+        if self.seen_keys is None:
+            self.seen_keys = SeenJobKeys(self.store)
+
         logging.info("Navigating to Indeed...")
-        self.driver.get(self.base_indeed_url)
-        time.sleep(2)  # Allow some time for the page to load
+        self.navigate(self.base_indeed_url, wait_idle=True)  # Consent and CAPTCHA scripts load late
 
-        wait = WebDriverWait(self.driver, 20)
+        wait = WebDriverWait(self.driver, self.wait_timeout, poll_frequency=0.1)
+        optional_wait = WebDriverWait(self.driver, self.presence_timeout, poll_frequency=0.1)
         logging.info("Page loaded, now checking for CAPTCHA...")
         
         # Detect and handle CAPTCHA if present
-        self.detect_captcha(wait)
+        self.detect_captcha(optional_wait)
         
         logging.info("Checking for search elements...")
 
         # Close cookie popup if present
-        self.close_cookie_popup(wait)
+        self.close_cookie_popup(optional_wait)
 
+        jobs = []
         try:
-            search_box = wait.until(EC.visibility_of_element_located((By.ID, "text-input-what")))
-            location_box = wait.until(EC.visibility_of_element_located((By.ID, "text-input-where")))
-
-            search_terms = "développeur fullstack, développeur web, ingénieur logiciel"
-            location_terms = "Ile-de-France, Paris"
-
-            search_box.clear()
-            location_box.clear()
-            search_box.send_keys(search_terms)
-            location_box.send_keys(location_terms)
-            location_box.submit()
-
-            time.sleep(random.uniform(3, 6))
-
-            jobs = []
-            while True:  # Loop for pagination
+            if checkpoint.state is not None:
+                logging.info(f"Resuming from results page {checkpoint.state['page_number']}.")
+                self.open_results_page(checkpoint.state['results_url'], optional_wait)
+                page_number = checkpoint.state['page_number'] - 1
+                known_pages = checkpoint.state['known_pages']
+            else:
+                self.submit_search(wait)
+                page_number = 0
+                known_pages = 0  # Consecutive results pages without any new job
+
+            while not self.cancel_event.is_set():  # Loop for pagination
+                page_number += 1
+                results_url = self.driver.current_url
+                self.save_checkpoint(checkpoint, results_url=results_url, page_number=page_number,
+                                     known_pages=known_pages)
+                self.report_progress(f"Scraping results page {page_number} ({len(jobs)} jobs so far)...")
                 job_cards = self.driver.find_elements(By.CSS_SELECTOR, '.job_seen_beacon')
-                duplicate_found = False
-
-                for job_card in job_cards:
-                    try:
-                        job_card.click()
-                        time.sleep(random.uniform(2, 4))
-
-                        # Scroll to load job details
-                        self.scroll_to_load_details()
-
-                        job_data = {
-                            'title': self.get_job_title(),
-                            'salary': self.get_job_salary(),
-                            'location': self.get_location(),
-                            'advantages': self.get_advantages(),
-                            'description': self.get_job_description()
-                        }
-
-                        # Save job to database and log details for debugging
-                        is_duplicate = self.save_to_database(job_data)
-                        jobs.append(job_data)
-                        logging.info(f"Scraped job from Indeed: {job_data}")
-
-                        # If duplicate found, mark and break out of loop
-                        if is_duplicate:
-                            duplicate_found = True
-                            break
-
-                        # Go back to the previous page to access the next job
-                        self.driver.back()
-                        time.sleep(random.uniform(2, 4))  # Wait after returning to results page
-                    except Exception as e:
-                        logging.error("Error occurred while processing a job card.")
-                        logging.exception(e)
-
-                # If duplicate was found, attempt to go to the next page
-                if duplicate_found:
-                    try:
-                        next_button = wait.until(EC.element_to_be_clickable((By.XPATH, "//a[@aria-label='Suivant']")))
-                        next_button.click()
-                        time.sleep(random.uniform(3, 6))  # Allow the next page to load
-                    except TimeoutException:
-                        logging.info("No more pages found or it timed out. Ending scrape.")
+                card_keys = [self.get_card_job_key(job_card) for job_card in job_cards]
+                new_jobs_on_page = 0
+
+                for index, job_key in enumerate(card_keys):
+                    if self.cancel_event.is_set():
                         break
-                else:
-                    # If no duplicates were found on this page, continue scraping
-                    continue
+                    if incremental and job_key in self.seen_keys:
+                        logging.info(f"Job {job_key} already known, skipping without opening it.")
+                        continue
+                    if checkpoint.is_done(job_key):
+                        logging.info(f"Job {job_key} already processed by this crawl, skipping it.")
+                        continue
+
+                    job_data = self.scrape_card(index, job_key, results_url, checkpoint)
+                    if job_data is None:
+                        continue
+
+                    # Save job to database and log details for debugging (truncated by log_setup)
+                    is_duplicate = self.save_to_database(job_data)
+                    self.seen_keys.add(job_key)
+                    checkpoint.mark_done(job_key)
+                    jobs.append(job_data)
+                    logging.info(f"Scraped job from Indeed: {job_data['title']}", extra={'payload': job_data})
+                    self.report_progress(f"Page {page_number}: {job_data['title']}")
+
+                    if not is_duplicate:
+                        new_jobs_on_page += 1
+
+                    self.leave_job(results_url)
+
+                if self.cancel_event.is_set():
+                    logging.info("Scrape cancelled.")
+                    self.save_checkpoint(checkpoint, **checkpoint.state)
+                    break
+
+                known_pages = known_pages + 1 if new_jobs_on_page == 0 else 0
+                if incremental and known_pages >= max_known_pages:
+                    logging.info(f"{known_pages} consecutive pages without new jobs. Ending scrape.")
+                    checkpoint.finish()
+                    break
+
+                try:
+                    next_button = optional_wait.until(EC.element_to_be_clickable((By.XPATH, "//a[@aria-label='Suivant']")))
+                    self.rate_limiter.acquire(self.base_indeed_url)
+                    with self.timings.stage('next_page'):
+                        next_button.click()
+                        wait.until(EC.staleness_of(next_button))
+                        wait_for_results(self.driver, self.wait_timeout)
+                except TimeoutException:
+                    logging.info("No more pages found or it timed out. Ending scrape.")
+                    checkpoint.finish()
+                    break
 
             return jobs
         except Exception as e:
+            # The checkpoint keeps the current page, so the next run resumes here
             logging.error("Error occurred while scraping Indeed jobs.")
             logging.exception(e)
-            return []
+            if checkpoint.state is not None:
+                results_url = checkpoint.state['results_url']
+                if checkpoint.record_failure(results_url) >= checkpoint.max_attempts:
+                    # Resuming would only fail on this page again
+                    logging.warning(f"Results page {checkpoint.state['page_number']} keeps failing; "
+                                    f"the next run starts a new crawl.")
+                    self.store.flush()
+                    checkpoint.finish()
+                else:
+                    self.save_checkpoint(checkpoint, **checkpoint.state)
+            return jobs
+        finally:
+            self.store.flush()
+            self.timings.report()
+
+    def submit_search(self, wait):
+        """Fills in and submits the search form of the home page."""
+        search_box = wait.until(EC.visibility_of_element_located((By.ID, "text-input-what")))
+        location_box = wait.until(EC.visibility_of_element_located((By.ID, "text-input-where")))
+
+        search_box.clear()
+        location_box.clear()
+        search_box.send_keys(", ".join(SEARCH_TERMS))
+        location_box.send_keys(LOCATION_TERMS)
+        self.rate_limiter.acquire(self.base_indeed_url)
+        with self.timings.stage('search'):
+            location_box.submit()
+            wait_for_results(self.driver, self.wait_timeout)
+
+    def open_results_page(self, url, optional_wait=None):
+        """Loads a results page directly, e.g. the one a resumed crawl stopped on."""
+        self.navigate(url)
+        if optional_wait is not None:
+            self.detect_captcha(optional_wait)
+        wait_for_results(self.driver, self.wait_timeout)
+
+    def save_checkpoint(self, checkpoint, **state):
+        """Writes the jobs scraped so far, then records the crawl position."""
+        self.store.flush()  # Raises if the jobs could not be written, leaving their keys not done
+        checkpoint.mark_stored()
+        checkpoint.save(**state)
+
+    def scrape_card(self, index, job_key, results_url, checkpoint):
+        """Opens a results card and extracts its job, retrying on errors. Returns None if it failed."""
+        while not self.cancel_event.is_set():
+            try:
+                if self.detail_mode == 'tab' and job_key:
+                    return self.scrape_in_new_tab(job_key)
+
+                # Cards are looked up again because going back reloads the results page
+                job_card = self.driver.find_elements(By.CSS_SELECTOR, '.job_seen_beacon')[index]
+                previous_description = self.get_job_description(log_missing=False)
+                self.rate_limiter.acquire(self.base_indeed_url)
+                with self.timings.stage('open_job'):
+                    job_card.click()
+                    wait_for_job_details(self.driver, previous_description, self.wait_timeout)
+
+                # Scroll to load job details
+                self.scroll_to_load_details()
+
+                with self.timings.stage('extract'):
+                    job_data = self.extract_job_data()
+                job_data['job_key'] = job_key
+                return job_data
+            except Exception as e:
+                attempts = checkpoint.record_failure(job_key)
+                logging.error(f"Error occurred while processing job card {job_key} "
+                              f"(attempt {attempts} of {checkpoint.max_attempts}).")
+                logging.exception(e)
+                # The page may be in any state after an error, so it is reloaded
+                self.open_results_page(results_url)
+                if attempts >= checkpoint.max_attempts:
+                    return None
+        return None
+
+    def scrape_in_new_tab(self, job_key):
+        """Reads a job from its own page in a second tab, leaving the results page untouched."""
+        results_window = self.driver.current_window_handle
+        self.driver.switch_to.new_window('tab')
+        try:
+            self.profile.apply(self.driver)  # DevTools blocking is per tab
+            return self.scrape_job_page(f"{self.base_indeed_url}/viewjob?jk={job_key}")
+        finally:
+            self.driver.close()
+            self.driver.switch_to.window(results_window)
+
+    def leave_job(self, results_url):
+        """Makes the results page current again after a card was read, without reloading it if possible."""
+        if self.detail_mode == 'tab':
+            return
+        if self.detail_mode == 'pane' and urlparse(self.driver.current_url).path == urlparse(results_url).path:
+            return  # The job opened in the side pane; the next card can be clicked right away
+        self.return_to_results(results_url)
+
+    def return_to_results(self, results_url):
+        """Goes back to the results page after opening a job, reloading it if going back fails."""
+        self.rate_limiter.acquire(self.base_indeed_url)
+        try:
+            with self.timings.stage('back'):
+                self.driver.back()
+                wait_for_results(self.driver, self.wait_timeout)
+        except Exception as e:
+            logging.warning(f"Could not go back to the results page ({e.__class__.__name__}), reloading it.")
+            self.open_results_page(results_url)
+
+    def build_search_url(self, search_terms, location_terms, start=0):
+        """Builds the URL of an Indeed results page for the given search."""
+        query = urlencode({'q': search_terms, 'l': location_terms, 'start': start})
+        return f"{self.base_indeed_url}/jobs?{query}"
+
+    def fetch_results_page(self, url):
+        """Opens a results page and returns its job detail URLs and the next page URL."""
+        self.navigate(url)
+        self.detect_captcha(WebDriverWait(self.driver, self.presence_timeout, poll_frequency=0.1))
+        return self.get_result_page_links()
+
+    def get_result_page_links(self):
+        """Collects the job detail URLs and the next page URL from the current results page."""
+        job_urls = []
+        for link in self.driver.find_elements(By.CSS_SELECTOR, '.job_seen_beacon a[data-jk]'):
+            job_key = link.get_attribute('data-jk')
+            if job_key:
+                job_urls.append(f"{self.base_indeed_url}/viewjob?jk={job_key}")
+
+        try:
+            next_url = self.driver.find_element(By.XPATH, "//a[@aria-label='Suivant']").get_attribute('href')
+        except NoSuchElementException:
+            next_url = None
+        return job_urls, next_url
+
+    def get_card_job_key(self, job_card):
+        """Returns the job key of a results card, or None if it has none."""
+        try:
+            return job_card.find_element(By.CSS_SELECTOR, 'a[data-jk]').get_attribute('data-jk')
+        except NoSuchElementException:
+            return None
+
+    def scrape_job_page(self, url):
+        """Opens a job detail page directly and extracts its fields."""
+        self.navigate(url)
+        self.scroll_to_load_details()
+        with self.timings.stage('extract'):
+            job_data = self.extract_job_data()
+        job_data['job_key'] = job_key_from_url(url)
+        return job_data
+
+    def extract_job_data(self):
+        """Extracts all job fields from the currently displayed job details."""
+        return {
+            'title': self.get_job_title(),
+            'salary': self.get_job_salary(),
+            'location': self.get_location(),
+            'advantages': self.get_advantages(),
+            'description': self.get_job_description()
+        }
 
     def scroll_to_load_details(self):
         """Scrolls down the job detail page to load all content."""
-        last_height = self.driver.execute_script("return document.body.scrollHeight")
-        while True:
-            self.driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
-            time.sleep(1)  # Pause to allow content to load
-            new_height = self.driver.execute_script("return document.body.scrollHeight")
-            if new_height == last_height:
-                break
-            last_height = new_height
+        with self.timings.stage('scroll'):
+            last_height = self.driver.execute_script("return document.body.scrollHeight")
+            while True:
+                self.driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
+                # Stop as soon as the height settles instead of sleeping a fixed second per step
+                new_height = wait_for_height_change(self.driver, last_height, timeout=0.5)
+                if new_height == last_height:
+                    break
+                last_height = new_height
         logging.info("Scrolled to load all job details.")
 
     def get_job_title(self):
         """Extracts the job title from the job description page."""
         try:
-            title_element = self.driver.find_element(By.XPATH, "//h2[contains(@class, 'jobsearch-JobInfoHeader-title')]")
+            # The side pane uses an h2 while the standalone viewjob page uses an h1
+            title_element = self.driver.find_element(By.XPATH, "//*[self::h1 or self::h2][contains(@class, 'jobsearch-JobInfoHeader-title')]")
             return title_element.text.strip()
         except NoSuchElementException:
             logging.warning("Job title not found.")
             return "N/A"
     
     def get_job_salary(self):
-        """Extracts the job title from the job description page."""
+        """Extracts the raw salary and job type text; salary.parse_salary splits it into typed fields."""
         try:
             title_element = self.driver.find_element(By.XPATH, "//div[contains(@id, 'salaryInfoAndJobType')]")
             return title_element.text.strip()
         except NoSuchElementException:
             logging.warning("Job salary not found.")
+            return None
 
     def get_location(self):
         """Extracts location from the job posting."""
@@ -222,21 +428,27 @@ class JobScraper:
             logging.warning("No advantages found.")
             return "N/A"
 
-    def get_job_description(self):
+    def get_job_description(self, log_missing=True):
         """Extracts the job description."""
         try:
             description_element = self.driver.find_element(By.ID, "jobDescriptionText")
             return description_element.text.strip()
         except NoSuchElementException:
-            logging.warning("Job description not found.")
+            if log_missing:
+                logging.warning("Job description not found.")
             return "N/A"
 
     def close(self):
-        """Closes the WebDriver."""
-        self.driver.quit()
-        logging.info("WebDriver closed.")
+        """Closes the WebDriver and writes any pending jobs."""
+        if self._store is not None:
+            self._store.close()
+        if self.driver is not None:
+            self.driver.quit()
+            self.driver = None
+            logging.info("WebDriver closed.")
 
 if __name__ == "__main__":
+    setup_logging()
     scraper = JobScraper()
     try:
         scraper.scrape_indeed_jobs()
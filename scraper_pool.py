@@ -0,0 +1,274 @@
+import argparse
+import logging
+import queue
+import threading
+from scraper import JobScraper, SEARCH_TERMS, LOCATION_TERMS, job_key_from_url
+from http_fetcher import HttpJobFetcher
+from storage import JobStore
+from seen_keys import SeenJobKeys
+from pacing import RateLimiter, StageTimer
+from log_setup import setup_logging
+from browser_profile import BrowserProfile
+from checkpoint import CrawlCheckpoint, crawl_id
+
+RESULTS_PAGE = 'results'
+JOB_PAGE = 'job'
+
+def task_key(task):
+    """Key under which the checkpoint counts a task: the job key of a job page, the URL of a results page."""
+    kind, url, _, _ = task
+    return job_key_from_url(url) if kind == JOB_PAGE else url
+
+class ScraperPool:
+    """Scrapes Indeed with several WebDriver instances fed from one shared task queue.
+
+    Workers take either a results page (which yields job URLs and the next results page)
+    or a job detail page (which yields job data). A single writer thread drains the scraped
+    jobs into the database so SQLite only ever sees one writer.
+
+    With engine='http' the workers are HttpJobFetcher instances, which only start a
+    browser when a page needs one.
+
+    In incremental mode, job pages whose key is already stored are never queued, and a
+    search stops paging after max_known_pages consecutive pages without new keys.
+
+    The writer thread also tracks the tasks still pending and checkpoints them after
+    each results page (see checkpoint.CrawlCheckpoint), so with resume=True an
+    interrupted crawl restarts from its pending tasks instead of the first results
+    pages. Failed pages are retried up to max_attempts times, across runs; a results
+    page that runs out of attempts ends its search, so the crawl can still finish.
+    """
+
+    def __init__(self, num_workers=5, db_path='data/jobs.db', search_terms=SEARCH_TERMS,
+                 location_terms=LOCATION_TERMS, max_pages=None, engine='selenium',
+                 incremental=True, max_known_pages=2, requests_per_second=2.0, resume=True,
+                 max_attempts=3, browser_profile=None):
+        self.num_workers = num_workers
+        self.db_path = db_path
+        self.engine = engine
+        self.incremental = incremental
+        self.max_known_pages = max_known_pages
+        self.search_terms = search_terms
+        self.location_terms = location_terms
+        self.max_pages = max_pages  # Maximum number of results pages per search term (None = no limit)
+        self.resume = resume
+        self.max_attempts = max_attempts
+        self.browser_profile = browser_profile
+
+        # Shared by all workers so the pool as a whole respects the per-host rate
+        self.rate_limiter = RateLimiter(rate=requests_per_second, burst=num_workers)
+        self.timings = StageTimer()
+
+        self.tasks = queue.Queue()
+        self.results = queue.Queue()
+        self.seen_keys = None
+        self.seen_lock = threading.Lock()
+        self.scrapers = []
+        self.store = None
+        self.checkpoint = None
+        self.outstanding = set()  # Tasks queued or running; only touched by the writer thread once it runs
+
+    def create_worker(self):
+        """Creates the fetch engine used by one worker."""
+        if self.engine == 'http':
+            return HttpJobFetcher(self.db_path, rate_limiter=self.rate_limiter, timings=self.timings,
+                                  browser_profile=self.browser_profile)
+        return JobScraper(self.db_path, rate_limiter=self.rate_limiter, timings=self.timings,
+                          profile=self.browser_profile)
+
+    def run(self):
+        """Runs the crawl for every search term and returns the number of new jobs saved."""
+        self.scrapers = [self.create_worker() for _ in range(self.num_workers)]
+        self.store = JobStore(self.db_path)
+        self.seen_keys = SeenJobKeys(self.store) if self.incremental else set()
+        self.checkpoint = CrawlCheckpoint(self.store.database, crawl_id('pool', self.search_terms, self.location_terms),
+                                          max_attempts=self.max_attempts, resume=self.resume)
+        saved_count = [0]
+
+        self.outstanding = set(self.initial_tasks())
+        for task in self.outstanding:
+            if task[0] == JOB_PAGE:
+                self.seen_keys.add(job_key_from_url(task[1]))  # Not queued again by a results page
+            self.tasks.put(task)
+
+        writer = threading.Thread(target=self._write_results, args=(saved_count,), daemon=True)
+        writer.start()
+
+        workers = [threading.Thread(target=self._work, args=(scraper,), daemon=True) for scraper in self.scrapers]
+        for worker in workers:
+            worker.start()
+
+        try:
+            self.tasks.join()  # Wait until every queued page has been processed
+        finally:
+            self.drain_tasks()  # Only left over when interrupted; they stay pending in the checkpoint
+            for _ in workers:
+                self.tasks.put(None)  # One stop signal per worker
+            for worker in workers:
+                worker.join()
+            self.results.put(None)
+            writer.join()
+            self.close()
+
+        logging.info(f"Scraper pool finished: {saved_count[0]} new jobs saved.")
+        self.timings.report()
+        return saved_count[0]
+
+    def initial_tasks(self):
+        """Returns the pending tasks of the interrupted crawl being resumed, or the first results pages."""
+        if self.checkpoint.state is not None:
+            tasks = [tuple(task) for task in self.checkpoint.state['pending']]
+            return [task for task in tasks if not self.checkpoint.is_done(task_key(task))]
+        return [(RESULTS_PAGE, self.scrapers[0].build_search_url(search_terms, self.location_terms), 1, 0)
+                for search_terms in self.search_terms]
+
+    def drain_tasks(self):
+        """Removes the tasks no worker has started."""
+        while True:
+            try:
+                self.tasks.get_nowait()
+            except queue.Empty:
+                break
+            self.tasks.task_done()
+
+    def _work(self, scraper):
+        """Processes tasks from the shared queue until a stop signal is received.
+
+        Outcomes go to the writer thread as (task, outcome) pairs: the job data of a job
+        page, the tasks queued by a results page, or None for a failed attempt.
+        """
+        while True:
+            task = self.tasks.get()
+            if task is None:
+                self.tasks.task_done()
+                break
+
+            kind, url, page_number, known_pages = task
+            attempts = self.checkpoint.attempts_left(task_key(task))
+            try:
+                for attempt in range(1, attempts + 1):
+                    try:
+                        if kind == RESULTS_PAGE:
+                            self._process_results_page(scraper, task)
+                        else:
+                            self.results.put((task, scraper.scrape_job_page(url)))
+                        break
+                    except Exception as e:
+                        logging.error(f"Error occurred while processing {url} (attempt {attempt} of {attempts}).")
+                        logging.exception(e)
+                        self.results.put((task, None))
+            finally:
+                self.tasks.task_done()
+
+    def _process_results_page(self, scraper, task):
+        """Queues the unknown job pages of a results page, then the next results page."""
+        _, url, page_number, known_pages = task
+        job_urls, next_url = scraper.fetch_results_page(url)
+        new_tasks = []
+        for job_url in job_urls:
+            job_key = job_key_from_url(job_url) or job_url
+            with self.seen_lock:
+                if job_key in self.seen_keys or self.checkpoint.is_done(job_key):
+                    continue
+                self.seen_keys.add(job_key)
+            new_tasks.append((JOB_PAGE, job_url, page_number, 0))
+
+        known_pages = known_pages + 1 if not new_tasks else 0
+        if self.incremental and known_pages >= self.max_known_pages:
+            logging.info(f"{known_pages} consecutive pages without new jobs, stopping after {url}.")
+        elif next_url and (self.max_pages is None or page_number < self.max_pages):
+            new_tasks.append((RESULTS_PAGE, next_url, page_number + 1, known_pages))
+
+        # The writer hears about the new tasks before any of them can complete
+        self.results.put((task, new_tasks))
+        for new_task in new_tasks:
+            self.tasks.put(new_task)
+
+    def _write_results(self, saved_count):
+        """Single writer: drains scraped jobs into the database in batches and checkpoints the crawl."""
+        while True:
+            try:
+                event = self.results.get(timeout=self.store.flush_interval)
+            except queue.Empty:
+                self.store.flush_if_due()
+                continue
+            if event is None:
+                break
+            task, outcome = event
+            try:
+                if outcome is None:
+                    self._record_failure(task)
+                elif task[0] == RESULTS_PAGE:
+                    self.outstanding.discard(task)
+                    self.outstanding.update(outcome)
+                    self.save_checkpoint()
+                else:
+                    if not self.store.add(outcome):
+                        saved_count[0] += 1
+                    self.outstanding.discard(task)
+                    self.checkpoint.mark_done(outcome.get('job_key'))
+            except Exception as e:
+                logging.error("Error occurred while saving a scraped job.")
+                logging.exception(e)
+
+        if self.outstanding:
+            logging.info(f"Crawl interrupted with {len(self.outstanding)} pending pages; the next run resumes them.")
+            self.save_checkpoint()
+        else:
+            self.store.flush()
+            self.checkpoint.finish()
+        self.store.close()
+
+    def _record_failure(self, task):
+        """Counts a failed attempt at a page; it stays pending until it runs out of attempts."""
+        key = task_key(task)
+        self.checkpoint.record_failure(key)
+        if key is None or self.checkpoint.is_done(key):
+            self.outstanding.discard(task)
+            if task[0] == RESULTS_PAGE:
+                logging.warning(f"Results page {task[2]} failed {self.max_attempts} times; "
+                                f"its search stops there for this crawl: {task[1]}")
+
+    def save_checkpoint(self):
+        """Writes the jobs scraped so far, then the pending tasks and the job keys done."""
+        self.store.flush()  # Raises if the jobs could not be written, leaving their keys not done
+        self.checkpoint.mark_stored()
+        self.checkpoint.save(pending=[list(task) for task in sorted(self.outstanding)])
+
+    def close(self):
+        """Closes every WebDriver of the pool."""
+        for scraper in self.scrapers:
+            scraper.close()
+        self.scrapers = []
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Scrape Indeed with a pool of browsers.")
+    parser.add_argument('--workers', type=int, default=5, help="Number of browser instances")
+    parser.add_argument('--max-pages', type=int, default=None, help="Maximum results pages per search term")
+    parser.add_argument('--engine', choices=['selenium', 'http'], default='selenium', help="Fetch engine used by the workers")
+    parser.add_argument('--full', action='store_true', help="Visit every job, even those already stored")
+    parser.add_argument('--max-known-pages', type=int, default=2,
+                        help="Stop a search after this many consecutive pages without new jobs")
+    parser.add_argument('--rate', type=float, default=2.0, help="Maximum requests per second to Indeed")
+    parser.add_argument('--restart', action='store_true',
+                        help="Start over instead of resuming an interrupted crawl with the same search")
+    parser.add_argument('--max-attempts', type=int, default=3, help="Attempts per page before giving up on it")
+    parser.add_argument('--headless', action='store_true', help="Run the browsers without a window")
+    parser.add_argument('--full-browser', action='store_true',
+                        help="Load images, fonts and third-party requests and wait for full page loads")
+    parser.add_argument('--driver-path', help="chromedriver executable (default: CHROMEDRIVER_PATH or Selenium Manager)")
+    parser.add_argument('--log-field-length', type=int, default=200,
+                        help="Characters of each scraped field kept in the log")
+    parser.add_argument('--log-sample-every', type=int, default=1,
+                        help="Log the scraped fields of one job in every N")
+    args = parser.parse_args()
+
+    setup_logging(max_field_length=args.log_field_length, sample_every=args.log_sample_every)
+    if args.full_browser:
+        browser_profile = BrowserProfile.full(headless=args.headless, driver_path=args.driver_path)
+    else:
+        browser_profile = BrowserProfile(headless=args.headless, driver_path=args.driver_path)
+    ScraperPool(num_workers=args.workers, max_pages=args.max_pages, engine=args.engine,
+                incremental=not args.full, max_known_pages=args.max_known_pages,
+                requests_per_second=args.rate, resume=not args.restart, max_attempts=args.max_attempts,
+                browser_profile=browser_profile).run()
@@ -0,0 +1,152 @@
+import re
+import sqlite3
+import unicodedata
+
+SNIPPET_START = "«"
+SNIPPET_END = "»"
+SNIPPET_TOKENS = 20  # Words in a snippet
+
+# Words as the unicode61 tokenizer of the index sees them (underscores separate words)
+WORD_PATTERN = re.compile(r'[^\W_]+')
+QUERY_TERM_PATTERN = re.compile(r'([^\W_]+)(\*?)')
+QUERY_KEYWORDS = {'AND', 'OR', 'NOT', 'NEAR'}
+
+def create_search_index(connection, jobs=()):
+    """(Re)creates the jobs_fts full-text index and indexes jobs, given as
+    (id, title, location, advantages, description) tuples.
+
+    The index is contentless (content=''): it stores only the inverted index, not the
+    texts, and there are no triggers, so the schema is plain SQL that any SQLite client
+    can read and write. Database keeps the index in sync: insert_jobs indexes the jobs it
+    inserts, and delete_jobs and update_job remove the old entries with the original
+    texts, which FTS5 needs to delete from a contentless index. Jobs deleted or edited
+    through another connection leave stale entries behind: searches join jobs, so deleted
+    jobs never show up (AUTOINCREMENT never reuses their IDs), and
+    Database.rebuild_search_index() brings edited ones back in sync.
+    """
+    statements = [
+        # Also removes the indexes of earlier versions, which read the texts through triggers
+        'DROP TRIGGER IF EXISTS jobs_fts_insert',
+        'DROP TRIGGER IF EXISTS jobs_fts_update',
+        'DROP TRIGGER IF EXISTS jobs_fts_update_before',
+        'DROP TRIGGER IF EXISTS jobs_fts_update_after',
+        'DROP TRIGGER IF EXISTS jobs_fts_delete',
+        'DROP TABLE IF EXISTS jobs_fts',
+        'DROP VIEW IF EXISTS jobs_fts_content',
+        '''CREATE VIRTUAL TABLE jobs_fts USING fts5(
+            title, location, advantages, description,
+            content='',
+            tokenize='unicode61 remove_diacritics 2'
+        )''',
+    ]
+    # Executed one by one (not executescript) so they stay in the caller's transaction
+    for statement in statements:
+        connection.execute(statement)
+    index_jobs(connection, jobs)
+
+def index_jobs(connection, jobs):
+    """Adds jobs, (id, title, location, advantages, description) tuples, to the index."""
+    connection.executemany('INSERT INTO jobs_fts (rowid, title, location, advantages, description) '
+                           'VALUES (?, ?, ?, ?, ?)', jobs)
+
+def unindex_jobs(connection, jobs):
+    """Removes jobs from the index; the texts must be the ones they were indexed with."""
+    connection.executemany("INSERT INTO jobs_fts (jobs_fts, rowid, title, location, advantages, description) "
+                           "VALUES ('delete', ?, ?, ?, ?, ?)", jobs)
+
+def quote_terms(query):
+    """Turns free text into an FTS5 query that matches all of its words."""
+    terms = re.findall(r'\w+', query)
+    return ' '.join(f'"{term}"' for term in terms)
+
+def match(connection, sql, query, params=()):
+    """Runs a query whose first parameter is an FTS5 query, retrying invalid queries as
+    a plain list of words."""
+    try:
+        return connection.execute(sql, (query,) + tuple(params)).fetchall()
+    except sqlite3.OperationalError:
+        fallback = quote_terms(query)
+        if not fallback:
+            return []
+        return connection.execute(sql, (fallback,) + tuple(params)).fetchall()
+
+def search_jobs(connection, query, limit=500, snippet_rows=50):
+    """Returns jobs matching an FTS5 query, best match first.
+
+    Accepts the FTS5 syntax ("React AND Paris NOT stage", "full*", "\\"node js\\"");
+    text that is not a valid FTS5 query is searched as a plain list of words.
+    Each row is (id, title, location, salary, advantages preview, description, checked,
+    rank). The description is a snippet with matched words wrapped in « » for the first
+    snippet_rows rows and the stored preview for the others: snippets decompress the
+    whole text, so they are only built for the rows on screen (see search_snippets).
+    """
+    rows = match(connection, '''SELECT j.id, j.title, j.location, j.salary, j.advantages_preview,
+                                      j.description_preview, j.checked,
+                                      bm25(jobs_fts, 10.0, 2.0, 1.0, 1.0) AS rank
+                               FROM jobs_fts JOIN jobs j ON j.id = jobs_fts.rowid
+                               WHERE jobs_fts MATCH ?
+                               ORDER BY rank
+                               LIMIT ?''', query, (limit,))
+    snippets = search_snippets(connection, query, [row[0] for row in rows[:snippet_rows]])
+    return [row[:5] + (snippets.get(row[0], row[5]),) + row[6:] for row in rows]
+
+def search_snippets(connection, query, job_ids):
+    """Returns {job ID: description snippet} of the given jobs for an FTS5 query."""
+    if not job_ids:
+        return {}
+    placeholders = ','.join('?' * len(job_ids))
+    rows = connection.execute(f'SELECT job_id, job_text(dict_id, description) FROM job_texts '
+                              f'WHERE job_id IN ({placeholders})', list(job_ids))
+    terms = query_terms(query)
+    return {job_id: snippet(description, terms) for job_id, description in rows if description}
+
+def fold(word):
+    """Lowercases a word and strips its accents, as the index tokenizer does."""
+    return ''.join(c for c in unicodedata.normalize('NFKD', word) if not unicodedata.combining(c)).lower()
+
+def query_terms(query):
+    """Returns the (word, is prefix) terms of an FTS5 query, leaving out operators and column names."""
+    terms = []
+    for term in QUERY_TERM_PATTERN.finditer(query):
+        word, star = term.groups()
+        if word in QUERY_KEYWORDS or query[term.end():term.end() + 1] == ':':
+            continue
+        terms.append((fold(word), bool(star)))
+    return terms
+
+def snippet(text, terms, length=SNIPPET_TOKENS):
+    """Returns the length words of text holding the most distinct query terms, with the
+    matched words wrapped in « » and … where the text was cut (like FTS5's snippet())."""
+    words = list(WORD_PATTERN.finditer(text))
+    if not words:
+        return text.replace('\n', ' ')
+    hits = {}  # Word index -> matched term
+    for index, word in enumerate(words):
+        folded = fold(word.group())
+        for term, prefix in terms:
+            if folded == term or (prefix and folded.startswith(term)):
+                hits[index] = term
+                break
+
+    start = 0
+    best = (0, 0)
+    for index in sorted(hits):
+        candidate = max(0, min(index - 2, len(words) - length))  # A little context before the match
+        window = [term for i, term in hits.items() if candidate <= i < candidate + length]
+        score = (len(set(window)), len(window))
+        if score > best:
+            best, start = score, candidate
+    end = min(start + length, len(words))
+
+    parts = ['…' if start > 0 else '']
+    position = words[start].start()
+    for index in range(start, end):
+        if index in hits:
+            word = words[index]
+            parts += [text[position:word.start()], SNIPPET_START, word.group(), SNIPPET_END]
+            position = word.end()
+    if end < len(words):
+        parts += [text[position:words[end - 1].end()], '…']
+    else:
+        parts.append(text[position:].rstrip())
+    return ''.join(parts).replace('\n', ' ')
@@ -0,0 +1,55 @@
+import hashlib
+import math
+
+class BloomFilter:
+    """Fixed-size Bloom filter over strings (no false negatives, tunable false positives)."""
+
+    def __init__(self, expected_items=100000, error_rate=0.001):
+        expected_items = max(expected_items, 1)
+        self.size = max(8, int(-expected_items * math.log(error_rate) / (math.log(2) ** 2)))
+        self.hash_count = max(1, round(self.size / expected_items * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+
+    def _positions(self, item):
+        digest = hashlib.blake2b(item.encode('utf-8'), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], 'little')
+        h2 = int.from_bytes(digest[8:], 'little') | 1
+        return ((h1 + i * h2) % self.size for i in range(self.hash_count))
+
+    def add(self, item):
+        for position in self._positions(item):
+            self.bits[position >> 3] |= 1 << (position & 7)
+
+    def __contains__(self, item):
+        return all(self.bits[position >> 3] & (1 << (position & 7)) for position in self._positions(item))
+
+class SeenJobKeys:
+    """Indeed job keys already stored, preloaded from the jobs table at startup.
+
+    By default the keys are held in a set. With use_bloom=True they are held in a
+    Bloom filter instead, and positive answers are confirmed against the database so
+    a false positive never causes a new job to be skipped.
+    """
+
+    def __init__(self, store, use_bloom=False, error_rate=0.001):
+        self.store = store
+        self.use_bloom = use_bloom
+
+        keys = store.job_keys()
+        if use_bloom:
+            self.keys = BloomFilter(expected_items=max(len(keys) * 2, 10000), error_rate=error_rate)
+        else:
+            self.keys = set()
+        for key in keys:
+            self.keys.add(key)
+
+    def __contains__(self, job_key):
+        if not job_key or job_key not in self.keys:
+            return False
+        if self.use_bloom:
+            return self.store.has_job_key(job_key)
+        return True
+
+    def add(self, job_key):
+        if job_key:
+            self.keys.add(job_key)
@@ -0,0 +1,15 @@
+"""Job board plugins crawled by scheduler.CrawlScheduler (see sources.base.JobSource)."""
+from sources.base import JobSource
+from sources.indeed import IndeedSource
+
+# Source name -> plugin class; a new job board only needs an entry here
+SOURCES = {
+    IndeedSource.name: IndeedSource,
+}
+
+def create_source(name, **options):
+    """Instantiates a registered source by name."""
+    try:
+        return SOURCES[name](**options)
+    except KeyError:
+        raise ValueError(f"Unknown source '{name}', expected one of: {', '.join(SOURCES)}")
@@ -0,0 +1,57 @@
+from abc import ABC, abstractmethod
+from pacing import RateLimiter, StageTimer
+
+class JobSource(ABC):
+    """Interface of a job board plugin, crawled by scheduler.CrawlScheduler.
+
+    A source builds the URL of the first results page of a (query, location) search,
+    lists the job detail URLs and the next page of a results page, and fetches and
+    parses a job detail page into the fields JobStore expects. Its methods block; the
+    scheduler runs them in threads, at most max_concurrency at a time per source, and
+    the source paces its own requests with rate_limiter.
+
+    The four steps are abstract methods, so a plugin missing one fails when it is
+    created rather than in the middle of a crawl.
+    """
+
+    name = None
+    max_concurrency = 4
+    requests_per_second = 1.0
+
+    def __init__(self, db_path='data/jobs.db', max_concurrency=None, requests_per_second=None, timings=None):
+        self.db_path = db_path
+        if max_concurrency is not None:
+            self.max_concurrency = max_concurrency
+        if requests_per_second is not None:
+            self.requests_per_second = requests_per_second
+        self.rate_limiter = RateLimiter(rate=self.requests_per_second, burst=self.max_concurrency)
+        self.timings = timings or StageTimer()
+
+    @abstractmethod
+    def search_url(self, query, location):
+        """Returns the URL of the first results page of a search."""
+
+    @abstractmethod
+    def fetch_listings(self, url):
+        """Returns the job detail URLs of a results page and the next page URL (or None)."""
+
+    @abstractmethod
+    def fetch_detail(self, url):
+        """Downloads a job detail page and returns it in the form parse_fields takes."""
+
+    @abstractmethod
+    def parse_fields(self, page, url):
+        """Extracts the job fields (title, salary, location, advantages, description) of a detail page."""
+
+    def job_key(self, url):
+        """Returns the key identifying a job of this source across runs, or None."""
+        return f"{self.name}:{url}"
+
+    def scrape_job(self, url):
+        """Fetches and parses a job detail page into a job dict ready for JobStore.add."""
+        job_data = self.parse_fields(self.fetch_detail(url), url)
+        job_data['job_key'] = self.job_key(url)
+        return job_data
+
+    def close(self):
+        """Releases the connections (and browsers) of the source."""
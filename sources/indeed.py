@@ -0,0 +1,59 @@
+import logging
+import threading
+from http_fetcher import HttpJobFetcher, BrowserRequired, parse_job_page, parse_results_page
+from scraper import job_key_from_url
+from sources.base import JobSource
+
+class IndeedSource(JobSource):
+    """indeed.fr over plain HTTP with lxml, falling back to Selenium on CAPTCHA or JS-only pages.
+
+    The HTTP session is shared by the scheduler threads; the fallback browser is not
+    thread-safe, so pages that need it are rendered one at a time.
+    """
+
+    name = 'indeed'
+    max_concurrency = 4
+    requests_per_second = 2.0
+
+    def __init__(self, base_url="https://www.indeed.fr", browser_profile=None, **options):
+        super().__init__(**options)
+        self.fetcher = HttpJobFetcher(self.db_path, base_url, pool_size=self.max_concurrency,
+                                      rate_limiter=self.rate_limiter, timings=self.timings,
+                                      browser_profile=browser_profile)
+        self.browser_lock = threading.Lock()
+
+    def search_url(self, query, location):
+        return self.fetcher.build_search_url(query, location)
+
+    def fetch_listings(self, url):
+        try:
+            job_urls, next_url = parse_results_page(self.fetcher.fetch_page(url), self.fetcher.base_indeed_url)
+            if job_urls:
+                return job_urls, next_url
+            logging.warning(f"No job cards in static HTML of {url}, falling back to Selenium.")
+        except BrowserRequired as e:
+            logging.warning(f"{e}, falling back to Selenium.")
+        with self.browser_lock:
+            return self.fetcher.get_browser().fetch_results_page(url)
+
+    def fetch_detail(self, url):
+        return self.fetcher.fetch_page(url)
+
+    def parse_fields(self, document, url):
+        with self.timings.stage('extract'):
+            return parse_job_page(document)
+
+    def job_key(self, url):
+        # Same keys as the Selenium scraper and the pool, so all of them skip each other's jobs
+        return job_key_from_url(url)
+
+    def scrape_job(self, url):
+        try:
+            return super().scrape_job(url)
+        except BrowserRequired as e:
+            logging.warning(f"{e}, falling back to Selenium.")
+            with self.browser_lock:
+                return self.fetcher.get_browser().scrape_job_page(url)
+
+    def close(self):
+        self.fetcher.close()
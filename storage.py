@@ -0,0 +1,132 @@
+import logging
+import time
+from database import Database
+from dedup import fingerprint, MinHasher
+from salary import salary_columns
+
+class JobStore:
+    """Buffered job writer on top of a Database.
+
+    Jobs are queued in memory and written with one executemany per batch, inside a
+    single transaction, once batch_size jobs are pending or flush_interval seconds have
+    passed. A unique index on the job fingerprint lets SQLite drop duplicates on insert.
+
+    With near_duplicates=True, descriptions are also MinHashed and indexed by LSH band
+    so reposts with small edits are caught without comparing against every stored job.
+    """
+
+    def __init__(self, db_path='data/jobs.db', batch_size=100, flush_interval=5.0,
+                 near_duplicates=False, similarity_threshold=0.8):
+        self.db_path = db_path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.similarity_threshold = similarity_threshold
+        self.minhasher = MinHasher() if near_duplicates else None
+        self.database = Database(db_path)
+
+        self.pending = []
+        self.pending_keys = set()
+        self.pending_job_keys = set()
+        self.pending_signatures = {}  # fingerprint -> MinHash signature of pending jobs
+        self.flush_listeners = []  # Callables receiving the IDs of the jobs inserted by each flush
+        self.last_flush = time.monotonic()
+
+        if self.minhasher is not None:
+            self.backfill_minhashes()
+
+    def backfill_minhashes(self, batch_size=1000):
+        """Indexes the descriptions of jobs that have no MinHash signature yet, one transaction per batch."""
+        count = 0
+        last_id = 0
+        while True:
+            rows = self.database.jobs_without_signature(last_id, batch_size)
+            if not rows:
+                break
+            self.index_signatures({job_id: self.minhasher.signature(description) for job_id, description in rows})
+            count += len(rows)
+            last_id = rows[-1][0]
+        if count:
+            logging.info(f"Indexed {count} job descriptions for near-duplicate detection.")
+
+    def index_signatures(self, signatures):
+        """Stores the signatures (job ID -> signature) and LSH buckets of jobs."""
+        self.database.store_signatures([(job_id, MinHasher.to_blob(signature), self.minhasher.buckets(signature))
+                                        for job_id, signature in signatures.items()])
+
+    def exists(self, key):
+        """Checks if a job with this fingerprint is stored or waiting to be written."""
+        return key in self.pending_keys or self.database.fingerprint_exists(key)
+
+    def job_keys(self):
+        """Returns the job keys of all stored jobs."""
+        return self.database.job_keys()
+
+    def has_job_key(self, job_key):
+        """Checks if a job with this job key is stored or waiting to be written."""
+        return job_key in self.pending_job_keys or self.database.job_key_exists(job_key)
+
+    def find_near_duplicate(self, signature):
+        """Returns the id of a stored job (or True for a pending one) with a similar description."""
+        for pending_signature in self.pending_signatures.values():
+            if MinHasher.similarity(signature, pending_signature) >= self.similarity_threshold:
+                return True
+
+        for job_id, blob in self.database.signatures_in_buckets(self.minhasher.buckets(signature)):
+            if MinHasher.similarity(signature, MinHasher.from_blob(blob)) >= self.similarity_threshold:
+                return job_id
+        return None
+
+    def add(self, job):
+        """Queues a job for insertion. Returns True if it is a duplicate (and was not queued)."""
+        key = fingerprint(job)
+        if self.exists(key):
+            return True
+
+        if self.minhasher is not None:
+            signature = self.minhasher.signature(job['description'])
+            if self.find_near_duplicate(signature):
+                return True
+            self.pending_signatures[key] = signature
+
+        self.pending.append((job['title'], job['location'], job['salary'], job['advantages'], job['description'],
+                             key, job.get('job_key')) + salary_columns(job['salary']))
+        self.pending_keys.add(key)
+        if job.get('job_key'):
+            self.pending_job_keys.add(job['job_key'])
+        if len(self.pending) >= self.batch_size:
+            self.flush()
+        else:
+            self.flush_if_due()
+        return False
+
+    def flush_if_due(self):
+        """Flushes pending jobs if flush_interval has elapsed since the last flush."""
+        if self.pending and time.monotonic() - self.last_flush >= self.flush_interval:
+            self.flush()
+
+    def flush(self):
+        """Writes all pending jobs in one transaction. Returns the number of rows inserted."""
+        self.last_flush = time.monotonic()
+        if not self.pending:
+            return 0
+
+        inserted_ids = self.database.insert_jobs(self.pending)  # Pending jobs are kept if this raises
+        batch, signatures = self.pending, self.pending_signatures
+        self.pending, self.pending_keys, self.pending_job_keys, self.pending_signatures = [], set(), set(), {}
+        if signatures:
+            self.index_signatures({inserted_ids[key]: signature for key, signature in signatures.items()
+                                   if key in inserted_ids})
+
+        for listener in self.flush_listeners:
+            listener(sorted(inserted_ids.values()))
+        logging.info(f"Flushed {len(inserted_ids)} new jobs to the database "
+                     f"({len(batch) - len(inserted_ids)} skipped as duplicates).")
+        return len(inserted_ids)
+
+    def close(self):
+        """Flushes pending jobs, trains a new text dictionary if one is due and closes the database."""
+        try:
+            self.flush()
+            self.database.train_dictionary_if_due()
+        finally:
+            self.database.close()
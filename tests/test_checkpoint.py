@@ -0,0 +1,79 @@
+"""Crawl checkpoints: saving progress with the stored jobs and resuming it in a later run."""
+import pytest
+from checkpoint import CrawlCheckpoint
+from storage import JobStore
+
+CRAWL = "browser|développeur python|Paris"
+RESULTS_URL = "https://www.indeed.fr/jobs?q=d%C3%A9veloppeur+python&l=Paris&start=10"
+
+@pytest.fixture
+def store(tmp_path):
+    store = JobStore(str(tmp_path / 'jobs.db'))
+    yield store
+    store.close()
+
+def make_job(job_key):
+    return {'title': f"Développeur {job_key}", 'location': "Paris (75)", 'salary': None, 'advantages': "N/A",
+            'description': f"Poste {job_key}.", 'job_key': job_key}
+
+def scrape(store, checkpoint, job_key):
+    store.add(make_job(job_key))
+    checkpoint.mark_done(job_key)
+
+def save_checkpoint(store, checkpoint, **state):
+    """What the scrapers do at each results page boundary."""
+    store.flush()
+    checkpoint.mark_stored()
+    checkpoint.save(**state)
+
+def test_resumes_from_the_saved_page(store):
+    checkpoint = CrawlCheckpoint(store.database, CRAWL)
+    assert checkpoint.state is None
+    scrape(store, checkpoint, 'jk1')
+    scrape(store, checkpoint, 'jk2')
+    save_checkpoint(store, checkpoint, results_url=RESULTS_URL, page_number=2)
+    scrape(store, checkpoint, 'jk3')  # Scraped after the last save: lost with the crash
+
+    resumed = CrawlCheckpoint(store.database, CRAWL)
+    assert resumed.state == {'results_url': RESULTS_URL, 'page_number': 2}
+    assert resumed.done_keys == {'jk1', 'jk2'}
+    assert not resumed.is_done('jk3')
+
+    assert CrawlCheckpoint(store.database, "browser|data|Lyon").state is None  # Another search
+
+def test_job_keys_are_done_only_once_stored(store, monkeypatch):
+    checkpoint = CrawlCheckpoint(store.database, CRAWL)
+    scrape(store, checkpoint, 'jk1')
+    assert checkpoint.is_done('jk1')  # Not scraped again in this run
+    assert checkpoint.new_done_keys == set()
+
+    def failing_insert(rows):
+        raise OSError("disk full")
+    monkeypatch.setattr(store.database, 'insert_jobs', failing_insert)
+    with pytest.raises(OSError):
+        save_checkpoint(store, checkpoint, results_url=RESULTS_URL, page_number=1)
+    assert CrawlCheckpoint(store.database, CRAWL).done_keys == set()
+
+    monkeypatch.undo()
+    save_checkpoint(store, checkpoint, results_url=RESULTS_URL, page_number=1)  # The batch was kept
+    assert store.database.job_keys() == ['jk1']
+    assert CrawlCheckpoint(store.database, CRAWL).done_keys == {'jk1'}
+
+def test_gives_up_after_max_attempts_across_runs(store):
+    for attempt in range(1, 4):
+        checkpoint = CrawlCheckpoint(store.database, CRAWL, max_attempts=3)
+        assert not checkpoint.is_done('jk1')
+        assert checkpoint.record_failure('jk1') == attempt
+    assert checkpoint.is_done('jk1')
+    assert CrawlCheckpoint(store.database, CRAWL, max_attempts=3).is_done('jk1')
+
+def test_finished_or_restarted_crawls_start_over(store):
+    checkpoint = CrawlCheckpoint(store.database, CRAWL)
+    scrape(store, checkpoint, 'jk1')
+    save_checkpoint(store, checkpoint, results_url=RESULTS_URL, page_number=2)
+    restarted = CrawlCheckpoint(store.database, CRAWL, resume=False)
+    assert restarted.state is None and restarted.done_keys == set()
+
+    save_checkpoint(store, restarted, results_url=RESULTS_URL, page_number=2)
+    restarted.finish()
+    assert CrawlCheckpoint(store.database, CRAWL).state is None
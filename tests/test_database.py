@@ -0,0 +1,181 @@
+"""Database migrations, writes and reads against a temporary jobs.db."""
+import sqlite3
+import pytest
+from database import Database, MIGRATIONS, TRAINING_MIN_TEXTS, table_columns
+from dedup import fingerprint
+from salary import salary_columns
+
+@pytest.fixture
+def database(tmp_path):
+    database = Database(str(tmp_path / 'jobs.db'))
+    yield database
+    database.close()
+
+def make_job(title, description="Développement d'APIs en Python et PostgreSQL.", **fields):
+    return dict({'title': title, 'location': "Paris (75)", 'salary': None, 'advantages': "Télétravail",
+                 'description': description, 'job_key': None}, **fields)
+
+def job_row(job):
+    """The insert_jobs row of a job dict."""
+    return (job['title'], job['location'], job['salary'], job['advantages'], job['description'],
+            fingerprint(job), job['job_key']) + salary_columns(job['salary'])
+
+def test_migrates_unversioned_database(tmp_path):
+    path = str(tmp_path / 'jobs.db')
+    connection = sqlite3.connect(path)  # The schema of the first scraper, before any migration
+    connection.execute('''CREATE TABLE jobs (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        title TEXT NOT NULL,
+        location TEXT NOT NULL,
+        salary TEXT,
+        advantages TEXT,
+        description TEXT
+    )''')
+    connection.executemany('INSERT INTO jobs (title, location, salary, advantages, description) VALUES (?, ?, ?, ?, ?)', [
+        ("Développeur Python", "Paris (75)", "De 45 000 € à 50 000 € par an - CDI", "RTT", "Django et PostgreSQL."),
+        ("Développeur Python", "Paris (75)", "De 45 000 € à 50 000 € par an - CDI", "RTT", "Django et PostgreSQL."),
+        ("Data Engineer", "Lyon (69)", None, "N/A", "Pipelines Spark."),
+    ])
+    connection.commit()
+    connection.close()
+
+    database = Database(path)
+    try:
+        assert database.schema_version() == len(MIGRATIONS)
+        assert 'description' not in table_columns(database.connection, 'jobs')
+        assert database.get_description(1) == "Django et PostgreSQL."
+        assert [row[0] for row in database.search("django")] == [1, 2]
+
+        rows = database.query('SELECT fingerprint, salary_value, salary_period, checked FROM jobs ORDER BY id')
+        assert rows[0][0] is not None and rows[1][0] is None  # The later copy of a duplicate
+        assert rows[0][1:] == (45000.0, 'year', 0)
+    finally:
+        database.close()
+
+def test_migrations_run_once(tmp_path):
+    path = str(tmp_path / 'jobs.db')
+    Database(path).close()
+    database = Database(path)
+    try:
+        versions = [row[0] for row in database.query('SELECT version FROM schema_version ORDER BY version')]
+        assert versions == list(range(1, len(MIGRATIONS) + 1))
+    finally:
+        database.close()
+
+def test_insert_jobs_returns_ids_of_new_rows_only(database):
+    first, second, third = make_job("Développeur React"), make_job("Ingénieur DevOps"), make_job("Data Analyst")
+    inserted = database.insert_jobs([job_row(first), job_row(second)])
+    assert sorted(inserted.values()) == [1, 2]
+
+    inserted = database.insert_jobs([job_row(first), job_row(third), job_row(third)])
+    assert list(inserted) == [fingerprint(third)]  # Not the stored copy of first, nor third twice
+    assert inserted[fingerprint(third)] > 2
+    assert database.count_jobs() == 3
+    assert database.get_description(inserted[fingerprint(third)]) == third['description']
+
+def test_failed_migration_is_rolled_back(tmp_path, monkeypatch):
+    def broken_migration(connection):
+        connection.execute('CREATE TABLE half_done (id INTEGER)')
+        raise RuntimeError("migration failed")
+
+    monkeypatch.setattr('database.MIGRATIONS', MIGRATIONS + [broken_migration])
+    path = str(tmp_path / 'jobs.db')
+    with pytest.raises(RuntimeError):
+        Database(path)
+
+    connection = sqlite3.connect(path)
+    assert connection.execute("SELECT count(*) FROM sqlite_master WHERE name = 'half_done'").fetchone()[0] == 0
+    assert connection.execute('SELECT max(version) FROM schema_version').fetchone()[0] == len(MIGRATIONS)
+    connection.close()
+
+def test_list_jobs_pages_by_keyset(database):
+    titles = ["Backend", "Data", "Backend", "Frontend", "DevOps"]
+    database.insert_jobs([job_row(make_job(title, description=f"Poste {number}."))
+                          for number, title in enumerate(titles)])
+
+    first_page = database.list_jobs("title", limit=3)
+    assert [(row[0], row[1]) for row in first_page] == [(1, "Backend"), (3, "Backend"), (2, "Data")]
+    last = first_page[-1]
+    next_page = database.list_jobs("title", key=(last[-1], last[0]), limit=3)
+    assert [row[0] for row in next_page] == [5, 4]
+
+    # Backward from the first row of the next page, in reverse display order
+    first = next_page[0]
+    previous_page = database.list_jobs("title", key=(first[-1], first[0]), forward=False, limit=2)
+    assert [row[0] for row in previous_page] == [2, 3]
+
+    assert [row[0] for row in database.list_jobs("title", descending=True, limit=2)] == [4, 5]
+
+def test_texts_are_stored_compressed(database):
+    description = "Missions :\n\nConcevoir des APIs (Node.js, C#) – équipe de 5 personnes. " * 20
+    job = make_job("Développeur Full Stack", description=description, advantages=None)
+    job_id = database.insert_jobs([job_row(job)])[fingerprint(job)]
+
+    advantages_blob, description_blob = database.query('SELECT advantages, description FROM job_texts')[0]
+    assert advantages_blob is None
+    assert len(description_blob) < len(description.encode('utf-8')) / 4
+    assert database.get_description(job_id) == description
+    assert next(database.iter_jobs())['description'] == description
+    assert database.query('SELECT description_preview FROM jobs')[0][0] == description[:150].replace('\n', ' ')
+
+def test_trained_dictionary_applies_to_new_texts(database):
+    jobs = [make_job(f"Développeur {number}", description=f"Rejoignez notre équipe produit. Projet {number}.")
+            for number in range(TRAINING_MIN_TEXTS)]
+    database.insert_jobs([job_row(job) for job in jobs])
+    assert database.current_dictionary() == (None, 0)  # Never trained while inserting
+
+    dict_id = database.train_dictionary_if_due()
+    assert dict_id is not None
+    assert database.train_dictionary_if_due() is None  # Not due again until the database grows
+    assert database.query('SELECT DISTINCT dict_id FROM job_texts') == [(None,)]  # Old texts are left alone
+
+    new_job = make_job("Ingénieur Python", description="Rejoignez notre équipe produit. Projet Python.")
+    new_id = database.insert_jobs([job_row(new_job)])[fingerprint(new_job)]
+    assert database.query('SELECT dict_id FROM job_texts WHERE job_id = ?', (new_id,)) == [(dict_id,)]
+
+    assert database.recompress_texts(batch_size=30) == TRAINING_MIN_TEXTS
+    assert database.query('SELECT DISTINCT dict_id FROM job_texts') == [(dict_id,)]
+    assert [job['description'] for job in database.iter_jobs()] == [job['description'] for job in jobs + [new_job]]
+
+def search_ids(database, query):
+    return sorted(row[0] for row in database.search(query))
+
+def test_search_index_follows_inserts_updates_and_deletes(database):
+    jobs = [make_job("Développeur React", description="Interfaces en TypeScript."),
+            make_job("Ingénieur DevOps", description="Kubernetes et Terraform.")]
+    inserted = database.insert_jobs([job_row(job) for job in jobs])
+    react_id, devops_id = (inserted[fingerprint(job)] for job in jobs)
+    assert search_ids(database, "developpeur") == [react_id]
+    assert search_ids(database, "kube*") == [devops_id]
+
+    assert database.update_job(react_id, title="Développeur Vue.js", description="Interfaces en Vue.js.")
+    assert search_ids(database, "react OR typescript") == []
+    assert search_ids(database, "vue") == [react_id]
+    assert database.get_description(react_id) == "Interfaces en Vue.js."
+
+    assert database.delete_jobs([devops_id]) == 1
+    assert search_ids(database, "kubernetes") == []
+    assert database.query('SELECT count(*) FROM job_texts WHERE job_id = ?', (devops_id,)) == [(0,)]
+    database.connection.execute("INSERT INTO jobs_fts (jobs_fts, rank) VALUES ('integrity-check', 0)")
+
+def test_search_snippets_highlight_query_terms(database):
+    description = " ".join(["Contexte de la mission."] * 10 + ["Vous développerez des services Python."] + ["Fin."] * 10)
+    job = make_job("Ingénieur logiciel", description=description)
+    job_id = database.insert_jobs([job_row(job)])[fingerprint(job)]
+
+    [row] = database.search("developp* python")
+    assert row[5] == ("…mission. Contexte de la mission. Vous «développerez» des services «Python». "
+                      "Fin. Fin. Fin. Fin. Fin. Fin. Fin. Fin. Fin. Fin.")
+    assert database.search_snippets("python", [job_id])[job_id].count("«Python»") == 1
+
+def test_database_opens_without_the_application(database):
+    job = make_job("Développeur Go")
+    job_id = database.insert_jobs([job_row(job)])[fingerprint(job)]
+
+    connection = sqlite3.connect(database.db_name)  # No job_text() function registered here
+    assert connection.execute("SELECT rowid FROM jobs_fts WHERE jobs_fts MATCH 'go'").fetchall() == [(job_id,)]
+    connection.execute('DELETE FROM jobs WHERE id = ?', (job_id,))
+    connection.commit()
+    assert connection.execute('SELECT count(*) FROM job_texts').fetchone()[0] == 0
+    connection.close()
+    assert database.search("go") == []  # The stale index entry no longer has a job
@@ -0,0 +1,64 @@
+"""Exact and near-duplicate detection: fingerprints, MinHash signatures and the LSH index."""
+from dedup import MERSENNE_PRIME, MAX_HASH, MinHasher, fingerprint, hash_shingle, shingles
+from storage import JobStore
+
+DESCRIPTION = ("Au sein de notre équipe produit, vous concevez et développez des services web en Python "
+               "et PostgreSQL, participez aux revues de code, à la mise en place de l'intégration continue "
+               "et accompagnez les développeurs juniors. Télétravail partiel, tickets restaurant et RTT.")
+REPOST = DESCRIPTION + " Poste à pourvoir rapidement."
+OTHER = ("Nous recherchons un comptable expérimenté pour tenir la comptabilité générale, préparer les "
+         "déclarations fiscales et assurer le suivi de la trésorerie de nos filiales européennes.")
+
+def make_job(title, description):
+    return {'title': title, 'location': "Paris (75)", 'salary': None, 'advantages': "N/A",
+            'description': description, 'job_key': None}
+
+def test_fingerprint_ignores_formatting():
+    job = make_job("Développeur Python H/F", DESCRIPTION)
+    reformatted = make_job("développeur  python h/f", DESCRIPTION.upper().replace(",", " ,"))
+    assert fingerprint(job) == fingerprint(reformatted)
+    assert fingerprint(job) != fingerprint(make_job("Développeur Python H/F", REPOST))
+
+def test_signature_matches_the_minhash_formula():
+    minhasher = MinHasher()
+    hashes = [hash_shingle(shingle) for shingle in shingles(DESCRIPTION)]
+    expected = [min(((a * h + b) % MERSENNE_PRIME) & MAX_HASH for h in hashes) for a, b in minhasher.permutations]
+    assert list(minhasher.signature(DESCRIPTION)) == expected
+    assert MinHasher.from_blob(MinHasher.to_blob(minhasher.signature(DESCRIPTION))) == minhasher.signature(DESCRIPTION)
+
+def jaccard(text_a, text_b):
+    a, b = shingles(text_a), shingles(text_b)
+    return len(a & b) / len(a | b)
+
+def test_similarity_estimates_jaccard():
+    minhasher = MinHasher()
+    original = minhasher.signature(DESCRIPTION)
+    for text in (REPOST, OTHER):
+        assert abs(MinHasher.similarity(original, minhasher.signature(text)) - jaccard(DESCRIPTION, text)) < 0.15
+    assert MinHasher.similarity(original, minhasher.signature(REPOST)) >= 0.8
+
+def test_store_skips_near_duplicates(tmp_path):
+    store = JobStore(str(tmp_path / 'jobs.db'), near_duplicates=True)
+    try:
+        assert not store.add(make_job("Développeur Python", DESCRIPTION))
+        assert store.add(make_job("Développeur Python (H/F)", REPOST))  # Caught while still pending
+        store.flush()
+        assert store.add(make_job("Dev Python", REPOST))  # Caught through the LSH buckets
+        assert not store.add(make_job("Comptable", OTHER))
+        store.flush()
+        assert store.database.count_jobs() == 2
+    finally:
+        store.close()
+
+def test_backfill_indexes_stored_jobs(tmp_path):
+    path = str(tmp_path / 'jobs.db')
+    store = JobStore(path)
+    store.add(make_job("Développeur Python", DESCRIPTION))
+    store.close()
+
+    store = JobStore(path, near_duplicates=True)  # Signs the job stored without near-duplicate detection
+    try:
+        assert store.database.query('SELECT count(*) FROM job_minhash') == [(1,)]
+        assert store.add(make_job("Dev Python", REPOST))
+    finally:
+        store.close()
@@ -0,0 +1,54 @@
+"""HttpJobFetcher parsing against the saved Indeed pages served by FixtureServer."""
+import pytest
+from fixture_server import FixtureServer
+from http_fetcher import BrowserRequired, HttpJobFetcher, parse_job_page, parse_results_page
+from pacing import RateLimiter
+
+JOB_KEYS = ['a1b2c3d4e5f60001', 'a1b2c3d4e5f60002', 'a1b2c3d4e5f60003']
+
+@pytest.fixture(scope='module')
+def server():
+    with FixtureServer() as server:
+        yield server
+
+@pytest.fixture
+def fetcher(server):
+    fetcher = HttpJobFetcher(base_url=server.base_url, rate_limiter=RateLimiter(rate=1000, burst=1000))
+    yield fetcher
+    fetcher.close()
+
+def fetch_job(fetcher, job_key):
+    return fetcher.fetch_page(f"{fetcher.base_indeed_url}/viewjob?jk={job_key}")
+
+def test_results_page(server, fetcher):
+    document = fetcher.fetch_page(fetcher.build_search_url("développeur fullstack", "Ile-de-France, Paris"))
+    job_urls, next_url = parse_results_page(document, server.base_url)
+
+    assert job_urls == [f"{server.base_url}/viewjob?jk={job_key}" for job_key in JOB_KEYS]
+    assert next_url == (f"{server.base_url}/jobs?q=d%C3%A9veloppeur+fullstack"
+                        "&l=Ile-de-France%2C+Paris&start=10")
+
+def test_job_page(fetcher):
+    job = parse_job_page(fetch_job(fetcher, 'a1b2c3d4e5f60001'))
+
+    assert job['title'] == "Développeur Full Stack H/F"
+    assert job['salary'] == "De 45 000 € à 50 000 € par an - CDI, Temps plein"
+    assert job['location'] == "Paris (75)"
+    assert job['advantages'] == "Avantages\n\nTitre-restaurant\n\nTélétravail possible\n\nRTT"
+    assert job['description'].startswith("Dans le cadre de notre croissance")
+    assert "Missions :\n\nConcevoir et développer des applications web (React, Node.js)" in job['description']
+
+def test_minimal_job_page(fetcher):
+    job = parse_job_page(fetch_job(fetcher, 'a1b2c3d4e5f60002'))
+
+    assert job == {
+        'title': "Ingénieur Logiciel Python",
+        'salary': None,
+        'location': "Nanterre (92)",
+        'advantages': "N/A",
+        'description': "Rejoignez une équipe produit travaillant sur des services Python et PostgreSQL.",
+    }
+
+def test_captcha_page(fetcher):
+    with pytest.raises(BrowserRequired):
+        fetch_job(fetcher, 'a1b2c3d4e5f60003')
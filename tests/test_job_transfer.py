@@ -0,0 +1,69 @@
+"""Bulk export, import and log replay through job_transfer."""
+import json
+import pytest
+from database import Database
+from job_transfer import export_jobs, import_jobs, logged_jobs, read_jobs
+from storage import JobStore
+
+JOBS = [
+    {'title': "Développeur Full Stack H/F", 'location': "Paris (75)",
+     'salary': "De 45 000 € à 50 000 € par an - CDI, Temps plein", 'advantages': "Titre-restaurant\nRTT",
+     'description': "Missions :\n\n- Concevoir des APIs, \"REST\" et GraphQL ;\n- Revues de code.", 'job_key': 'jk1'},
+    {'title': "Ingénieur Logiciel Python", 'location': "Nanterre (92)", 'salary': None, 'advantages': "N/A",
+     'description': "Services Python et PostgreSQL.", 'job_key': None},
+]
+
+@pytest.fixture
+def store(tmp_path):
+    store = JobStore(str(tmp_path / 'source.db'))
+    for job in JOBS:
+        store.add(job)
+    store.flush()
+    store.database.update_checkbox_state(1, True)
+    yield store
+    store.close()
+
+@pytest.mark.parametrize('name, file_format', [('jobs.jsonl', 'jsonl'), ('jobs.csv.gz', 'csv'),
+                                               ('jobs.parquet', 'parquet')])
+def test_export_import_round_trip(store, tmp_path, name, file_format):
+    if file_format == 'parquet':
+        pytest.importorskip('pyarrow')
+    path = str(tmp_path / name)
+    assert export_jobs(store.database, path, file_format, batch_size=1) == 2
+
+    target = JobStore(str(tmp_path / 'target.db'))
+    try:
+        assert import_jobs(target, read_jobs(path, file_format)) == (2, 2, 0)
+        assert import_jobs(target, read_jobs(path, file_format)) == (2, 0, 0)  # Everything is a duplicate now
+
+        columns = ['title', 'location', 'salary', 'advantages', 'description', 'checked', 'job_key',
+                   'salary_min', 'salary_max', 'salary_period']
+        exported = [{column: job[column] for column in columns} for job in store.database.iter_jobs()]
+        imported = [{column: job[column] for column in columns} for job in target.database.iter_jobs()]
+        assert imported == exported
+        assert imported[0]['checked'] == 1
+    finally:
+        target.close()
+
+def test_replay_log(tmp_path):
+    path = tmp_path / 'job_scraper.log'
+    truncated = dict(JOBS[1], description="Services Python… [2048 chars]")
+    path.write_text("\n".join([
+        f"2024-11-13 03:15:48,396 - INFO - Scraped job from Indeed: {JOBS[0]!r}",
+        json.dumps({'level': 'INFO', 'message': f"Scraped job from Indeed: {JOBS[1]['title']}", 'payload': JOBS[1]}),
+        json.dumps({'level': 'INFO', 'message': "Scraped job from Indeed: truncated", 'payload': truncated}),
+        "2024-11-13 03:15:49,001 - INFO - Page loaded, now checking for CAPTCHA...",
+    ]), encoding='utf-8')
+
+    assert list(logged_jobs(str(path))) == JOBS
+
+    store = JobStore(str(tmp_path / 'jobs.db'))
+    try:
+        assert import_jobs(store, logged_jobs(str(path))) == (2, 2, 0)
+    finally:
+        store.close()
+    database = Database(str(tmp_path / 'jobs.db'))
+    try:
+        assert database.get_description(1) == JOBS[0]['description']
+    finally:
+        database.close()
@@ -1,19 +1,74 @@
 import tkinter as tk
 from tkinter import ttk
 from tkinter import messagebox
+from tkinter import simpledialog
+import os
 import sqlite3
-from scraper import JobScraper  # Import JobScraper to run the scraper directly
+import queue
+from scrape_worker import ScrapeWorker  # Runs JobScraper in a background thread
+from database import Database, SORT_EXPRESSIONS
+from analytics import salary_report
+from relevance_worker import RelevanceWorker  # Updates the relevance index and ranks jobs in a background thread
+from log_setup import setup_logging
+
+PAGE_SIZE = 200  # Rows fetched from the database per query
+MAX_LOADED_ROWS = 1000  # Rows kept in the Treeview; rows beyond this window are dropped
+SEARCH_DELAY_MS = 300  # Typing pause before the search runs
+SEARCH_LIMIT = 500  # Maximum number of search results shown
+SNIPPET_ROWS = 50  # Search results given a snippet at once; the others get theirs when scrolled into view
+WORKER_POLL_MS = 100  # How often scrape progress events are read
+RELEVANCE_LIMIT = 500  # Maximum number of jobs shown in the relevance view
 
 class JobSearchApp:
-    def __init__(self, root):
+    def __init__(self, root, db_path='data/jobs.db'):
         self.root = root
         self.root.title("Job Search Tracker")
         
-        self.db_path = 'data/jobs.db'  # Path to the database
+        self.db_path = db_path  # Path to the database
         self.sort_state = {}  # Dictionary to hold sort state for each column
 
-        # Initialize scraper
-        self.scraper = JobScraper()
+        self.sort_expression = SORT_EXPRESSIONS["ID"]
+        self.sort_descending = False
+
+        # Keyset pagination state of the rows currently loaded in the Treeview
+        self.row_keys = {}  # Treeview item ID -> (sort value, job ID)
+        self.first_key = None
+        self.last_key = None
+        self.has_more_before = False
+        self.has_more_after = False
+        self.total_jobs = 0
+        self.loading_page = False
+
+        self.search_query = ""  # Active full-text query, empty when browsing all jobs
+        self.search_after_id = None  # Pending debounced search
+        self.snippets_pending = set()  # Search result items still showing the description preview
+        self.filling_snippets = False
+
+        self.relevance_profile = ""  # Skills profile of the relevance view, empty when not in it
+        self.rankings_pending = 0
+        self.profile_path = os.path.join(os.path.dirname(db_path) or '.', 'skills_profile.txt')
+
+        # The scraper (and Chrome) only starts when a scrape is requested
+        self.worker = None
+        self.worker_events = queue.Queue()
+
+        # One connection for the lifetime of the window; opening it migrates the schema
+        self.db = Database(self.db_path)
+
+        # Loads (or builds) the relevance index right away, so the relevance view is ready when asked for
+        self.relevance_events = queue.Queue()
+        self.relevance_worker = RelevanceWorker(self.db_path, self.relevance_events, limit=RELEVANCE_LIMIT)
+        self.relevance_worker.start()
+        self.relevance_worker.save()
+
+        # Search box: results are ranked and refreshed as you type
+        search_frame = tk.Frame(root)
+        search_frame.pack(fill='x', padx=10, pady=(10, 0))
+        tk.Label(search_frame, text="Search:", font=('Arial', 10)).pack(side="left")
+        self.search_var = tk.StringVar()
+        self.search_entry = tk.Entry(search_frame, textvariable=self.search_var, font=('Arial', 10))
+        self.search_entry.pack(side="left", expand=True, fill='x', padx=5)
+        self.search_entry.bind("<KeyRelease>", self.on_search_changed)
 
         # Frame to hold the Treeview and scrollbar
         tree_frame = tk.Frame(root)
@@ -49,19 +104,39 @@ class JobSearchApp:
                         font=('Arial', 12, 'bold'))  # Bold column headers
 
         # Create vertical scrollbar and link it to the Treeview
-        scrollbar = ttk.Scrollbar(tree_frame, orient="vertical", command=self.tree.yview)
-        self.tree.configure(yscroll=scrollbar.set)
-        scrollbar.pack(side="right", fill="y")
+        self.scrollbar = ttk.Scrollbar(tree_frame, orient="vertical", command=self.tree.yview)
+        self.tree.configure(yscroll=self.on_tree_scroll)
+        self.scrollbar.pack(side="right", fill="y")
         self.tree.pack(expand=True, fill='both', side="left")
 
+        # Shows which part of the table is loaded
+        self.status_label = tk.Label(root, anchor="w")
+        self.status_label.pack(fill='x', padx=10)
+
         # Button to scrape and load jobs
         self.scrape_button = tk.Button(root, text="Scrape and Load Jobs", command=self.scrape_and_load_jobs)
         self.scrape_button.pack(pady=10)
 
+        # Button to stop a running scrape
+        self.cancel_button = tk.Button(root, text="Cancel Scrape", command=self.cancel_scrape, state='disabled')
+        self.cancel_button.pack(pady=5)
+
+        # Shows what the background scraper is doing
+        self.progress_label = tk.Label(root, anchor="w", fg="gray25")
+        self.progress_label.pack(fill='x', padx=10)
+
         # Checkbox toggle button
         self.toggle_button = tk.Button(root, text="Toggle Check", command=self.toggle_check)
         self.toggle_button.pack(pady=5)
 
+        # Salary statistics computed from the typed salary columns
+        self.stats_button = tk.Button(root, text="Salary Statistics", command=self.show_salary_statistics)
+        self.stats_button.pack(pady=5)
+
+        # Jobs ranked by how well they match a skills profile
+        self.relevance_button = tk.Button(root, text="Sort by Relevance", command=self.sort_by_relevance)
+        self.relevance_button.pack(pady=5)
+
         # Bind a double-click event on the Treeview to show full description
         self.tree.bind("<Double-1>", self.show_full_description)
 
@@ -74,65 +149,332 @@ class JobSearchApp:
         new_sort_order = not current_sort_order
         self.sort_state[col] = new_sort_order  # Toggle sort order
 
-        # Retrieve job data from Treeview to sort
-        jobs = [(self.tree.item(item)["values"], item) for item in self.tree.get_children()]
-        
-        # Determine sort key based on column index
-        col_idx = self.tree["columns"].index(col)
-        jobs.sort(key=lambda job: job[0][col_idx], reverse=new_sort_order)
-
-        # Rearrange items in sorted order
-        for index, (_, item) in enumerate(jobs):
-            self.tree.move(item, '', index)
+        # Sorting is done by SQLite, so the window is simply reloaded in the new order
+        self.relevance_profile = ""
+        self.sort_expression = SORT_EXPRESSIONS[col]
+        self.sort_descending = new_sort_order
+        self.refresh_jobs()
 
     def scrape_and_load_jobs(self):
-        """Runs the scraper and loads new job data into the Treeview."""
-        # Run the scraper
-        self.scraper.scrape_indeed_jobs()
-        self.load_jobs()  # Load jobs into Treeview after scraping
+        """Starts the scraper in a background thread; new jobs appear in the Treeview as they are saved."""
+        if self.worker is not None and self.worker.is_alive():
+            return
+
+        self.worker = ScrapeWorker(self.db_path, self.worker_events)
+        self.worker.start()
+        self.scrape_button.config(state='disabled')
+        self.cancel_button.config(state='normal')
+        self.root.after(WORKER_POLL_MS, self.process_worker_events)
+
+    def cancel_scrape(self):
+        """Asks the running scrape to stop."""
+        if self.worker is not None:
+            self.worker.cancel()
+            self.progress_label.config(text="Cancelling...")
+            self.cancel_button.config(state='disabled')
+
+    def process_worker_events(self):
+        """Applies the events sent by the scrape worker; runs on the Tk main thread."""
+        finished = False
+        while True:
+            try:
+                kind, payload = self.worker_events.get_nowait()
+            except queue.Empty:
+                break
+
+            if kind == 'status':
+                self.progress_label.config(text=payload)
+            elif kind == 'saved':
+                self.add_saved_jobs(payload)
+            elif kind == 'captcha':
+                messagebox.showinfo("CAPTCHA", "A CAPTCHA was detected. Complete it in the browser window, then click OK.")
+                self.worker.captcha_done.set()
+            elif kind == 'error':
+                messagebox.showerror("Scraping Error", f"An error occurred while scraping: {payload}")
+            elif kind == 'finished':
+                finished = True
+                self.progress_label.config(text=f"Scrape finished: {payload} jobs scraped.")
+                self.relevance_worker.save()
+
+        if finished:
+            self.scrape_button.config(state='normal')
+            self.cancel_button.config(state='disabled')
+            self.worker = None
+        else:
+            self.root.after(WORKER_POLL_MS, self.process_worker_events)
+
+    def add_saved_jobs(self, job_ids):
+        """Shows newly saved jobs without reloading the list."""
+        if not job_ids:
+            return
+        self.total_jobs += len(job_ids)
+        self.relevance_worker.update()  # Indexes the new jobs (and any stored since) in the background
+
+        # New jobs have the highest IDs, so they belong at the end of the default order.
+        # In any other view (search, sorted, window not at the end) only the count changes.
+        default_order = self.sort_expression == SORT_EXPRESSIONS["ID"] and not self.sort_descending
+        browsing = not self.search_query and not self.relevance_profile
+        if browsing and default_order and not self.has_more_after:
+            jobs = self.query_rows(self.db.get_jobs, job_ids)
+            # A reload during the scrape may already have picked some of them up
+            self.append_rows([job for job in jobs if not self.tree.exists(str(job[0]))])
+        if browsing:
+            self.update_status()
+
+    def refresh_jobs(self):
+        """Reloads the list, keeping the active search or relevance view if there is one."""
+        if self.relevance_profile:
+            self.show_relevance()
+        elif self.search_query:
+            self.run_search()
+        else:
+            self.load_jobs()
+
+    def on_search_changed(self, event=None):
+        """Debounces the search box: the search runs once typing pauses."""
+        if self.search_after_id is not None:
+            self.root.after_cancel(self.search_after_id)
+        self.search_after_id = self.root.after(SEARCH_DELAY_MS, self.run_search)
+
+    def run_search(self):
+        """Shows the jobs matching the search box, best match first, with highlighted snippets."""
+        self.search_after_id = None
+        self.relevance_profile = ""
+        self.search_query = self.search_var.get().strip()
+        if not self.search_query:
+            self.load_jobs()
+            return
+
+        try:
+            jobs = self.db.search(self.search_query, limit=SEARCH_LIMIT, snippet_rows=SNIPPET_ROWS)
+        except sqlite3.Error as e:
+            print(f"Database error: {e}")
+            messagebox.showerror("Database Error", f"An error occurred while searching the database: {e}")
+            return
+
+        for row in self.tree.get_children():
+            self.tree.delete(row)
+        self.row_keys = {}
+        self.first_key = self.last_key = None
+        self.has_more_before = self.has_more_after = False  # Results are not paginated
+        self.append_rows(jobs)
+        self.snippets_pending = {str(job[0]) for job in jobs[SNIPPET_ROWS:]}
+        self.status_label.config(text=f"{len(jobs)} results for '{self.search_query}'"
+                                      + (f" (first {SEARCH_LIMIT} shown)" if len(jobs) == SEARCH_LIMIT else ""))
+
+    def sort_by_relevance(self):
+        """Asks for a skills profile, remembers it, and shows the jobs that match it best."""
+        profile = ""
+        if os.path.exists(self.profile_path):
+            with open(self.profile_path, encoding='utf-8') as f:
+                profile = f.read().strip()
+        profile = simpledialog.askstring("Sort by Relevance", "Your skills (e.g. python django react sql docker):",
+                                         initialvalue=profile, parent=self.root)
+        if not profile or not profile.strip():
+            return
+        with open(self.profile_path, 'w', encoding='utf-8') as f:
+            f.write(profile.strip())
+
+        self.relevance_profile = profile.strip()
+        self.search_query = ""
+        self.search_var.set("")
+        self.show_relevance()
+
+    def show_relevance(self):
+        """Asks the relevance worker to rank the jobs against the skills profile; see show_ranking."""
+        self.relevance_worker.rank(self.relevance_profile)
+        self.status_label.config(text="Ranking jobs by relevance...")
+        self.rankings_pending += 1
+        if self.rankings_pending == 1:
+            self.root.after(WORKER_POLL_MS, self.process_relevance_events)
+
+    def process_relevance_events(self):
+        """Applies the rankings sent by the relevance worker; runs on the Tk main thread."""
+        while True:
+            try:
+                kind, payload = self.relevance_events.get_nowait()
+            except queue.Empty:
+                break
+            self.rankings_pending -= 1
+            if kind == 'ranked':
+                profile, ranked = payload
+                if profile == self.relevance_profile:  # The view may have been left or asked again since
+                    self.show_ranking(ranked)
+            elif kind == 'error' and self.relevance_profile:
+                print(f"Ranking error: {payload}")
+                messagebox.showerror("Database Error", f"An error occurred while ranking the jobs: {payload}")
+
+        if self.rankings_pending > 0:
+            self.root.after(WORKER_POLL_MS, self.process_relevance_events)
+
+    def show_ranking(self, ranked):
+        """Shows ranked (job ID, score) pairs, best match first."""
+        jobs = self.query_rows(self.db.get_jobs, [job_id for job_id, _ in ranked])
+
+        # get_jobs returns ID order; the score replaces the sort value column
+        rows = {job[0]: job for job in jobs}
+        jobs = [rows[job_id][:7] + (score,) for job_id, score in ranked if job_id in rows]
+
+        for row in self.tree.get_children():
+            self.tree.delete(row)
+        self.row_keys = {}
+        self.first_key = self.last_key = None
+        self.has_more_before = self.has_more_after = False  # The ranking is not paginated
+        self.append_rows(jobs)
+        self.status_label.config(text=f"{len(jobs)} jobs matching your skills, best first"
+                                      + (f" (first {RELEVANCE_LIMIT} shown)" if len(jobs) == RELEVANCE_LIMIT else ""))
 
     def load_jobs(self):
-        """Loads job data from the database into the Treeview."""
+        """Loads the first page of jobs from the database into the Treeview."""
         # Clear existing rows in the Treeview
         for row in self.tree.get_children():
             self.tree.delete(row)
+        self.row_keys = {}
+        self.first_key = self.last_key = None
+        self.has_more_before = self.has_more_after = False
 
-        # Connect to the database and fetch jobs
+        # Fetch jobs; the jobs table always exists once the database is open
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            
-            # Check if the table exists
-            cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='jobs';")
-            table_exists = cursor.fetchone()
-            
-            if not table_exists:
-                print("The jobs table does not exist in the database.")
-                messagebox.showwarning("Database Error", "The 'jobs' table does not exist in the database.")
-                return
-
-            # Fetch jobs data
-            cursor.execute("SELECT id, title, location, salary, advantages, description, checked FROM jobs")
-            jobs = cursor.fetchall()
+            self.total_jobs = self.db.count_jobs()
             
-            if not jobs:
+            if not self.total_jobs:
                 print("No job data found in the jobs table.")
                 messagebox.showinfo("No Data", "No job listings are available in the database.")
-            else:
-                print(f"Loaded {len(jobs)} jobs from the database.")
+                return
+            print(f"{self.total_jobs} jobs in the database.")
 
-            # Insert jobs into the Treeview
-            for job in jobs:
-                # Convert checked state to True/False for the Treeview
-                checked = bool(job[6])  # Database stores 1/0; Treeview expects True/False
-                self.tree.insert("", "end", values=(job[0], job[1], job[2], job[3], job[4], job[5], checked))
+            # Fetch the first page only; further pages are loaded while scrolling
+            jobs = self.fetch_page(None, forward=True)
+            self.has_more_after = len(jobs) > PAGE_SIZE
+            self.append_rows(jobs[:PAGE_SIZE])
 
         except sqlite3.Error as e:
             print(f"Database error: {e}")
             messagebox.showerror("Database Error", f"An error occurred while accessing the database: {e}")
         finally:
-            if conn:
-                conn.close()
+            self.update_status()
+
+    def query_rows(self, query, *args):
+        """Calls a Database query method, returning an empty list on database errors."""
+        try:
+            return query(*args)
+        except sqlite3.Error as e:
+            print(f"Database error: {e}")
+            messagebox.showerror("Database Error", f"An error occurred while accessing the database: {e}")
+            return []
+
+    def on_tree_scroll(self, first, last):
+        """Updates the scrollbar and loads the neighbouring page when an edge of the window is reached."""
+        self.scrollbar.set(first, last)
+        if self.search_query and self.snippets_pending and not self.filling_snippets:
+            self.filling_snippets = True
+            self.root.after_idle(self.fill_snippets)
+        if self.loading_page:
+            return
+        if float(last) >= 0.95 and self.has_more_after:
+            self.loading_page = True
+            self.root.after_idle(self.load_next_page)
+        elif float(first) <= 0.05 and self.has_more_before:
+            self.loading_page = True
+            self.root.after_idle(self.load_previous_page)
+
+    def fill_snippets(self):
+        """Replaces the description previews of the search results in view with snippets."""
+        try:
+            children = self.tree.get_children()
+            if not self.search_query or not children:
+                return
+            first, last = self.tree.yview()
+            start = int(first * len(children))
+            visible = children[start:int(last * len(children)) + SNIPPET_ROWS]  # A page ahead of the view
+            items = [item for item in visible if item in self.snippets_pending]
+            if not items:
+                return
+            snippets = self.query_rows(self.db.search_snippets, self.search_query, [int(item) for item in items])
+            for item in items:
+                self.snippets_pending.discard(item)
+                if snippets and int(item) in snippets:
+                    values = self.tree.item(item, 'values')
+                    self.tree.item(item, values=values[:5] + (snippets[int(item)],) + values[6:])
+        finally:
+            self.filling_snippets = False
+
+    def fetch_page(self, key, forward):
+        """Fetches the page after (forward) or before a (sort value, id) key, plus one row
+        telling whether more follow. Backward pages come back in reverse display order."""
+        return self.db.list_jobs(self.sort_expression, self.sort_descending, key, forward, limit=PAGE_SIZE + 1)
+
+    def load_next_page(self):
+        """Appends the page after the loaded window and drops rows from the top if needed."""
+        try:
+            children = self.tree.get_children()
+            top_item = children[min(len(children) - 1, round(self.tree.yview()[0] * len(children)))] if children else None
+
+            jobs = self.query_rows(self.fetch_page, self.last_key, True)
+            self.has_more_after = len(jobs) > PAGE_SIZE
+            self.append_rows(jobs[:PAGE_SIZE])
+
+            children = self.tree.get_children()
+            excess = len(children) - MAX_LOADED_ROWS
+            if excess > 0:
+                self.tree.delete(*children[:excess])
+                for item in children[:excess]:
+                    del self.row_keys[item]
+                self.first_key = self.row_keys[children[excess]]
+                self.has_more_before = True
+                # Deleting rows above the view keeps its top index, which would jump ahead by
+                # `excess` rows; scroll back so the row the user was looking at stays on top
+                if top_item is not None and self.tree.exists(top_item):
+                    self.tree.yview_moveto((self.tree.index(top_item) + 0.25) / (len(children) - excess))
+            self.update_status()
+        finally:
+            self.loading_page = False
+
+    def load_previous_page(self):
+        """Prepends the page before the loaded window and drops rows from the bottom if needed."""
+        try:
+            jobs = self.query_rows(self.fetch_page, self.first_key, False)
+            self.has_more_before = len(jobs) > PAGE_SIZE
+            jobs = list(reversed(jobs[:PAGE_SIZE]))
+            anchor = self.tree.get_children()[0]
+            for index, job in enumerate(jobs):
+                self.insert_row(job, index)
+            if jobs:
+                self.first_key = self.row_keys[str(jobs[0][0])]
+            self.tree.see(anchor)  # Keep the row the user was looking at in view
+
+            children = self.tree.get_children()
+            excess = len(children) - MAX_LOADED_ROWS
+            if excess > 0:
+                self.tree.delete(*children[-excess:])
+                for item in children[-excess:]:
+                    del self.row_keys[item]
+                self.last_key = self.row_keys[children[-excess - 1]]
+                self.has_more_after = True
+            self.update_status()
+        finally:
+            self.loading_page = False
+
+    def append_rows(self, jobs):
+        """Inserts rows at the end of the Treeview and advances the window end."""
+        for job in jobs:
+            self.insert_row(job, "end")
+        if jobs:
+            if self.first_key is None:
+                self.first_key = self.row_keys[str(jobs[0][0])]
+            self.last_key = self.row_keys[str(jobs[-1][0])]
+
+    def insert_row(self, job, index):
+        """Inserts one job row; the job ID is used as the Treeview item ID."""
+        # Convert checked state to True/False for the Treeview
+        checked = bool(job[6])  # Database stores 1/0; Treeview expects True/False
+        item = str(job[0])
+        self.tree.insert("", index, iid=item, values=(job[0], job[1], job[2], job[3], job[4], job[5], checked))
+        self.row_keys[item] = (job[7], job[0])  # The last column is the sort value
+
+    def update_status(self):
+        """Shows how many jobs are loaded out of the total."""
+        self.status_label.config(text=f"Showing {len(self.tree.get_children())} of {self.total_jobs} jobs")
 
     def toggle_check(self):
         selected_item = self.tree.selection()
@@ -156,28 +498,29 @@ class JobSearchApp:
         new_value_int = 1 if new_value else 0  # Convert True/False to 1/0 for database
 
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-
-            # Update the checkbox state in the database for the corresponding job by ID
-            cursor.execute("UPDATE jobs SET checked = ? WHERE id = ?", (new_value_int, job_id))
-            conn.commit()
+            self.db.update_checkbox_state(job_id, new_value)
             print(f"Saved checkbox state for job with ID {job_id}: {new_value_int}")
 
         except sqlite3.Error as e:
             print(f"Database error: {e}")
             messagebox.showerror("Database Error", f"An error occurred while saving the checkbox state: {e}")
-        finally:
-            if conn:
-                conn.close()
 
     def show_full_description(self, event):
         """Display the full job description in a new window on double-click."""
         selected_item = self.tree.selection()
         if selected_item:
             selected_item = selected_item[0]
-            job_details = self.tree.item(selected_item, 'values')
-            description = job_details[5]  # Assuming description is in the 6th column
+            job_id = self.tree.item(selected_item, 'values')[0]
+
+            # The list only holds a preview, so the full text is loaded on demand
+            try:
+                description = self.db.get_description(job_id)
+            except sqlite3.Error as e:
+                print(f"Database error: {e}")
+                messagebox.showerror("Database Error", f"An error occurred while accessing the database: {e}")
+                return
+            if description is None:
+                return
 
             # Create a new top-level window to display the full description
             description_window = tk.Toplevel(self.root)
@@ -190,7 +533,27 @@ class JobSearchApp:
             text_widget.config(state='disabled')  # Make text read-only
             text_widget.pack(expand=True, fill='both', padx=10, pady=10)
 
+    def show_salary_statistics(self):
+        """Display salary distribution, percentiles by location and contract, and trends in a new window."""
+        try:
+            report = salary_report(self.db)
+        except sqlite3.Error as e:
+            print(f"Database error: {e}")
+            messagebox.showerror("Database Error", f"An error occurred while accessing the database: {e}")
+            return
+
+        stats_window = tk.Toplevel(self.root)
+        stats_window.title("Salary Statistics")
+        stats_window.geometry("760x600")
+
+        # Fixed-width font so the tables line up
+        text_widget = tk.Text(stats_window, wrap='none', font=('Courier', 10))
+        text_widget.insert("1.0", report)
+        text_widget.config(state='disabled')  # Make text read-only
+        text_widget.pack(expand=True, fill='both', padx=10, pady=10)
+
 if __name__ == "__main__":
+    setup_logging()
     root = tk.Tk()
     app = JobSearchApp(root)
     root.mainloop()